@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import os
 import typing
+import uuid
 
 import httpx
 from .core.client_wrapper import AsyncClientWrapper, SyncClientWrapper
@@ -49,6 +50,23 @@ if typing.TYPE_CHECKING:
     from .users.client import AsyncUsersClient, UsersClient
 
 
+def _cache_identity(
+    token: typing.Optional[typing.Callable[..., typing.Any]],
+    client_id: typing.Optional[str],
+    client_secret: typing.Optional[str],
+) -> typing.Optional[str]:
+    """
+    Identifies the caller in query cache keys, which can't use the bearer token as it changes on every refresh. OAuth
+    callers are identified by their client id; a token callback says nothing about whose token it returns, so its
+    client gets an identity of its own and shares cached responses with no other client.
+    """
+    if token is not None:
+        return f"token:{uuid.uuid4().hex}"
+    if client_id is not None and client_secret is not None:
+        return f"client_id:{client_id}"
+    return None
+
+
 class BaseVectara:
     """
     Use this class to access the different functions within the SDK. You can instantiate any number of clients with different configuration that will propagate to these functions.
@@ -62,6 +80,12 @@ class BaseVectara:
     client_secret : str
         The client secret used for authentication.
 
+    background_token_refresh : bool
+        Whether to renew the OAuth token in the background ahead of its expiry, rather than making requests wait for it once it has expired.
+
+    share_oauth_token : bool
+        Whether to share the OAuth token with the other clients in this process using the same credentials.
+
     timeout : typing.Optional[float]
         The timeout to be used, in seconds, for requests. By default the timeout is 60 seconds, unless a custom httpx client is used, in which case this default is not enforced.
 
@@ -119,6 +143,8 @@ class BaseVectara:
         logging: typing.Optional[typing.Union[LogConfig, Logger]] = None,
         client_id: typing.Optional[str] = os.getenv("VECTARA_CLIENT_ID"),
         client_secret: typing.Optional[str] = os.getenv("VECTARA_CLIENT_SECRET"),
+        background_token_refresh: bool = False,
+        share_oauth_token: bool = False,
     ): ...
     @typing.overload
     def __init__(
@@ -145,6 +171,8 @@ class BaseVectara:
         headers: typing.Optional[typing.Dict[str, str]] = None,
         client_id: typing.Optional[str] = os.getenv("VECTARA_CLIENT_ID"),
         client_secret: typing.Optional[str] = os.getenv("VECTARA_CLIENT_SECRET"),
+        background_token_refresh: bool = False,
+        share_oauth_token: bool = False,
         token: typing.Optional[typing.Callable[[], str]] = None,
         _token_getter_override: typing.Optional[typing.Callable[[], str]] = None,
         timeout: typing.Optional[float] = None,
@@ -172,7 +200,7 @@ class BaseVectara:
                 token=_token_getter_override if _token_getter_override is not None else token,
             )
         elif client_id is not None and client_secret is not None:
-            oauth_token_provider = OAuthTokenProvider(
+            oauth_token_provider = (OAuthTokenProvider.shared if share_oauth_token else OAuthTokenProvider)(
                 client_id=client_id,
                 client_secret=client_secret,
                 client_wrapper=SyncClientWrapper(
@@ -189,6 +217,7 @@ class BaseVectara:
                     timeout=_defaulted_timeout,
                     logging=logging,
                 ),
+                background_refresh=background_token_refresh,
             )
             self._client_wrapper = SyncClientWrapper(
                 environment=environment,
@@ -220,6 +249,7 @@ class BaseVectara:
                 timeout=_defaulted_timeout,
                 logging=logging,
             )
+        self._client_wrapper.httpx_client.cache_identity = _cache_identity(token, client_id, client_secret)
         self._corpora: typing.Optional[CorporaClient] = None
         self._upload: typing.Optional[UploadClient] = None
         self._documents: typing.Optional[DocumentsClient] = None
@@ -541,6 +571,12 @@ class AsyncBaseVectara:
     client_secret : str
         The client secret used for authentication.
 
+    background_token_refresh : bool
+        Whether to renew the OAuth token in the background ahead of its expiry, rather than making requests wait for it once it has expired.
+
+    share_oauth_token : bool
+        Whether to share the OAuth token with the other clients in this process using the same credentials.
+
     timeout : typing.Optional[float]
         The timeout to be used, in seconds, for requests. By default the timeout is 60 seconds, unless a custom httpx client is used, in which case this default is not enforced.
 
@@ -598,6 +634,8 @@ class AsyncBaseVectara:
         logging: typing.Optional[typing.Union[LogConfig, Logger]] = None,
         client_id: typing.Optional[str] = os.getenv("VECTARA_CLIENT_ID"),
         client_secret: typing.Optional[str] = os.getenv("VECTARA_CLIENT_SECRET"),
+        background_token_refresh: bool = False,
+        share_oauth_token: bool = False,
     ): ...
     @typing.overload
     def __init__(
@@ -624,6 +662,8 @@ class AsyncBaseVectara:
         headers: typing.Optional[typing.Dict[str, str]] = None,
         client_id: typing.Optional[str] = os.getenv("VECTARA_CLIENT_ID"),
         client_secret: typing.Optional[str] = os.getenv("VECTARA_CLIENT_SECRET"),
+        background_token_refresh: bool = False,
+        share_oauth_token: bool = False,
         token: typing.Optional[typing.Callable[[], str]] = None,
         _token_getter_override: typing.Optional[typing.Callable[[], str]] = None,
         timeout: typing.Optional[float] = None,
@@ -649,7 +689,7 @@ class AsyncBaseVectara:
                 token=_token_getter_override if _token_getter_override is not None else token,
             )
         elif client_id is not None and client_secret is not None:
-            oauth_token_provider = AsyncOAuthTokenProvider(
+            oauth_token_provider = (AsyncOAuthTokenProvider.shared if share_oauth_token else AsyncOAuthTokenProvider)(
                 client_id=client_id,
                 client_secret=client_secret,
                 client_wrapper=AsyncClientWrapper(
@@ -666,6 +706,7 @@ class AsyncBaseVectara:
                     timeout=_defaulted_timeout,
                     logging=logging,
                 ),
+                background_refresh=background_token_refresh,
             )
             self._client_wrapper = AsyncClientWrapper(
                 environment=environment,
@@ -694,6 +735,7 @@ class AsyncBaseVectara:
                 timeout=_defaulted_timeout,
                 logging=logging,
             )
+        self._client_wrapper.httpx_client.cache_identity = _cache_identity(token, client_id, client_secret)
         self._corpora: typing.Optional[AsyncCorporaClient] = None
         self._upload: typing.Optional[AsyncUploadClient] = None
         self._documents: typing.Optional[AsyncDocumentsClient] = None
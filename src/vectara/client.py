@@ -1,20 +1,70 @@
+from __future__ import annotations
+
 import logging
 import typing
-from typing import Union, Iterator, Optional
-
-from vectara.managers.corpus import CorpusManager
-from vectara.managers.upload import UploadManager
-from vectara.managers.document import DocumentManager
-from vectara.utils import LabHelper
+from dataclasses import dataclass
+from typing import Union, Iterable, Iterator, Optional, AsyncIterable, AsyncIterator, Dict
 
-from . import SearchCorporaParameters, GenerationParameters, ChatParameters, ChatStreamedResponse, QueryStreamedResponse, QueryFullResponse, ChatFullResponse
 from .base_client import BaseVectara, AsyncBaseVectara
-from .core import RequestOptions
+from .core.request_options import RequestOptions
+from .core.retry_budget import RetryBudget, RetryStats
+
+# The managers, helpers and types pull in most of the SDK, so they are only imported once used, keeping
+# "from vectara import Vectara" fast.
+if typing.TYPE_CHECKING:
+    from vectara.managers.corpus import CorpusManager, AsyncCorpusManager
+    from vectara.managers.upload import UploadManager, AsyncUploadManager
+    from vectara.managers.document import DocumentManager, AsyncDocumentManager
+    from vectara.managers.scan import CorpusScanner, AsyncCorpusScanner
+    from vectara.managers.jobs import JobWaiter, AsyncJobWaiter
+    from vectara.managers.agent_events import AgentEventMultiplexer
+    from vectara.utils.lab_helper import LabHelper
+
+    import asyncio
+    from concurrent.futures import Future
+
+    from . import (Job, PipelineRun, QueryQueriesResponse, QueryRequest, SearchCorporaParameters, GenerationParameters, ChatParameters,
+                   ChatStreamedResponse, QueryStreamedResponse, ChatFullResponse)
+    from .core.query_cache import QueryCache
+    from .core.rate_limiter import RateLimiter
 
 # Sentinel for optional parameters (matches Fern's convention)
 OMIT = typing.cast(typing.Any, ...)
 
 
+@dataclass
+class QueryResult:
+    """
+    The outcome of one of the queries run by query_many: index is the position of the request in the input.
+    """
+    index: int
+    request: QueryRequest
+    response: Optional[QueryQueriesResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _query_request(request: Union[QueryRequest, Dict[str, typing.Any]]) -> QueryRequest:
+    from . import QueryRequest
+
+    return request if isinstance(request, QueryRequest) else QueryRequest.model_validate(request)
+
+
+def _query_kwargs(request: QueryRequest) -> Dict[str, typing.Any]:
+    """
+    The arguments of queries.query for a request, leaving out the parameters it doesn't set.
+    """
+    kwargs: Dict[str, typing.Any] = {"query": request.query, "search": request.search}
+    for name in ("generation", "save_history", "intelligent_query_rewriting"):
+        value = getattr(request, name)
+        if value is not None:
+            kwargs[name] = value
+    return kwargs
+
+
 class ChatSession:
     def __init__(
             self,
@@ -56,10 +106,16 @@ class ChatSession:
             )
         return response
 
-    def chat_stream(self, query: str) -> Iterator[ChatStreamedResponse]:
+    def chat_stream(self, query: str, resumable: bool = False) -> Iterator[ChatStreamedResponse]:
         """
         Handles streaming chat queries using the session configuration.
+
+        :param query: the query for this turn.
+        :param resumable: reconnect if the connection is lost part way through, see ResumableStream. Only the turns
+        of an existing chat can be resumed, as reconnecting while creating the chat would create another one.
         """
+        if resumable and not self.chat_id:
+            raise TypeError("Only the turns of an existing chat can be resumed, the session has no chat_id yet")
         if not self.chat_id:
             response = self.client.chat_stream(
                 query=query,
@@ -68,6 +124,21 @@ class ChatSession:
                 chat=self.chat_config,
                 request_options=self.request_options,
             )
+        elif resumable:
+            from vectara.utils.resumable_stream import ResumableStream
+
+            chat_id = self.chat_id
+            response = ResumableStream(
+                lambda request_options: self.client.chats.with_raw_response.create_turns_stream(
+                    chat_id=chat_id,
+                    query=query,
+                    search=self.search,
+                    generation=self.generation,
+                    chat=self.chat_config,
+                    request_options=request_options,
+                ),
+                request_options=self.request_options,
+            )
         else:
             response = self.client.chats.create_turns_stream(
                 chat_id=self.chat_id,
@@ -81,18 +152,124 @@ class ChatSession:
         yield response
 
 
+class AsyncChatSession:
+    """
+    The asyncio equivalent of ChatSession, over an AsyncVectara client.
+    """
+
+    def __init__(
+            self,
+            client,
+            search: SearchCorporaParameters,
+            generation: Optional[GenerationParameters] = OMIT,
+            chat_id: Optional[str] = None,
+            chat_config: Optional[ChatParameters] = OMIT,
+            request_options: Optional[RequestOptions] = None,
+    ):
+        self.client = client
+        self.chat_id = chat_id
+        self.search = search
+        self.generation = generation
+        self.chat_config = chat_config
+        self.request_options = request_options
+
+    async def chat(self, query: str):
+        """
+        Handles chat queries using the session configuration.
+        """
+        if not self.chat_id:
+            response = await self.client.chat(
+                query=query,
+                search=self.search,
+                generation=self.generation,
+                chat=self.chat_config,
+                request_options=self.request_options,
+            )
+            self.chat_id = getattr(response, "chat_id", None)
+        else:
+            response = await self.client.chats.create_turns(
+                chat_id=self.chat_id,
+                query=query,
+                search=self.search,
+                generation=self.generation,
+                chat=self.chat_config,
+                request_options=self.request_options,
+            )
+        return response
+
+    async def chat_stream(self, query: str, resumable: bool = False) -> AsyncIterator[ChatStreamedResponse]:
+        """
+        Handles streaming chat queries using the session configuration, yielding the events of the turn. The chat
+        id is taken from the events of the first turn.
+
+        :param query: the query for this turn.
+        :param resumable: reconnect if the connection is lost part way through, see AsyncResumableStream. Only the
+        turns of an existing chat can be resumed, as reconnecting while creating the chat would create another one.
+        """
+        if resumable and not self.chat_id:
+            raise TypeError("Only the turns of an existing chat can be resumed, the session has no chat_id yet")
+        events: AsyncIterable[ChatStreamedResponse]
+        if not self.chat_id:
+            events = self.client.chat_stream(
+                query=query,
+                search=self.search,
+                generation=self.generation,
+                chat=self.chat_config,
+                request_options=self.request_options,
+            )
+        elif resumable:
+            from vectara.utils.resumable_stream import AsyncResumableStream
+
+            chat_id = self.chat_id
+            events = AsyncResumableStream(
+                lambda request_options: self.client.chats.with_raw_response.create_turns_stream(
+                    chat_id=chat_id,
+                    query=query,
+                    search=self.search,
+                    generation=self.generation,
+                    chat=self.chat_config,
+                    request_options=request_options,
+                ),
+                request_options=self.request_options,
+            )
+        else:
+            events = self.client.chats.create_turns_stream(
+                chat_id=self.chat_id,
+                query=query,
+                search=self.search,
+                generation=self.generation,
+                chat=self.chat_config,
+                request_options=self.request_options,
+            )
+
+        async for event in events:
+            if not self.chat_id and getattr(event, "chat_id", None):
+                self.chat_id = event.chat_id
+            yield event
+
+
 class Vectara(BaseVectara):
     """
     We extend the Vectara client, adding additional helper services.
+
+    Pass rate_limiter=RateLimiter(...) to pace requests client side; the same limiter may be shared between clients.
+    Pass retry_budget=RetryBudget(...) to cap retries across all requests, rather than only by max_retries.
+    Pass query_cache=QueryCache(...) to answer repeated queries from a client side cache.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, rate_limiter: Optional[RateLimiter] = None,
+                 retry_budget: Optional[RetryBudget] = None, query_cache: Optional[QueryCache] = None, **kwargs):
         super().__init__(*args, **kwargs)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._client_wrapper.httpx_client.rate_limiter = rate_limiter
+        self._client_wrapper.httpx_client.retry_budget = retry_budget
+        self._client_wrapper.httpx_client.query_cache = query_cache
         self.corpus_manager: Union[None, CorpusManager] = None
         self.upload_manager: Union[None, UploadManager] = None
         self.lab_helper: Union[None, LabHelper] = None
         self.document_manager: Union[None, DocumentManager] = None
+        self.corpus_scanner: Union[None, CorpusScanner] = None
+        self._job_waiter: Optional[JobWaiter] = None
 
     def set_corpus_manager(self, corpus_manager: CorpusManager) -> None:
         self.corpus_manager = corpus_manager
@@ -103,9 +280,43 @@ class Vectara(BaseVectara):
     def set_document_manager(self, document_manager: DocumentManager) -> None:
         self.document_manager = document_manager
 
+    def set_corpus_scanner(self, corpus_scanner: CorpusScanner) -> None:
+        self.corpus_scanner = corpus_scanner
+
     def set_lab_helper(self, lab_helper: LabHelper) -> None:
         self.lab_helper = lab_helper
 
+    @property
+    def job_waiter(self) -> JobWaiter:
+        if self._job_waiter is None:
+            from vectara.managers.jobs import JobWaiter
+
+            self._job_waiter = JobWaiter(self.jobs, self.pipeline_runs)
+        return self._job_waiter
+
+    def set_job_waiter(self, job_waiter: JobWaiter) -> None:
+        self._job_waiter = job_waiter
+
+    def wait_for_jobs(self, job_ids: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Future[Job]]:
+        """
+        Waits for corpus jobs to finish, returning a future per job id. See JobWaiter.wait_for_jobs.
+        """
+        return self.job_waiter.wait_for_jobs(job_ids, timeout=timeout)
+
+    def wait_for_pipeline_run(self, pipeline_key: str, run_id: str,
+                              timeout: Optional[float] = None) -> Future[PipelineRun]:
+        """
+        Waits for a pipeline run to finish, returning a future. See JobWaiter.wait_for_pipeline_run.
+        """
+        return self.job_waiter.wait_for_pipeline_run(pipeline_key, run_id, timeout=timeout)
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        """
+        Counters of the retries made by this client, including those refused by the retry budget.
+        """
+        return self._client_wrapper.httpx_client.retry_stats
+
     def query(
             self,
             *,
@@ -114,7 +325,7 @@ class Vectara(BaseVectara):
             generation: Optional[GenerationParameters] = OMIT,
             save_history: Optional[bool] = OMIT,
             request_options: Optional[RequestOptions] = None,
-    ) -> QueryFullResponse:
+    ) -> QueryQueriesResponse:
         """Convenience method for querying across corpora."""
         return self.queries.query(
             query=query,
@@ -124,6 +335,51 @@ class Vectara(BaseVectara):
             request_options=request_options,
         )
 
+    def query_many(
+            self,
+            requests: Iterable[Union[QueryRequest, Dict[str, typing.Any]]],
+            max_concurrency: int = 8,
+            ordered: bool = True,
+            request_options: Optional[RequestOptions] = None,
+    ) -> Iterator[QueryResult]:
+        """
+        Runs many queries concurrently over the client's connection pool, yielding a QueryResult for each.
+
+        A failed query does not stop the others, its error is reported in its QueryResult instead. The requests
+        are consumed lazily, so a large (or unbounded) iterable of queries can be replayed in constant memory:
+
+            requests = (QueryRequest(query=text, search=search) for text in historical_queries)
+            for result in client.query_many(requests, max_concurrency=32):
+                if result.succeeded:
+                    ...
+
+        Keep max_concurrency within the size of the connection pool (100 connections by default), see
+        make_httpx_client.
+
+        :param requests: the queries, as QueryRequest or the equivalent dicts.
+        :param max_concurrency: the number of queries in flight at once.
+        :param ordered: whether results are yielded in the order of the requests, rather than as they complete.
+        :param request_options: the request options of every query.
+        :return: a generator of QueryResult.
+        """
+        def run(item: typing.Tuple[int, QueryRequest]) -> QueryResult:
+            index, request = item
+            try:
+                response = self.queries.query(**_query_kwargs(request), request_options=request_options)
+                return QueryResult(index=index, request=request, response=response)
+            except Exception as e:
+                self.logger.warning(f"Query {index} failed: {e}")
+                return QueryResult(index=index, request=request, error=e)
+
+        from vectara.utils.concurrency import bounded_map
+
+        def results() -> Iterator[QueryResult]:
+            items = ((index, _query_request(request)) for index, request in enumerate(requests))
+            for _, future in bounded_map(run, items, workers=max_concurrency, ordered=ordered):
+                yield future.result()
+
+        return results()
+
     def query_stream(
             self,
             *,
@@ -132,8 +388,30 @@ class Vectara(BaseVectara):
             generation: Optional[GenerationParameters] = OMIT,
             save_history: Optional[bool] = OMIT,
             request_options: Optional[RequestOptions] = None,
+            resumable: bool = False,
+            max_reconnects: int = 3,
     ) -> Iterator[QueryStreamedResponse]:
-        """Convenience method for streaming query across corpora."""
+        """
+        Convenience method for streaming query across corpora.
+
+        With resumable=True, a stream interrupted by a network error is reconnected (up to max_reconnects times),
+        resuming from the last event if the server supports Last-Event-ID and otherwise replaying the query and
+        skipping the events already delivered. See ResumableStream.
+        """
+        if resumable:
+            from vectara.utils.resumable_stream import ResumableStream
+
+            return iter(ResumableStream(
+                lambda options: self.queries.with_raw_response.query_stream(
+                    query=query,
+                    search=search,
+                    generation=generation,
+                    save_history=save_history,
+                    request_options=options,
+                ),
+                request_options=request_options,
+                max_reconnects=max_reconnects,
+            ))
         return self.queries.query_stream(
             query=query,
             search=search,
@@ -172,7 +450,12 @@ class Vectara(BaseVectara):
             save_history: Optional[bool] = OMIT,
             request_options: Optional[RequestOptions] = None,
     ) -> Iterator[ChatStreamedResponse]:
-        """Convenience method for streaming chat."""
+        """
+        Convenience method for streaming chat.
+
+        Creating a chat can't be resumed, since reconnecting would create another chat. Resume the later turns of
+        the chat with ChatSession.chat_stream(query, resumable=True).
+        """
         return self.chats.create_stream(
             query=query,
             search=search,
@@ -202,4 +485,270 @@ class Vectara(BaseVectara):
 
 
 class AsyncVectara(AsyncBaseVectara):
-    pass
+    """
+    We extend the async Vectara client, adding additional helper services.
+
+    Pass rate_limiter=RateLimiter(...) to pace requests client side; the same limiter may be shared between clients.
+    Pass retry_budget=RetryBudget(...) to cap retries across all requests, rather than only by max_retries.
+    Pass query_cache=QueryCache(...) to answer repeated queries from a client side cache.
+    """
+
+    def __init__(self, *args, rate_limiter: Optional[RateLimiter] = None,
+                 retry_budget: Optional[RetryBudget] = None, query_cache: Optional[QueryCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._client_wrapper.httpx_client.rate_limiter = rate_limiter
+        self._client_wrapper.httpx_client.retry_budget = retry_budget
+        self._client_wrapper.httpx_client.query_cache = query_cache
+        self._corpus_manager: Optional[AsyncCorpusManager] = None
+        self._upload_manager: Optional[AsyncUploadManager] = None
+        self._document_manager: Optional[AsyncDocumentManager] = None
+        self._corpus_scanner: Optional[AsyncCorpusScanner] = None
+        self._job_waiter: Optional[AsyncJobWaiter] = None
+        self._agent_multiplexer: Optional[AgentEventMultiplexer] = None
+
+    @property
+    def corpus_manager(self) -> AsyncCorpusManager:
+        if self._corpus_manager is None:
+            from vectara.managers.corpus import AsyncCorpusManager
+
+            self._corpus_manager = AsyncCorpusManager(self.corpora)
+        return self._corpus_manager
+
+    @property
+    def upload_manager(self) -> AsyncUploadManager:
+        if self._upload_manager is None:
+            from vectara.managers.upload import AsyncUploadManager
+
+            self._upload_manager = AsyncUploadManager(self.upload, self.document_manager)
+        return self._upload_manager
+
+    @property
+    def document_manager(self) -> AsyncDocumentManager:
+        if self._document_manager is None:
+            from vectara.managers.document import AsyncDocumentManager
+
+            self._document_manager = AsyncDocumentManager(self.documents)
+        return self._document_manager
+
+    @property
+    def corpus_scanner(self) -> AsyncCorpusScanner:
+        if self._corpus_scanner is None:
+            from vectara.managers.scan import AsyncCorpusScanner
+
+            self._corpus_scanner = AsyncCorpusScanner(self.documents, self.corpora)
+        return self._corpus_scanner
+
+    def set_corpus_manager(self, corpus_manager: AsyncCorpusManager) -> None:
+        self._corpus_manager = corpus_manager
+
+    def set_upload_manager(self, upload_manager: AsyncUploadManager) -> None:
+        self._upload_manager = upload_manager
+
+    def set_document_manager(self, document_manager: AsyncDocumentManager) -> None:
+        self._document_manager = document_manager
+
+    def set_corpus_scanner(self, corpus_scanner: AsyncCorpusScanner) -> None:
+        self._corpus_scanner = corpus_scanner
+
+    @property
+    def job_waiter(self) -> AsyncJobWaiter:
+        if self._job_waiter is None:
+            from vectara.managers.jobs import AsyncJobWaiter
+
+            self._job_waiter = AsyncJobWaiter(self.jobs, self.pipeline_runs)
+        return self._job_waiter
+
+    def set_job_waiter(self, job_waiter: AsyncJobWaiter) -> None:
+        self._job_waiter = job_waiter
+
+    @property
+    def agent_multiplexer(self) -> AgentEventMultiplexer:
+        if self._agent_multiplexer is None:
+            from vectara.managers.agent_events import AgentEventMultiplexer
+
+            self._agent_multiplexer = AgentEventMultiplexer(self.agent_events)
+        return self._agent_multiplexer
+
+    def set_agent_multiplexer(self, agent_multiplexer: AgentEventMultiplexer) -> None:
+        self._agent_multiplexer = agent_multiplexer
+
+    def wait_for_jobs(self, job_ids: Iterable[str],
+                      timeout: Optional[float] = None) -> Dict[str, asyncio.Future[Job]]:
+        """
+        Waits for corpus jobs to finish, returning an asyncio future per job id. See JobWaiter.wait_for_jobs.
+        """
+        return self.job_waiter.wait_for_jobs(job_ids, timeout=timeout)
+
+    def wait_for_pipeline_run(self, pipeline_key: str, run_id: str,
+                              timeout: Optional[float] = None) -> asyncio.Future[PipelineRun]:
+        """
+        Waits for a pipeline run to finish, returning an asyncio future. See JobWaiter.wait_for_pipeline_run.
+        """
+        return self.job_waiter.wait_for_pipeline_run(pipeline_key, run_id, timeout=timeout)
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        """
+        Counters of the retries made by this client, including those refused by the retry budget.
+        """
+        return self._client_wrapper.httpx_client.retry_stats
+
+    async def query(
+            self,
+            *,
+            query: str,
+            search: SearchCorporaParameters,
+            generation: Optional[GenerationParameters] = OMIT,
+            save_history: Optional[bool] = OMIT,
+            request_options: Optional[RequestOptions] = None,
+    ) -> QueryQueriesResponse:
+        """Convenience method for querying across corpora."""
+        return await self.queries.query(
+            query=query,
+            search=search,
+            generation=generation,
+            save_history=save_history,
+            request_options=request_options,
+        )
+
+    def query_many(
+            self,
+            requests: Union[Iterable[Union[QueryRequest, Dict[str, typing.Any]]],
+                            AsyncIterable[Union[QueryRequest, Dict[str, typing.Any]]]],
+            max_concurrency: int = 8,
+            ordered: bool = True,
+            request_options: Optional[RequestOptions] = None,
+    ) -> AsyncIterator[QueryResult]:
+        """
+        Runs many queries concurrently, yielding a QueryResult for each. See Vectara.query_many.
+
+            async for result in client.query_many(requests, max_concurrency=64):
+                ...
+        """
+        async def run(item: typing.Tuple[int, QueryRequest]) -> QueryResult:
+            index, request = item
+            try:
+                response = await self.queries.query(**_query_kwargs(request), request_options=request_options)
+                return QueryResult(index=index, request=request, response=response)
+            except Exception as e:
+                self.logger.warning(f"Query {index} failed: {e}")
+                return QueryResult(index=index, request=request, error=e)
+
+        async def items() -> AsyncIterator[typing.Tuple[int, QueryRequest]]:
+            index = 0
+            if isinstance(requests, AsyncIterable):
+                async for request in requests:
+                    yield index, _query_request(request)
+                    index += 1
+            else:
+                for request in requests:
+                    yield index, _query_request(request)
+                    index += 1
+
+        from vectara.utils.concurrency import async_bounded_map
+
+        async def results() -> AsyncIterator[QueryResult]:
+            async for _, task in async_bounded_map(run, items(), concurrency=max_concurrency, ordered=ordered):
+                yield task.result()
+
+        return results()
+
+    def query_stream(
+            self,
+            *,
+            query: str,
+            search: SearchCorporaParameters,
+            generation: Optional[GenerationParameters] = OMIT,
+            save_history: Optional[bool] = OMIT,
+            request_options: Optional[RequestOptions] = None,
+            resumable: bool = False,
+            max_reconnects: int = 3,
+    ) -> AsyncIterator[QueryStreamedResponse]:
+        """
+        Convenience method for streaming query across corpora, see Vectara.query_stream.
+
+            async for event in client.query_stream(query="...", search=search):
+                ...
+        """
+        if resumable:
+            from vectara.utils.resumable_stream import AsyncResumableStream
+
+            return AsyncResumableStream(
+                lambda options: self.queries.with_raw_response.query_stream(
+                    query=query,
+                    search=search,
+                    generation=generation,
+                    save_history=save_history,
+                    request_options=options,
+                ),
+                request_options=request_options,
+                max_reconnects=max_reconnects,
+            ).__aiter__()
+        return self.queries.query_stream(
+            query=query,
+            search=search,
+            generation=generation,
+            save_history=save_history,
+            request_options=request_options,
+        )
+
+    async def chat(
+            self,
+            *,
+            query: str,
+            search: SearchCorporaParameters,
+            generation: Optional[GenerationParameters] = OMIT,
+            chat: Optional[ChatParameters] = OMIT,
+            save_history: Optional[bool] = OMIT,
+            request_options: Optional[RequestOptions] = None,
+    ) -> ChatFullResponse:
+        """Convenience method for creating a chat."""
+        return await self.chats.create(
+            query=query,
+            search=search,
+            generation=generation,
+            chat=chat,
+            save_history=save_history,
+            request_options=request_options,
+        )
+
+    def chat_stream(
+            self,
+            *,
+            query: str,
+            search: SearchCorporaParameters,
+            generation: Optional[GenerationParameters] = OMIT,
+            chat: Optional[ChatParameters] = OMIT,
+            save_history: Optional[bool] = OMIT,
+            request_options: Optional[RequestOptions] = None,
+    ) -> AsyncIterator[ChatStreamedResponse]:
+        """
+        Convenience method for streaming chat, see Vectara.chat_stream.
+        """
+        return self.chats.create_stream(
+            query=query,
+            search=search,
+            generation=generation,
+            chat=chat,
+            save_history=save_history,
+            request_options=request_options,
+        )
+
+    def create_chat_session(
+            self,
+            search: SearchCorporaParameters,
+            generation: Optional[GenerationParameters] = OMIT,
+            chat_config: Optional[ChatParameters] = OMIT,
+            request_options: Optional[RequestOptions] = None,
+    ) -> AsyncChatSession:
+        """
+        Creates and returns an `AsyncChatSession` object with the specified configuration.
+        """
+        return AsyncChatSession(
+            client=self,
+            search=search,
+            generation=generation,
+            chat_config=chat_config,
+            request_options=request_options,
+        )
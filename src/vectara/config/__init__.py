@@ -1,2 +1,2 @@
 from .config import (BaseConfigLoader, HomeConfigLoader, BaseAuthConfig,
-                     ClientConfig, OAuth2AuthConfig, ApiKeyAuthConfig, EnvConfigLoader, PathConfigLoader)
\ No newline at end of file
+                     ClientConfig, ConnectionPoolConfig, OAuth2AuthConfig, ApiKeyAuthConfig, EnvConfigLoader, PathConfigLoader)
\ No newline at end of file
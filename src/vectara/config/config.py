@@ -4,7 +4,6 @@ from typing import Optional, Union, Any, List, Dict
 from pydantic import BaseModel, Discriminator, Tag
 from typing_extensions import Annotated
 import json
-import yaml
 from os import path, sep, getenv
 from pathlib import Path
 
@@ -62,6 +61,21 @@ def get_discriminator_value(v: Any) -> str:
 
 
 
+class ConnectionPoolConfig(BaseModel):
+    """
+    Tuning of the HTTP connection pool used by the client, the defaults are those of httpx.
+
+    Raise max_connections and max_keepalive_connections to match the number of concurrent requests, and enable
+    http2 to multiplex them over a few connections instead (this requires the h2 package).
+    """
+
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0
+    http2: bool = False
+    connect_timeout: Optional[float] = None
+
+
 class ClientConfig(BaseModel):
     """
     Wrapper for all configuration needed to work with Vectara.
@@ -71,6 +85,7 @@ class ClientConfig(BaseModel):
     api_endpoint: Optional[str] = None
     auth_endpoint: Optional[str] = None
     verify_ssl: bool = True
+    connection_pool: Optional[ConnectionPoolConfig] = None
 
     auth: Annotated[
         Union[
@@ -101,6 +116,8 @@ class BaseConfigLoader(ABC):
 
     def _load_yaml_full(self, final_config_path: Path) -> Dict:
         if final_config_path.exists() and final_config_path.is_file():
+            import yaml
+
             with open(final_config_path, 'r') as yaml_stream:
                 return yaml.safe_load(yaml_stream)
         else:
@@ -130,6 +147,8 @@ class BaseConfigLoader(ABC):
             creds = {}
         creds[self.profile] = client_config.model_dump()
 
+        import yaml
+
         with open(final_config_path, 'w') as yaml_stream:
             yaml.safe_dump(creds, yaml_stream)
 
@@ -137,6 +156,8 @@ class BaseConfigLoader(ABC):
         creds = self._load_yaml_full(final_config_path)
         del creds[self.profile]
 
+        import yaml
+
         with open(final_config_path, 'w') as yaml_stream:
             yaml.safe_dump(creds, yaml_stream)
 
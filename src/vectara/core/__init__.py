@@ -8,6 +8,7 @@ from importlib import import_module
 if typing.TYPE_CHECKING:
     from .api_error import ApiError
     from .client_wrapper import AsyncClientWrapper, BaseClientWrapper, SyncClientWrapper
+    from .connection_pool import ConnectionStats, make_async_httpx_client, make_httpx_client
     from .datetime_utils import Rfc2822DateTime, parse_rfc2822_datetime, serialize_datetime
     from .file import File, convert_file_dict_to_httpx_tuples, with_content_type
     from .http_client import AsyncHttpClient, HttpClient
@@ -25,7 +26,10 @@ if typing.TYPE_CHECKING:
         universal_root_validator,
         update_forward_refs,
     )
+    from .query_cache import CacheBackend, CacheStats, DiskCacheBackend, MemoryCacheBackend, QueryCache
     from .query_encoder import encode_query
+    from .rate_limiter import RateLimiter
+    from .retry_budget import RetryBudget, RetryStats
     from .remove_none_from_dict import remove_none_from_dict
     from .request_options import RequestOptions
     from .serialization import FieldMetadata, convert_and_respect_annotation_metadata
@@ -36,6 +40,10 @@ _dynamic_imports: typing.Dict[str, str] = {
     "AsyncHttpResponse": ".http_response",
     "AsyncPager": ".pagination",
     "BaseClientWrapper": ".client_wrapper",
+    "CacheBackend": ".query_cache",
+    "CacheStats": ".query_cache",
+    "ConnectionStats": ".connection_pool",
+    "DiskCacheBackend": ".query_cache",
     "ConsoleLogger": ".logging",
     "FieldMetadata": ".serialization",
     "File": ".file",
@@ -46,7 +54,12 @@ _dynamic_imports: typing.Dict[str, str] = {
     "LogConfig": ".logging",
     "LogLevel": ".logging",
     "Logger": ".logging",
+    "MemoryCacheBackend": ".query_cache",
     "ParsingError": ".parse_error",
+    "QueryCache": ".query_cache",
+    "RateLimiter": ".rate_limiter",
+    "RetryBudget": ".retry_budget",
+    "RetryStats": ".retry_budget",
     "RequestOptions": ".request_options",
     "Rfc2822DateTime": ".datetime_utils",
     "SyncClientWrapper": ".client_wrapper",
@@ -59,6 +72,8 @@ _dynamic_imports: typing.Dict[str, str] = {
     "encode_path_param": ".jsonable_encoder",
     "encode_query": ".query_encoder",
     "jsonable_encoder": ".jsonable_encoder",
+    "make_async_httpx_client": ".connection_pool",
+    "make_httpx_client": ".connection_pool",
     "parse_obj_as": ".pydantic_utilities",
     "parse_rfc2822_datetime": ".datetime_utils",
     "remove_none_from_dict": ".remove_none_from_dict",
@@ -98,7 +113,11 @@ __all__ = [
     "AsyncHttpResponse",
     "AsyncPager",
     "BaseClientWrapper",
+    "CacheBackend",
+    "CacheStats",
+    "ConnectionStats",
     "ConsoleLogger",
+    "DiskCacheBackend",
     "FieldMetadata",
     "File",
     "HttpClient",
@@ -108,8 +127,13 @@ __all__ = [
     "LogConfig",
     "LogLevel",
     "Logger",
+    "MemoryCacheBackend",
     "ParsingError",
+    "QueryCache",
+    "RateLimiter",
     "RequestOptions",
+    "RetryBudget",
+    "RetryStats",
     "Rfc2822DateTime",
     "SyncClientWrapper",
     "SyncPager",
@@ -121,6 +145,8 @@ __all__ = [
     "encode_path_param",
     "encode_query",
     "jsonable_encoder",
+    "make_async_httpx_client",
+    "make_httpx_client",
     "parse_obj_as",
     "parse_rfc2822_datetime",
     "remove_none_from_dict",
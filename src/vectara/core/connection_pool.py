@@ -0,0 +1,157 @@
+import threading
+import typing
+
+import httpx
+
+# The httpcore trace event emitted once a new connection has been established.
+_CONNECTED = "connection.connect_tcp.complete"
+
+
+class ConnectionStats:
+    """
+    Counts the requests sent by an httpx client and the connections it opened to send them, showing how well
+    connections are reused. A low reuse ratio under load suggests the pool or its keep-alive expiry is too small.
+
+        stats = ConnectionStats()
+        httpx_client = stats.instrument(httpx.Client())
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def reused(self) -> int:
+        """
+        The number of requests sent over a connection which was already open.
+        """
+        return max(self.requests - self.connections, 0)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+    def _record(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self._record("requests")
+        existing = request.extensions.get("trace")
+
+        def trace(event_name: str, info: typing.Dict[str, typing.Any]) -> None:
+            if event_name == _CONNECTED:
+                self._record("connections")
+            if existing is not None:
+                existing(event_name, info)
+
+        request.extensions["trace"] = trace
+
+    async def _on_async_request(self, request: httpx.Request) -> None:
+        self._record("requests")
+        existing = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: typing.Dict[str, typing.Any]) -> None:
+            if event_name == _CONNECTED:
+                self._record("connections")
+            if existing is not None:
+                await existing(event_name, info)
+
+        request.extensions["trace"] = trace
+
+    def instrument(self, client: typing.Union[httpx.Client, httpx.AsyncClient]) -> typing.Any:
+        """
+        Adds the hooks which count the requests and connections of the client, returning the client.
+        """
+        hooks = client.event_hooks
+        if isinstance(client, httpx.AsyncClient):
+            hooks["request"] = [*hooks.get("request", []), self._on_async_request]
+        else:
+            hooks["request"] = [*hooks.get("request", []), self._on_request]
+        client.event_hooks = hooks
+        return client
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reused": self.reused,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+
+
+def _client_kwargs(
+    timeout: typing.Optional[float],
+    max_connections: typing.Optional[int],
+    max_keepalive_connections: typing.Optional[int],
+    keepalive_expiry: typing.Optional[float],
+    http2: bool,
+    connect_timeout: typing.Optional[float],
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "timeout": httpx.Timeout(timeout, connect=connect_timeout if connect_timeout is not None else timeout),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        "http2": http2,
+    }
+
+
+def make_httpx_client(
+    *,
+    timeout: typing.Optional[float] = 60,
+    max_connections: typing.Optional[int] = 100,
+    max_keepalive_connections: typing.Optional[int] = 20,
+    keepalive_expiry: typing.Optional[float] = 5.0,
+    http2: bool = False,
+    connect_timeout: typing.Optional[float] = None,
+    stats: typing.Optional[ConnectionStats] = None,
+    **kwargs: typing.Any,
+) -> httpx.Client:
+    """
+    Builds the httpx client used by Vectara, with a tuned connection pool. The defaults are those of httpx.
+
+    :param timeout: the timeout of each request in seconds.
+    :param max_connections: the most connections open at once, or None for no limit.
+    :param max_keepalive_connections: the most idle connections kept open for reuse, or None for no limit.
+    :param keepalive_expiry: how many seconds an idle connection is kept open.
+    :param http2: whether to use HTTP/2, which multiplexes concurrent requests over one connection. This requires
+                  the h2 package (pip install vectara[http2]).
+    :param connect_timeout: the timeout to establish a connection, defaulting to timeout.
+    :param stats: counts the requests and connections of the client.
+    :param kwargs: passed through to httpx.Client, e.g. verify.
+    """
+    client = httpx.Client(
+        **_client_kwargs(timeout, max_connections, max_keepalive_connections, keepalive_expiry, http2, connect_timeout),
+        **kwargs,
+    )
+    return stats.instrument(client) if stats is not None else client
+
+
+def make_async_httpx_client(
+    *,
+    timeout: typing.Optional[float] = 60,
+    max_connections: typing.Optional[int] = 100,
+    max_keepalive_connections: typing.Optional[int] = 20,
+    keepalive_expiry: typing.Optional[float] = 5.0,
+    http2: bool = False,
+    connect_timeout: typing.Optional[float] = None,
+    stats: typing.Optional[ConnectionStats] = None,
+    **kwargs: typing.Any,
+) -> httpx.AsyncClient:
+    """
+    The httpx.AsyncClient equivalent of make_httpx_client.
+    """
+    client = httpx.AsyncClient(
+        **_client_kwargs(timeout, max_connections, max_keepalive_connections, keepalive_expiry, http2, connect_timeout),
+        **kwargs,
+    )
+    return stats.instrument(client) if stats is not None else client
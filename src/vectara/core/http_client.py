@@ -11,9 +11,14 @@ from random import random
 import httpx
 from .file import File, convert_file_dict_to_httpx_tuples
 from .force_multipart import FORCE_MULTIPART
+from .json_body import encode_json_body
 from .jsonable_encoder import jsonable_encoder
 from .logging import LogConfig, Logger, create_logger
+from .query_cache import QueryCache
 from .query_encoder import encode_query
+from .rate_limiter import RateLimiter
+from .retry_budget import CONNECTION_ERROR, RetryBudget, RetryStats
+from .single_flight import AsyncSingleFlight, SingleFlight, coalesce_key
 from .remove_none_from_dict import remove_none_from_dict as remove_none_from_dict
 from .request_options import RequestOptions
 from httpx._types import RequestFiles
@@ -129,6 +134,25 @@ def _should_retry(response: httpx.Response) -> bool:
     return response.status_code >= 500 or response.status_code in retryable_400s
 
 
+def _take_retry(
+    retries: int,
+    max_retries: int,
+    cause: typing.Union[int, str],
+    retry_budget: typing.Optional[RetryBudget],
+    retry_stats: RetryStats,
+) -> bool:
+    """
+    Decide whether a failed attempt may be retried, spending from the retry budget and counting the cause if so.
+    """
+    if retries >= max_retries:
+        return False
+    if retry_budget is not None and not retry_budget.try_retry():
+        retry_stats.record_budget_exhausted()
+        return False
+    retry_stats.record_retry(cause)
+    return True
+
+
 _SENSITIVE_HEADERS = frozenset(
     {
         "authorization",
@@ -151,6 +175,22 @@ _SENSITIVE_HEADERS = frozenset(
 )
 
 
+def _request_timeout(
+    httpx_client: typing.Union[httpx.Client, httpx.AsyncClient], timeout: typing.Optional[float]
+) -> typing.Union[httpx.Timeout, float, None]:
+    """
+    The timeout of a single request. Passing a bare number to httpx would replace every timeout of the client, so the
+    connect timeout configured on the client (see make_httpx_client) is kept, bounded by the request's own timeout.
+    """
+    client_timeout = getattr(httpx_client, "timeout", None)
+    if not isinstance(client_timeout, httpx.Timeout):
+        return timeout
+    connect = client_timeout.connect
+    if timeout is not None and (connect is None or timeout < connect):
+        connect = timeout
+    return httpx.Timeout(timeout, connect=connect)
+
+
 def _redact_headers(headers: typing.Dict[str, str]) -> typing.Dict[str, str]:
     return {k: ("[REDACTED]" if k.lower() in _SENSITIVE_HEADERS else v) for k, v in headers.items()}
 
@@ -273,6 +313,9 @@ class HttpClient:
         base_url: typing.Optional[typing.Callable[[], str]] = None,
         base_max_retries: int = 2,
         logging_config: typing.Optional[typing.Union[LogConfig, Logger]] = None,
+        rate_limiter: typing.Optional[RateLimiter] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        query_cache: typing.Optional[QueryCache] = None,
     ):
         self.base_url = base_url
         self.base_timeout = base_timeout
@@ -280,6 +323,13 @@ class HttpClient:
         self.base_max_retries = base_max_retries
         self.httpx_client = httpx_client
         self.logger = create_logger(logging_config)
+        self.rate_limiter = rate_limiter
+        self.retry_budget = retry_budget
+        self.retry_stats = RetryStats()
+        self.query_cache = query_cache
+        # Identifies the caller in the query cache's keys, see QueryCache.match.
+        self.cache_identity: typing.Optional[str] = None
+        self.single_flight = SingleFlight()
 
     def get_base_url(self, maybe_base_url: typing.Optional[str]) -> str:
         base_url = maybe_base_url
@@ -319,7 +369,16 @@ class HttpClient:
             else self.base_timeout()
         )
 
-        json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
+        # Bodies made of pydantic models are serialized to JSON once, directly, and sent as the content.
+        json_content = (
+            encode_json_body(json_body=json, request_options=request_options, omit=omit)
+            if data is None and content is None and files is None and not force_multipart
+            else None
+        )
+        if json_content is not None:
+            json_body, data_body, content = None, None, json_content
+        else:
+            json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
 
         request_files: typing.Optional[RequestFiles] = (
             convert_file_dict_to_httpx_tuples(remove_omit_from_dict(remove_none_from_dict(files), omit))
@@ -356,6 +415,7 @@ class HttpClient:
         _request_headers = jsonable_encoder(
             remove_none_from_dict(
                 {
+                    **({"content-type": "application/json"} if json_content is not None else {}),
                     **self.base_headers(),
                     **(headers if headers is not None else {}),
                     **(request_options.get("additional_headers", {}) or {} if request_options is not None else {}),
@@ -378,56 +438,91 @@ class HttpClient:
             else self.base_max_retries
         )
 
-        try:
-            response = self.httpx_client.request(
-                method=method,
-                url=_request_url,
-                headers=_request_headers,
-                params=_encoded_params if _encoded_params else None,
-                json=json_body,
-                data=data_body,
-                content=content,
-                files=request_files,
-                timeout=timeout,
+        query_cache = self.query_cache
+        cache_request = (
+            query_cache.match(
+                method,
+                path,
+                _encoded_params,
+                content if json_content is not None else json_body,
+                _request_headers,
+                identity=self.cache_identity,
             )
-        except (httpx.ConnectError, httpx.RemoteProtocolError):
-            if retries < max_retries:
-                time.sleep(_retry_timeout_from_retries(retries=retries))
-                return self.request(
-                    path=path,
-                    method=method,
-                    base_url=base_url,
-                    params=params,
-                    json=json,
-                    data=data,
-                    content=content,
-                    files=files,
-                    headers=headers,
-                    request_options=request_options,
-                    retries=retries + 1,
-                    omit=omit,
-                    force_multipart=force_multipart,
-                )
-            raise
-
-        if _should_retry(response=response):
-            if retries < max_retries:
-                time.sleep(_retry_timeout(response=response, retries=retries))
-                return self.request(
-                    path=path,
-                    method=method,
-                    base_url=base_url,
-                    params=params,
-                    json=json,
-                    data=data,
-                    content=content,
-                    files=files,
-                    headers=headers,
-                    request_options=request_options,
-                    retries=retries + 1,
-                    omit=omit,
-                    force_multipart=force_multipart,
-                )
+            if query_cache is not None
+            else None
+        )
+        if query_cache is not None and cache_request is not None:
+            cached = query_cache.get(cache_request, httpx.Request(method, _request_url, params=_encoded_params or None))
+            if cached is not None:
+                return cached
+
+        def send() -> httpx.Response:
+            nonlocal retries
+            self.retry_stats.record_request()
+            if self.retry_budget is not None:
+                self.retry_budget.record_request()
+
+            # The request is only encoded once, each retry re-sends it as is.
+            while True:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+
+                try:
+                    response = self.httpx_client.request(
+                        method=method,
+                        url=_request_url,
+                        headers=_request_headers,
+                        params=_encoded_params if _encoded_params else None,
+                        json=json_body,
+                        data=data_body,
+                        content=content,
+                        files=request_files,
+                        timeout=_request_timeout(self.httpx_client, timeout),
+                    )
+                except (httpx.ConnectError, httpx.RemoteProtocolError):
+                    if _take_retry(retries, max_retries, CONNECTION_ERROR, self.retry_budget, self.retry_stats):
+                        time.sleep(_retry_timeout_from_retries(retries=retries))
+                        retries += 1
+                        continue
+                    raise
+
+                # The rate limiter pauses every caller on a 429, and the next acquire waits the pause out, so the
+                # retry only backs off itself when the limiter did not.
+                paused = self.rate_limiter.update(response) if self.rate_limiter is not None else 0.0
+
+                if _should_retry(response=response) and _take_retry(
+                    retries, max_retries, response.status_code, self.retry_budget, self.retry_stats
+                ):
+                    if paused <= 0:
+                        time.sleep(_retry_timeout(response=response, retries=retries))
+                    retries += 1
+                    continue
+
+                break
+
+            if query_cache is not None:
+                if cache_request is not None:
+                    query_cache.put(cache_request, response)
+                else:
+                    query_cache.written(method, path)
+            return response
+
+        # Identical requests made at the same time share a single call when the caller opts in.
+        _coalesce_key = (
+            coalesce_key(
+                method,
+                _request_url,
+                _encoded_params,
+                content if content is not None else (json_body if json_body is not None else data_body),
+                _request_headers,
+            )
+            if request_options is not None and request_options.get("coalesce") and not request_files
+            else None
+        )
+        if _coalesce_key is not None:
+            response = self.single_flight.do(_coalesce_key, send)
+        else:
+            response = send()
 
         if self.logger.is_debug():
             if 200 <= response.status_code < 400:
@@ -488,7 +583,16 @@ class HttpClient:
         if (request_files is None or len(request_files) == 0) and force_multipart:
             request_files = FORCE_MULTIPART
 
-        json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
+        # Bodies made of pydantic models are serialized to JSON once, directly, and sent as the content.
+        json_content = (
+            encode_json_body(json_body=json, request_options=request_options, omit=omit)
+            if data is None and content is None and files is None and not force_multipart
+            else None
+        )
+        if json_content is not None:
+            json_body, data_body, content = None, None, json_content
+        else:
+            json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
 
         data_body = _maybe_filter_none_from_multipart_data(data_body, request_files, force_multipart)
 
@@ -516,6 +620,7 @@ class HttpClient:
         _request_headers = jsonable_encoder(
             remove_none_from_dict(
                 {
+                    **({"content-type": "application/json"} if json_content is not None else {}),
                     **self.base_headers(),
                     **(headers if headers is not None else {}),
                     **(request_options.get("additional_headers", {}) if request_options is not None else {}),
@@ -531,6 +636,9 @@ class HttpClient:
                 headers=_redact_headers(_request_headers),
             )
 
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
         with self.httpx_client.stream(
             method=method,
             url=_request_url,
@@ -540,8 +648,10 @@ class HttpClient:
             data=data_body,
             content=content,
             files=request_files,
-            timeout=timeout,
+            timeout=_request_timeout(self.httpx_client, timeout),
         ) as stream:
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(stream)
             yield stream
 
 
@@ -556,6 +666,9 @@ class AsyncHttpClient:
         base_max_retries: int = 2,
         async_base_headers: typing.Optional[typing.Callable[[], typing.Awaitable[typing.Dict[str, str]]]] = None,
         logging_config: typing.Optional[typing.Union[LogConfig, Logger]] = None,
+        rate_limiter: typing.Optional[RateLimiter] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        query_cache: typing.Optional[QueryCache] = None,
     ):
         self.base_url = base_url
         self.base_timeout = base_timeout
@@ -564,6 +677,13 @@ class AsyncHttpClient:
         self.async_base_headers = async_base_headers
         self.httpx_client = httpx_client
         self.logger = create_logger(logging_config)
+        self.rate_limiter = rate_limiter
+        self.retry_budget = retry_budget
+        self.retry_stats = RetryStats()
+        self.query_cache = query_cache
+        # Identifies the caller in the query cache's keys, see QueryCache.match.
+        self.cache_identity: typing.Optional[str] = None
+        self.single_flight = AsyncSingleFlight()
 
     async def _get_headers(self) -> typing.Dict[str, str]:
         if self.async_base_headers is not None:
@@ -617,7 +737,16 @@ class AsyncHttpClient:
         if (request_files is None or len(request_files) == 0) and force_multipart:
             request_files = FORCE_MULTIPART
 
-        json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
+        # Bodies made of pydantic models are serialized to JSON once, directly, and sent as the content.
+        json_content = (
+            encode_json_body(json_body=json, request_options=request_options, omit=omit)
+            if data is None and content is None and files is None and not force_multipart
+            else None
+        )
+        if json_content is not None:
+            json_body, data_body, content = None, None, json_content
+        else:
+            json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
 
         data_body = _maybe_filter_none_from_multipart_data(data_body, request_files, force_multipart)
 
@@ -648,6 +777,7 @@ class AsyncHttpClient:
         _request_headers = jsonable_encoder(
             remove_none_from_dict(
                 {
+                    **({"content-type": "application/json"} if json_content is not None else {}),
                     **_headers,
                     **(headers if headers is not None else {}),
                     **(request_options.get("additional_headers", {}) or {} if request_options is not None else {}),
@@ -670,56 +800,91 @@ class AsyncHttpClient:
             else self.base_max_retries
         )
 
-        try:
-            response = await self.httpx_client.request(
-                method=method,
-                url=_request_url,
-                headers=_request_headers,
-                params=_encoded_params if _encoded_params else None,
-                json=json_body,
-                data=data_body,
-                content=content,
-                files=request_files,
-                timeout=timeout,
+        query_cache = self.query_cache
+        cache_request = (
+            query_cache.match(
+                method,
+                path,
+                _encoded_params,
+                content if json_content is not None else json_body,
+                _request_headers,
+                identity=self.cache_identity,
             )
-        except (httpx.ConnectError, httpx.RemoteProtocolError):
-            if retries < max_retries:
-                await asyncio.sleep(_retry_timeout_from_retries(retries=retries))
-                return await self.request(
-                    path=path,
-                    method=method,
-                    base_url=base_url,
-                    params=params,
-                    json=json,
-                    data=data,
-                    content=content,
-                    files=files,
-                    headers=headers,
-                    request_options=request_options,
-                    retries=retries + 1,
-                    omit=omit,
-                    force_multipart=force_multipart,
-                )
-            raise
-
-        if _should_retry(response=response):
-            if retries < max_retries:
-                await asyncio.sleep(_retry_timeout(response=response, retries=retries))
-                return await self.request(
-                    path=path,
-                    method=method,
-                    base_url=base_url,
-                    params=params,
-                    json=json,
-                    data=data,
-                    content=content,
-                    files=files,
-                    headers=headers,
-                    request_options=request_options,
-                    retries=retries + 1,
-                    omit=omit,
-                    force_multipart=force_multipart,
-                )
+            if query_cache is not None
+            else None
+        )
+        if query_cache is not None and cache_request is not None:
+            cached = query_cache.get(cache_request, httpx.Request(method, _request_url, params=_encoded_params or None))
+            if cached is not None:
+                return cached
+
+        async def send() -> httpx.Response:
+            nonlocal retries
+            self.retry_stats.record_request()
+            if self.retry_budget is not None:
+                self.retry_budget.record_request()
+
+            # The request is only encoded once, each retry re-sends it as is.
+            while True:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async()
+
+                try:
+                    response = await self.httpx_client.request(
+                        method=method,
+                        url=_request_url,
+                        headers=_request_headers,
+                        params=_encoded_params if _encoded_params else None,
+                        json=json_body,
+                        data=data_body,
+                        content=content,
+                        files=request_files,
+                        timeout=_request_timeout(self.httpx_client, timeout),
+                    )
+                except (httpx.ConnectError, httpx.RemoteProtocolError):
+                    if _take_retry(retries, max_retries, CONNECTION_ERROR, self.retry_budget, self.retry_stats):
+                        await asyncio.sleep(_retry_timeout_from_retries(retries=retries))
+                        retries += 1
+                        continue
+                    raise
+
+                # The rate limiter pauses every caller on a 429, and the next acquire waits the pause out, so the
+                # retry only backs off itself when the limiter did not.
+                paused = self.rate_limiter.update(response) if self.rate_limiter is not None else 0.0
+
+                if _should_retry(response=response) and _take_retry(
+                    retries, max_retries, response.status_code, self.retry_budget, self.retry_stats
+                ):
+                    if paused <= 0:
+                        await asyncio.sleep(_retry_timeout(response=response, retries=retries))
+                    retries += 1
+                    continue
+
+                break
+
+            if query_cache is not None:
+                if cache_request is not None:
+                    query_cache.put(cache_request, response)
+                else:
+                    query_cache.written(method, path)
+            return response
+
+        # Identical requests made at the same time share a single call when the caller opts in.
+        _coalesce_key = (
+            coalesce_key(
+                method,
+                _request_url,
+                _encoded_params,
+                content if content is not None else (json_body if json_body is not None else data_body),
+                _request_headers,
+            )
+            if request_options is not None and request_options.get("coalesce") and not request_files
+            else None
+        )
+        if _coalesce_key is not None:
+            response = await self.single_flight.do(_coalesce_key, send)
+        else:
+            response = await send()
 
         if self.logger.is_debug():
             if 200 <= response.status_code < 400:
@@ -780,7 +945,16 @@ class AsyncHttpClient:
         if (request_files is None or len(request_files) == 0) and force_multipart:
             request_files = FORCE_MULTIPART
 
-        json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
+        # Bodies made of pydantic models are serialized to JSON once, directly, and sent as the content.
+        json_content = (
+            encode_json_body(json_body=json, request_options=request_options, omit=omit)
+            if data is None and content is None and files is None and not force_multipart
+            else None
+        )
+        if json_content is not None:
+            json_body, data_body, content = None, None, json_content
+        else:
+            json_body, data_body = get_request_body(json=json, data=data, request_options=request_options, omit=omit)
 
         data_body = _maybe_filter_none_from_multipart_data(data_body, request_files, force_multipart)
 
@@ -811,6 +985,7 @@ class AsyncHttpClient:
         _request_headers = jsonable_encoder(
             remove_none_from_dict(
                 {
+                    **({"content-type": "application/json"} if json_content is not None else {}),
                     **_headers,
                     **(headers if headers is not None else {}),
                     **(request_options.get("additional_headers", {}) if request_options is not None else {}),
@@ -826,6 +1001,9 @@ class AsyncHttpClient:
                 headers=_redact_headers(_request_headers),
             )
 
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+
         async with self.httpx_client.stream(
             method=method,
             url=_request_url,
@@ -835,6 +1013,8 @@ class AsyncHttpClient:
             data=data_body,
             content=content,
             files=request_files,
-            timeout=timeout,
+            timeout=_request_timeout(self.httpx_client, timeout),
         ) as stream:
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(stream)
             yield stream
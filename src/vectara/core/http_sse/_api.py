@@ -5,10 +5,14 @@ from contextlib import asynccontextmanager, contextmanager
 from typing import Any, AsyncGenerator, AsyncIterator, Iterator, cast
 
 import httpx
-from ._decoders import SSEDecoder
+from ._decoders import SSEDecoder, SSELineDecoder
 from ._exceptions import SSEError
 from ._models import ServerSentEvent
 
+# The id of the last event read from a response is recorded in its extensions, so that a caller holding only the
+# response (rather than this EventSource) can resume the stream with a Last-Event-ID header.
+LAST_EVENT_ID_EXTENSION = "sse_last_event_id"
+
 
 class EventSource:
     def __init__(self, response: httpx.Response) -> None:
@@ -45,46 +49,48 @@ class EventSource:
     def response(self) -> httpx.Response:
         return self._response
 
+    def _record(self, sse: ServerSentEvent) -> ServerSentEvent:
+        if sse.id:
+            self._response.extensions[LAST_EVENT_ID_EXTENSION] = sse.id
+        return sse
+
     def iter_sse(self) -> Iterator[ServerSentEvent]:
         self._check_content_type()
         decoder = SSEDecoder()
-        charset = self._get_charset()
+        lines = SSELineDecoder(self._get_charset())
 
-        buffer = ""
         for chunk in self._response.iter_bytes():
-            # Decode chunk using detected charset
-            text_chunk = chunk.decode(charset, errors="replace")
-            buffer += text_chunk
-
-            # Process complete lines
-            while "\n" in buffer:
-                line, buffer = buffer.split("\n", 1)
-                line = line.rstrip("\r")
+            for line in lines.decode(chunk):
                 sse = decoder.decode(line)
                 # when we reach a "\n\n" => line = ''
                 # => decoder will attempt to return an SSE Event
                 if sse is not None:
-                    yield sse
+                    yield self._record(sse)
 
-        # Process any remaining data in buffer
-        if buffer.strip():
-            line = buffer.rstrip("\r")
+        # Process any remaining data once the stream has ended
+        for line in lines.flush():
             sse = decoder.decode(line)
             if sse is not None:
-                yield sse
+                yield self._record(sse)
 
     async def aiter_sse(self) -> AsyncGenerator[ServerSentEvent, None]:
         self._check_content_type()
         decoder = SSEDecoder()
-        lines = cast(AsyncGenerator[str, None], self._response.aiter_lines())
+        lines = SSELineDecoder(self._get_charset())
+        chunks = cast(AsyncGenerator[bytes, None], self._response.aiter_bytes())
         try:
-            async for line in lines:
-                line = line.rstrip("\n")
-                sse = decoder.decode(line)
-                if sse is not None:
-                    yield sse
+            async for chunk in chunks:
+                for line in lines.decode(chunk):
+                    sse = decoder.decode(line)
+                    if sse is not None:
+                        yield self._record(sse)
         finally:
-            await lines.aclose()
+            await chunks.aclose()
+
+        for line in lines.flush():
+            sse = decoder.decode(line)
+            if sse is not None:
+                yield self._record(sse)
 
 
 @contextmanager
@@ -1,9 +1,74 @@
 # This file was auto-generated by Fern from our API Definition.
 
-from typing import List, Optional
+import codecs
+import re
+from typing import Iterator, List, Optional, Tuple
 
 from ._models import ServerSentEvent
 
+# Lines of an event stream end with CRLF, LF or a lone CR.
+_LINE_END = re.compile(r"\r\n|\r|\n")
+
+
+def _lf_ends(text: str, start: int) -> Iterator[Tuple[int, int]]:
+    end = text.find("\n", start)
+    while end >= 0:
+        yield end, end + 1
+        end = text.find("\n", end + 1)
+
+
+class SSELineDecoder:
+    """
+    Incrementally splits a byte stream into lines, ending with CRLF, LF or CR as the event stream format allows.
+
+    Bytes are decoded with an incremental decoder, so multibyte characters split across chunks are kept whole, and
+    each character is only copied once on its way into a line: a partial line is held as a list of pieces until
+    its newline arrives rather than in a buffer which is re-split for every line.
+    """
+
+    def __init__(self, charset: str = "utf-8") -> None:
+        self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        self._pending: List[str] = []
+        # Whether the last chunk ended with a CR, whose LF may start the next chunk.
+        self._after_cr = False
+
+    def decode(self, chunk: bytes) -> List[str]:
+        """Returns the lines completed by this chunk, without their line endings."""
+        return self._split(self._decoder.decode(chunk))
+
+    def flush(self) -> List[str]:
+        """Returns any remaining lines once the stream has ended, including a final line with no newline."""
+        lines = self._split(self._decoder.decode(b"", final=True))
+        remainder = "".join(self._pending)
+        self._pending = []
+        self._after_cr = False
+        if remainder.strip():
+            lines.append(remainder)
+        return lines
+
+    def _split(self, text: str) -> List[str]:
+        lines: List[str] = []
+        if not text:
+            return lines
+        start = 1 if self._after_cr and text[0] == "\n" else 0
+        if "\r" in text:
+            ends = ((match.start(), match.end()) for match in _LINE_END.finditer(text, start))
+        else:
+            # Most streams only use LF, which str.find locates much faster than the regex.
+            ends = _lf_ends(text, start)
+        for end, next_start in ends:
+            line = text[start:end]
+            if self._pending:
+                self._pending.append(line)
+                line = "".join(self._pending)
+                self._pending = []
+            lines.append(line)
+            start = next_start
+        if start < len(text):
+            self._pending.append(text[start:])
+        self._after_cr = text[-1] == "\r"
+        return lines
+
 
 class SSEDecoder:
     def __init__(self) -> None:
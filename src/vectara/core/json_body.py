@@ -0,0 +1,60 @@
+import json
+import typing
+
+import pydantic
+from .jsonable_encoder import jsonable_encoder
+from .pydantic_utilities import IS_PYDANTIC_V2, UniversalBaseModel, deep_union_pydantic_dicts
+from .request_options import RequestOptions
+
+
+def _dump_model(model: pydantic.BaseModel) -> typing.Any:
+    """
+    Produce the same result as jsonable_encoder(model) without walking the model in Python.
+
+    UniversalBaseModel.dict() unions an exclude_unset and an exclude_none dump and then re-applies the FieldMetadata
+    aliases, which pydantic has already applied through by_alias, so only the two dumps are needed here. Values
+    pydantic leaves as Python objects (datetimes, enums, bytes) are encoded by json.dumps through jsonable_encoder.
+    """
+    if not IS_PYDANTIC_V2 or not isinstance(model, UniversalBaseModel):
+        return jsonable_encoder(model)
+
+    obj_dict = deep_union_pydantic_dicts(
+        model.model_dump(by_alias=True, exclude_unset=True, exclude_none=False),
+        model.model_dump(by_alias=True, exclude_none=True, exclude_unset=False),
+    )
+    if "__root__" in obj_dict:
+        obj_dict = obj_dict["__root__"]
+    if "root" in obj_dict:
+        obj_dict = obj_dict["root"]
+    return obj_dict
+
+
+def encode_json_body(
+    *,
+    json_body: typing.Optional[typing.Any],
+    request_options: typing.Optional[RequestOptions],
+    omit: typing.Optional[typing.Any],
+) -> typing.Optional[bytes]:
+    """
+    Serialize a request body made of pydantic models straight to JSON bytes, to be sent as the request content.
+
+    This is used for bodies which are a model, such as CreateDocumentRequest, or a mapping holding models, such as
+    the body of a query. Large models are dumped by pydantic in a single pass rather than by the generic
+    jsonable_encoder walk. Returns None for any other body, which should go through get_request_body as before.
+    """
+    if isinstance(json_body, pydantic.BaseModel):
+        body = _dump_model(json_body)
+    elif isinstance(json_body, typing.Mapping) and any(
+        isinstance(value, pydantic.BaseModel) for value in json_body.values()
+    ):
+        body = {
+            key: _dump_model(value) if isinstance(value, pydantic.BaseModel) else jsonable_encoder(value)
+            for key, value in json_body.items()
+            if value is not Ellipsis and (omit is None or value is not omit)
+        }
+        if request_options is not None:
+            body.update(jsonable_encoder(request_options.get("additional_body_parameters", {})) or {})
+    else:
+        return None
+
+    return json.dumps(body, default=jsonable_encoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
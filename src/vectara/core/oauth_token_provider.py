@@ -2,40 +2,139 @@
 
 import asyncio
 import datetime as dt
+import hashlib
+import logging
+import random
 import threading
 import typing
+import weakref
 from asyncio import Lock as asyncio_Lock
 from threading import Lock as threading_Lock
 
 from ..auth.client import AsyncAuthClient, AuthClient
 from .client_wrapper import AsyncClientWrapper, SyncClientWrapper
 
+# How long to wait before retrying a background refresh which failed, while the current token is still valid.
+BACKGROUND_RETRY_SECONDS = 10.0
+
+
+def _credentials_key(auth_url: str, client_id: str, client_secret: str) -> typing.Tuple[str, str, str]:
+    # The secret is hashed so the registry of shared providers doesn't hold it in a second place.
+    return auth_url, client_id, hashlib.sha256(client_secret.encode("utf-8")).hexdigest()
+
+
+def _refresh_at(expires_at: dt.datetime, refresh_ahead: float) -> dt.datetime:
+    """
+    Picks when to renew a token in the background: at a random point in the first half of the last refresh_ahead
+    fraction of its lifetime, so that processes started together don't all renew at the same moment.
+    """
+    lifetime = max(expires_at - dt.datetime.now(), dt.timedelta(0))
+    return expires_at - lifetime * refresh_ahead * (0.5 + random.random() / 2)
+
 
 class OAuthTokenProvider:
+    """
+    Fetches and caches the OAuth access token of a client.
+
+    By default the token is renewed once it expires, with every caller waiting on the round trip to the auth server.
+    With background_refresh=True, the first caller in the last REFRESH_AHEAD of the token's lifetime starts renewing
+    it in a background thread, while callers keep using the current token, which is still valid.
+
+    Clients in the same process using the same credentials can share one provider, and so one token, through
+    OAuthTokenProvider.shared.
+    """
+
     BUFFER_IN_MINUTES = 2
+    # The fraction of the token's lifetime, before it expires, in which it is renewed in the background.
+    REFRESH_AHEAD = 0.2
 
-    def __init__(self, *, client_id: str, client_secret: str, client_wrapper: SyncClientWrapper):
+    _shared: "weakref.WeakValueDictionary[typing.Tuple[str, str, str], OAuthTokenProvider]" = (
+        weakref.WeakValueDictionary()
+    )
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        *,
+        client_id: str,
+        client_secret: str,
+        client_wrapper: SyncClientWrapper,
+        background_refresh: bool = False,
+    ):
         self._client_id = client_id
         self._client_secret = client_secret
         self._access_token: typing.Optional[str] = None
         self._expires_at: dt.datetime = dt.datetime.now()
+        self._refresh_at: dt.datetime = dt.datetime.now()
         self._auth_client = AuthClient(client_wrapper=client_wrapper)
         self._lock: threading_Lock = threading.Lock()
+        self.background_refresh = background_refresh
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def shared(
+        cls,
+        *,
+        client_id: str,
+        client_secret: str,
+        client_wrapper: SyncClientWrapper,
+        background_refresh: bool = False,
+    ) -> "OAuthTokenProvider":
+        """
+        Returns the provider already used by another client with the same credentials and auth server, creating it
+        if there is none. The token is then fetched through the HTTP client of the first client to ask for it.
+        """
+        key = _credentials_key(client_wrapper.get_environment().auth, client_id, client_secret)
+        with cls._shared_lock:
+            provider = cls._shared.get(key)
+            if provider is None:
+                provider = cls(
+                    client_id=client_id,
+                    client_secret=client_secret,
+                    client_wrapper=client_wrapper,
+                    background_refresh=background_refresh,
+                )
+                cls._shared[key] = provider
+            provider.background_refresh = provider.background_refresh or background_refresh
+            return provider
 
     def get_token(self) -> str:
-        if self._access_token and self._expires_at > dt.datetime.now():
+        now = dt.datetime.now()
+        if self._access_token and self._expires_at > now:
+            if self.background_refresh and self._refresh_at <= now:
+                self._refresh_in_background()
             return self._access_token
         with self._lock:
             if self._access_token and self._expires_at > dt.datetime.now():
                 return self._access_token
             return self._refresh()
 
+    def _refresh_in_background(self) -> None:
+        # Whoever holds the lock is already renewing the token.
+        if not self._lock.acquire(blocking=False):
+            return
+        if self._refresh_at > dt.datetime.now():
+            self._lock.release()
+            return
+
+        def refresh() -> None:
+            try:
+                self._refresh()
+            except Exception as e:
+                self.logger.warning(f"Background token refresh failed, retrying in {BACKGROUND_RETRY_SECONDS}s: {e}")
+                self._refresh_at = dt.datetime.now() + dt.timedelta(seconds=BACKGROUND_RETRY_SECONDS)
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=refresh, name="vectara-token-refresh", daemon=True).start()
+
     def _refresh(self) -> str:
         token_response = self._auth_client.get_token(client_id=self._client_id, client_secret=self._client_secret)
         self._access_token = token_response.access_token
         self._expires_at = self._get_expires_at(
             expires_in_seconds=token_response.expires_in, buffer_in_minutes=self.BUFFER_IN_MINUTES
         )
+        self._refresh_at = _refresh_at(self._expires_at, self.REFRESH_AHEAD)
         return self._access_token
 
     def _get_expires_at(self, *, expires_in_seconds: int, buffer_in_minutes: int):
@@ -43,30 +142,97 @@ class OAuthTokenProvider:
 
 
 class AsyncOAuthTokenProvider:
+    """
+    The asyncio equivalent of OAuthTokenProvider, renewing the token in a background task. A shared provider should
+    only be used by clients running on the same event loop.
+    """
+
     BUFFER_IN_MINUTES = 2
+    REFRESH_AHEAD = 0.2
+
+    _shared: "weakref.WeakValueDictionary[typing.Tuple[str, str, str], AsyncOAuthTokenProvider]" = (
+        weakref.WeakValueDictionary()
+    )
+    _shared_lock = threading.Lock()
 
-    def __init__(self, *, client_id: str, client_secret: str, client_wrapper: AsyncClientWrapper):
+    def __init__(
+        self,
+        *,
+        client_id: str,
+        client_secret: str,
+        client_wrapper: AsyncClientWrapper,
+        background_refresh: bool = False,
+    ):
         self._client_id = client_id
         self._client_secret = client_secret
         self._access_token: typing.Optional[str] = None
         self._expires_at: dt.datetime = dt.datetime.now()
+        self._refresh_at: dt.datetime = dt.datetime.now()
         self._auth_client = AsyncAuthClient(client_wrapper=client_wrapper)
         self._lock: asyncio_Lock = asyncio.Lock()
+        self._refresh_task: typing.Optional["asyncio.Task[None]"] = None
+        self.background_refresh = background_refresh
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def shared(
+        cls,
+        *,
+        client_id: str,
+        client_secret: str,
+        client_wrapper: AsyncClientWrapper,
+        background_refresh: bool = False,
+    ) -> "AsyncOAuthTokenProvider":
+        """
+        Returns the provider already used by another client with the same credentials. See OAuthTokenProvider.shared.
+        """
+        key = _credentials_key(client_wrapper.get_environment().auth, client_id, client_secret)
+        with cls._shared_lock:
+            provider = cls._shared.get(key)
+            if provider is None:
+                provider = cls(
+                    client_id=client_id,
+                    client_secret=client_secret,
+                    client_wrapper=client_wrapper,
+                    background_refresh=background_refresh,
+                )
+                cls._shared[key] = provider
+            provider.background_refresh = provider.background_refresh or background_refresh
+            return provider
 
     async def get_token(self) -> str:
-        if self._access_token and self._expires_at > dt.datetime.now():
+        now = dt.datetime.now()
+        if self._access_token and self._expires_at > now:
+            if self.background_refresh and self._refresh_at <= now:
+                self._refresh_in_background()
             return self._access_token
         async with self._lock:
             if self._access_token and self._expires_at > dt.datetime.now():
                 return self._access_token
             return await self._refresh()
 
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.ensure_future(self._refresh_ahead())
+
+    async def _refresh_ahead(self) -> None:
+        async with self._lock:
+            if self._refresh_at > dt.datetime.now():
+                return
+            try:
+                await self._refresh()
+            except Exception as e:
+                self.logger.warning(f"Background token refresh failed, retrying in {BACKGROUND_RETRY_SECONDS}s: {e}")
+                self._refresh_at = dt.datetime.now() + dt.timedelta(seconds=BACKGROUND_RETRY_SECONDS)
+
     async def _refresh(self) -> str:
         token_response = await self._auth_client.get_token(client_id=self._client_id, client_secret=self._client_secret)
         self._access_token = token_response.access_token
         self._expires_at = self._get_expires_at(
             expires_in_seconds=token_response.expires_in, buffer_in_minutes=self.BUFFER_IN_MINUTES
         )
+        self._refresh_at = _refresh_at(self._expires_at, self.REFRESH_AHEAD)
         return self._access_token
 
     def _get_expires_at(self, *, expires_in_seconds: int, buffer_in_minutes: int):
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import queue
+import threading
 from dataclasses import dataclass
-from typing import AsyncIterator, Awaitable, Callable, Generic, Iterator, List, Optional, TypeVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Iterator, List, Optional, TypeVar
 
 # Generic to represent the underlying type of the results within a page
 T = TypeVar("T")
@@ -11,6 +14,15 @@ T = TypeVar("T")
 R = TypeVar("R")
 
 
+# Marks the end of the pages produced by a prefetching worker.
+_END = object()
+
+
+class _PrefetchError:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
 # SDKs implement a Page ABC per-pagination request, the endpoint then returns a pager that wraps this type
 # for example, an endpoint will return SyncPager[UserPage] where UserPage implements the Page ABC. ex:
 #
@@ -33,25 +45,83 @@ class SyncPager(Generic[T, R]):
     # caused by the type conflict with Pydanitc's __iter__ method
     # brought in by extending the base model
     def __iter__(self) -> Iterator[T]:  # type: ignore[override]
-        for page in self.iter_pages():
+        return self.iter_items()
+
+    def iter_items(self, prefetch: int = 0) -> Iterator[T]:
+        """
+        Iterates over the items of every page, see iter_pages for prefetch.
+        """
+        for page in self.iter_pages(prefetch=prefetch):
             if page.items is not None:
                 yield from page.items
 
-    def iter_pages(self) -> Iterator[SyncPager[T, R]]:
+    def iter_pages(self, prefetch: int = 0) -> Iterator[SyncPager[T, R]]:
+        """
+        Iterates over the pages, starting with this one.
+
+        With prefetch=k, a background thread fetches up to k pages ahead while the current page is consumed, so
+        that the latency of each request overlaps with processing rather than adding to it. An error fetching a
+        page is raised here once the pages before it have been consumed, and if iteration stops early the thread
+        stops fetching.
+        """
+        if prefetch > 0:
+            yield from self._prefetch_pages(prefetch)
+            return
+
         page: Optional[SyncPager[T, R]] = self
         while page is not None:
             yield page
-
-            if not page.has_next or page.get_next is None:
-                return
-
-            page = page.get_next()
-            if page is None or page.items is None or len(page.items) == 0:
-                return
+            page = page._following()
 
     def next_page(self) -> Optional[SyncPager[T, R]]:
         return self.get_next() if self.get_next is not None else None
 
+    def _following(self) -> Optional[SyncPager[T, R]]:
+        if not self.has_next or self.get_next is None:
+            return None
+
+        page = self.get_next()
+        if page is None or page.items is None or len(page.items) == 0:
+            return None
+        return page
+
+    def _prefetch_pages(self, prefetch: int) -> Iterator[SyncPager[T, R]]:
+        buffer: queue.Queue[Any] = queue.Queue(maxsize=prefetch)
+        stopped = threading.Event()
+
+        def put(item: Any) -> bool:
+            while not stopped.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce() -> None:
+            page: Optional[SyncPager[T, R]] = self
+            try:
+                while page is not None:
+                    if not put(page):
+                        return
+                    page = page._following()
+                put(_END)
+            except BaseException as e:
+                put(_PrefetchError(e))
+
+        worker = threading.Thread(target=produce, name="SyncPager-prefetch", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is _END:
+                    return
+                if isinstance(item, _PrefetchError):
+                    raise item.error
+                yield item
+        finally:
+            stopped.set()
+
 
 @dataclass(frozen=True)
 class AsyncPager(Generic[T, R]):
@@ -60,23 +130,75 @@ class AsyncPager(Generic[T, R]):
     items: Optional[List[T]]
     response: R
 
-    async def __aiter__(self) -> AsyncIterator[T]:
-        async for page in self.iter_pages():
+    def __aiter__(self) -> AsyncIterator[T]:
+        return self.iter_items()
+
+    async def iter_items(self, prefetch: int = 0) -> AsyncIterator[T]:
+        """
+        Iterates over the items of every page, see iter_pages for prefetch.
+        """
+        async for page in self.iter_pages(prefetch=prefetch):
             if page.items is not None:
                 for item in page.items:
                     yield item
 
-    async def iter_pages(self) -> AsyncIterator[AsyncPager[T, R]]:
+    async def iter_pages(self, prefetch: int = 0) -> AsyncIterator[AsyncPager[T, R]]:
+        """
+        Iterates over the pages, starting with this one.
+
+        With prefetch=k, a background task fetches up to k pages ahead while the current page is consumed. An error
+        fetching a page is raised here once the pages before it have been consumed, and if iteration stops early
+        (or is cancelled) the task is cancelled.
+        """
+        if prefetch > 0:
+            async for page in self._prefetch_pages(prefetch):
+                yield page
+            return
+
         page: Optional[AsyncPager[T, R]] = self
         while page is not None:
             yield page
-
-            if not page.has_next or page.get_next is None:
-                return
-
-            page = await page.get_next()
-            if page is None or page.items is None or len(page.items) == 0:
-                return
+            page = await page._following()
 
     async def next_page(self) -> Optional[AsyncPager[T, R]]:
         return await self.get_next() if self.get_next is not None else None
+
+    async def _following(self) -> Optional[AsyncPager[T, R]]:
+        if not self.has_next or self.get_next is None:
+            return None
+
+        page = await self.get_next()
+        if page is None or page.items is None or len(page.items) == 0:
+            return None
+        return page
+
+    async def _prefetch_pages(self, prefetch: int) -> AsyncIterator[AsyncPager[T, R]]:
+        buffer: asyncio.Queue[Any] = asyncio.Queue(maxsize=prefetch)
+
+        async def produce() -> None:
+            page: Optional[AsyncPager[T, R]] = self
+            try:
+                while page is not None:
+                    await buffer.put(page)
+                    page = await page._following()
+                await buffer.put(_END)
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                await buffer.put(_PrefetchError(e))
+
+        worker = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await buffer.get()
+                if item is _END:
+                    return
+                if isinstance(item, _PrefetchError):
+                    raise item.error
+                yield item
+        finally:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
@@ -15,6 +15,7 @@ from typing import (
     Dict,
     List,
     Mapping,
+    NamedTuple,
     Optional,
     Set,
     Tuple,
@@ -177,22 +178,100 @@ def _get_field_annotation(model: Type[Any], field_name: str) -> Optional[Type[An
     return None
 
 
-def _find_variant_by_discriminator(
-    variants: List[Type[Any]],
-    discriminator: str,
-    discriminator_value: Any,
-) -> Optional[Type[Any]]:
-    """Find the union variant that matches the discriminator value."""
+class _DiscriminatedUnion(NamedTuple):
+    """
+    A discriminated union compiled into a table from discriminator value to variant.
+    """
+
+    discriminator: str
+    variants: List[Type[Any]]
+    variants_by_value: Dict[Any, Type[Any]]
+    string_data_variants: Set[Type[Any]]
+
+    def find_variant(self, discriminator_value: Any) -> Optional[Type[Any]]:
+        try:
+            return self.variants_by_value.get(discriminator_value)
+        except TypeError:
+            # An unhashable discriminator value can't match any variant.
+            return None
+
+
+# Resolved per type on first use, as the same types are parsed for every event of a stream and every response.
+_DISCRIMINATED_UNIONS: Dict[Any, Optional[_DiscriminatedUnion]] = {}
+_TYPE_ADAPTERS: Dict[Any, Any] = {}
+_HAS_PYDANTIC_ALIASES: Dict[Any, bool] = {}
+
+
+def _get_discriminated_union(type_: Type[Any]) -> Optional[_DiscriminatedUnion]:
+    try:
+        return _DISCRIMINATED_UNIONS[type_]
+    except KeyError:
+        pass
+    except TypeError:
+        return _compile_discriminated_union(type_)
+    union = _compile_discriminated_union(type_)
+    _DISCRIMINATED_UNIONS[type_] = union
+    return union
+
+
+def _compile_discriminated_union(type_: Type[Any]) -> Optional[_DiscriminatedUnion]:
+    discriminator, variants = _get_discriminator_and_variants(type_)
+    if discriminator is None or variants is None:
+        return None
+
+    variants_by_value: Dict[Any, Type[Any]] = {}
+    string_data_variants: Set[Type[Any]] = set()
     for variant in variants:
         if not (inspect.isclass(variant) and issubclass(variant, pydantic.BaseModel)):
             continue
-
         disc_annotation = _get_field_annotation(variant, discriminator)
         if disc_annotation and is_literal_type(disc_annotation):
             literal_args = get_args(disc_annotation)
-            if literal_args and literal_args[0] == discriminator_value:
-                return variant
-    return None
+            if literal_args:
+                # The first variant declaring a value wins.
+                variants_by_value.setdefault(literal_args[0], variant)
+        data_type = _get_field_annotation(variant, "data")
+        if data_type is None or _is_string_type(data_type):
+            string_data_variants.add(variant)
+
+    return _DiscriminatedUnion(discriminator, variants, variants_by_value, string_data_variants)
+
+
+def _get_type_adapter(type_: Type[Any]) -> Any:
+    try:
+        return _TYPE_ADAPTERS[type_]
+    except KeyError:
+        pass
+    except TypeError:
+        return pydantic.TypeAdapter(type_)  # type: ignore[attr-defined]
+    adapter = pydantic.TypeAdapter(type_)  # type: ignore[attr-defined]
+    _TYPE_ADAPTERS[type_] = adapter
+    return adapter
+
+
+def _has_pydantic_aliases(type_: Type[pydantic.BaseModel]) -> bool:
+    try:
+        return _HAS_PYDANTIC_ALIASES[type_]
+    except KeyError:
+        pass
+
+    has_pydantic_aliases = False
+    if IS_PYDANTIC_V2:
+        for field_name, field_info in getattr(type_, "model_fields", {}).items():  # type: ignore[attr-defined]
+            alias = getattr(field_info, "alias", None)
+            if alias is not None and alias != field_name:
+                has_pydantic_aliases = True
+                break
+    else:
+        for field in getattr(type_, "__fields__", {}).values():
+            alias = getattr(field, "alias", None)
+            name = getattr(field, "name", None)
+            if alias is not None and name is not None and alias != name:
+                has_pydantic_aliases = True
+                break
+
+    _HAS_PYDANTIC_ALIASES[type_] = has_pydantic_aliases
+    return has_pydantic_aliases
 
 
 def _is_string_type(type_: Type[Any]) -> bool:
@@ -248,9 +327,9 @@ def parse_sse_obj(sse: "ServerSentEvent", type_: Type[T]) -> T:
         This function is only available in SDK contexts where http_sse module exists.
     """
     sse_event = asdict(sse)
-    discriminator, variants = _get_discriminator_and_variants(type_)
+    union = _get_discriminated_union(type_)
 
-    if discriminator is None or variants is None:
+    if union is None:
         # Not a discriminated union - parse the data field as JSON
         data_value = sse_event.get("data")
         if isinstance(data_value, str) and data_value:
@@ -265,33 +344,33 @@ def parse_sse_obj(sse: "ServerSentEvent", type_: Type[T]) -> T:
                 )
         return parse_obj_as(type_, sse_event)
 
+    discriminator = union.discriminator
     data_value = sse_event.get("data")
 
     # Check if discriminator is at the top level (event-level discrimination)
     if discriminator in sse_event:
         # Case 2: Event-level discrimination
         # Find the matching variant to check if 'data' field needs JSON parsing
-        disc_value = sse_event.get(discriminator)
-        matching_variant = _find_variant_by_discriminator(variants, discriminator, disc_value)
+        matching_variant = union.find_variant(sse_event.get(discriminator))
 
         if matching_variant is not None:
             # Check what type the variant expects for 'data'
-            data_type = _get_field_annotation(matching_variant, "data")
-            if data_type is not None and not _is_string_type(data_type):
+            if matching_variant not in union.string_data_variants:
                 # Variant expects non-string data - parse JSON
                 if isinstance(data_value, str) and data_value:
                     try:
                         parsed_data = json.loads(data_value)
                         new_object = dict(sse_event)
                         new_object["data"] = parsed_data
-                        return parse_obj_as(type_, new_object)
+                        return cast(T, parse_obj_as(matching_variant, new_object))
                     except json.JSONDecodeError as e:
                         _logger.warning(
                             "Failed to parse SSE data field as JSON for event-level discrimination: %s, data: %s",
                             e,
                             data_value[:100] if len(data_value) > 100 else data_value,
                         )
-        # Either no matching variant, data is string type, or JSON parse failed
+            return cast(T, parse_obj_as(matching_variant, sse_event))
+        # No matching variant
         return parse_obj_as(type_, sse_event)
 
     else:
@@ -300,13 +379,20 @@ def parse_sse_obj(sse: "ServerSentEvent", type_: Type[T]) -> T:
         if isinstance(data_value, str) and data_value:
             try:
                 parsed_data = json.loads(data_value)
-                return parse_obj_as(type_, parsed_data)
             except json.JSONDecodeError as e:
                 _logger.warning(
                     "Failed to parse SSE data field as JSON for data-level discrimination: %s, data: %s",
                     e,
                     data_value[:100] if len(data_value) > 100 else data_value,
                 )
+            else:
+                # Validate against the variant directly, falling back to the union to report an unknown type.
+                matching_variant = (
+                    union.find_variant(parsed_data.get(discriminator)) if isinstance(parsed_data, dict) else None
+                )
+                if matching_variant is not None:
+                    return cast(T, parse_obj_as(matching_variant, parsed_data))
+                return parse_obj_as(type_, parsed_data)
         return parse_obj_as(type_, sse_event)
 
 
@@ -319,30 +405,15 @@ def parse_obj_as(type_: Type[T], object_: Any) -> T:
     # - If the model encodes aliasing only via FieldMetadata annotations, then we MUST pre-dealias because Pydantic
     #   will not recognize those aliases during validation.
     if inspect.isclass(type_) and issubclass(type_, pydantic.BaseModel):
-        has_pydantic_aliases = False
-        if IS_PYDANTIC_V2:
-            for field_name, field_info in getattr(type_, "model_fields", {}).items():  # type: ignore[attr-defined]
-                alias = getattr(field_info, "alias", None)
-                if alias is not None and alias != field_name:
-                    has_pydantic_aliases = True
-                    break
-        else:
-            for field in getattr(type_, "__fields__", {}).values():
-                alias = getattr(field, "alias", None)
-                name = getattr(field, "name", None)
-                if alias is not None and name is not None and alias != name:
-                    has_pydantic_aliases = True
-                    break
-
         dealiased_object = (
             object_
-            if has_pydantic_aliases
+            if _has_pydantic_aliases(type_)
             else convert_and_respect_annotation_metadata(object_=object_, annotation=type_, direction="read")
         )
     else:
         dealiased_object = convert_and_respect_annotation_metadata(object_=object_, annotation=type_, direction="read")
     if IS_PYDANTIC_V2:
-        adapter = pydantic.TypeAdapter(type_)  # type: ignore[attr-defined]
+        adapter = _get_type_adapter(type_)
         return adapter.validate_python(dealiased_object)
     return pydantic.parse_obj_as(type_, dealiased_object)
 
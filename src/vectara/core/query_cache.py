@@ -0,0 +1,412 @@
+import collections
+import hashlib
+import json
+import re
+import threading
+import time
+import typing
+import urllib.parse
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import httpx
+
+# The query endpoints whose responses may be cached: POST v2/query, and GET or POST v2/corpora/{key}/query.
+_QUERY_PATH = re.compile(r"^/?v2/(?:query|corpora/(?P<corpus_key>[^/]+)/query)/?$")
+
+# Any path under a corpus, the target of writes which invalidate the cached queries of that corpus.
+_CORPUS_PATH = re.compile(r"^/?v2/corpora/(?P<corpus_key>[^/]+)")
+
+_READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Headers describing the encoding of the original body, which no longer apply to the decoded content we keep.
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+# Headers which change the result of a query, and so form part of the cache key.
+_KEY_HEADERS = ("x-api-key", "customer-id")
+
+
+class CachedResponse(typing.NamedTuple):
+    """
+    A cached query response, along with the corpora it was computed from.
+    """
+
+    status_code: int
+    headers: typing.List[typing.Tuple[str, str]]
+    content: bytes
+    corpora: typing.Tuple[str, ...]
+    expires_at: float
+
+
+class CacheRequest(typing.NamedTuple):
+    """
+    A cacheable request: its cache key and the corpora it reads from.
+    """
+
+    key: str
+    corpora: typing.Tuple[str, ...]
+
+
+class CacheBackend(ABC):
+    """
+    Where a QueryCache keeps its entries. Backends are bounded in size and must be safe to share between threads.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> typing.Optional[CachedResponse]:
+        """
+        Returns the entry for the key, or None if it is missing or has expired.
+        """
+
+    @abstractmethod
+    def put(self, key: str, entry: CachedResponse) -> int:
+        """
+        Stores the entry, returning the number of entries evicted to make room for it.
+        """
+
+    @abstractmethod
+    def invalidate(self, corpus_key: str) -> int:
+        """
+        Removes the entries computed from the corpus, returning how many were removed.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        The number of entries, including any which expired but were not removed yet.
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    An in-memory backend which evicts the least recently used entry once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._entries: "collections.OrderedDict[str, CachedResponse]" = collections.OrderedDict()
+        self._by_corpus: typing.Dict[str, typing.Set[str]] = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for corpus_key in entry.corpora:
+            keys = self._by_corpus.get(corpus_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_corpus[corpus_key]
+
+    def get(self, key: str) -> typing.Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> int:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for corpus_key in entry.corpora:
+                self._by_corpus[corpus_key].add(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            return evicted
+
+    def invalidate(self, corpus_key: str) -> int:
+        with self._lock:
+            keys = list(self._by_corpus.get(corpus_key, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_corpus.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    A backend stored in a SQLite database, so cached queries survive restarts and can be shared by processes using
+    the same account. Once max_entries is reached, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: typing.Union[str, Path], max_entries: int = 10_000):
+        """
+        :param path: the SQLite database file, which will be created if it doesn't exist.
+        :param max_entries: the maximum number of responses kept.
+        """
+        import sqlite3
+
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, status_code INTEGER NOT NULL, headers TEXT NOT NULL, content BLOB NOT NULL, "
+                "corpora TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entry_corpora ("
+                "corpus_key TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (corpus_key, key))"
+            )
+
+    def _delete(self, keys: typing.List[str]) -> None:
+        for key in keys:
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._connection.execute("DELETE FROM entry_corpora WHERE key = ?", (key,))
+
+    def get(self, key: str) -> typing.Optional[CachedResponse]:
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT status_code, headers, content, corpora, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[4] <= now:
+                self._delete([key])
+                return None
+            self._connection.execute("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+        return CachedResponse(
+            status_code=row[0],
+            headers=[(name, value) for name, value in json.loads(row[1])],
+            content=row[2],
+            corpora=tuple(json.loads(row[3])),
+            expires_at=row[4],
+        )
+
+    def put(self, key: str, entry: CachedResponse) -> int:
+        with self._lock, self._connection:
+            self._delete([key])
+            self._connection.execute(
+                "INSERT INTO entries (key, status_code, headers, content, corpora, expires_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.status_code, json.dumps(entry.headers), entry.content, json.dumps(entry.corpora),
+                 entry.expires_at, time.time()),
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO entry_corpora (corpus_key, key) VALUES (?, ?)",
+                [(corpus_key, key) for corpus_key in entry.corpora],
+            )
+            count = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count <= self.max_entries:
+                return 0
+            evicted = [row[0] for row in self._connection.execute(
+                "SELECT key FROM entries ORDER BY used_at LIMIT ?", (count - self.max_entries,)
+            )]
+            self._delete(evicted)
+            return len(evicted)
+
+    def invalidate(self, corpus_key: str) -> int:
+        with self._lock, self._connection:
+            keys = [row[0] for row in self._connection.execute(
+                "SELECT key FROM entry_corpora WHERE corpus_key = ?", (corpus_key,)
+            )]
+            self._delete(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+            self._connection.execute("DELETE FROM entry_corpora")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class CacheStats:
+    """
+    Counters describing the effectiveness of a QueryCache, which are safe to read at any time.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def record(self, counter: str, count: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + count)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stores = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+
+def _canonical_body(body: typing.Any) -> typing.Any:
+    if isinstance(body, (bytes, bytearray)):
+        return json.loads(body)
+    return body
+
+
+def _queried_corpora(path_corpus_key: typing.Optional[str], body: typing.Any) -> typing.Tuple[str, ...]:
+    if path_corpus_key is not None:
+        return (urllib.parse.unquote(path_corpus_key),)
+    search = body.get("search") if isinstance(body, dict) else None
+    corpora = search.get("corpora") if isinstance(search, dict) else None
+    if not isinstance(corpora, list):
+        return ()
+    return tuple(sorted({corpus["corpus_key"] for corpus in corpora
+                         if isinstance(corpus, dict) and isinstance(corpus.get("corpus_key"), str)}))
+
+
+def _generates(body: typing.Any) -> bool:
+    generation = body.get("generation") if isinstance(body, dict) else None
+    if generation is None:
+        return False
+    return not (isinstance(generation, dict) and generation.get("enabled") is False)
+
+
+class QueryCache:
+    """
+    Caches the responses of the query endpoints (queries.query, corpora.query and corpora.search) on the client.
+
+    Requests are keyed on a hash of the method, URL, query parameters and canonicalized JSON body, so the same query
+    made with the same parameters is answered from the cache until its TTL expires. Writes this client makes to a
+    corpus (creating, updating or deleting documents, uploading files, resetting the corpus...) invalidate every
+    cached query of that corpus. Writes made by other clients are only picked up once entries expire.
+
+    By default, queries requesting generation are not cached since their summaries are not deterministic. Streamed
+    queries are never cached.
+
+    The cache is shared by every thread and coroutine using the client, and may be shared between clients of the
+    same account.
+    """
+
+    def __init__(self, backend: typing.Optional[CacheBackend] = None, ttl: float = 300.0,
+                 cache_generation: bool = False):
+        """
+        :param backend: where entries are kept, defaulting to a MemoryCacheBackend.
+        :param ttl: the number of seconds a response is served from the cache.
+        :param cache_generation: whether to also cache queries which request generation.
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl
+        self.cache_generation = cache_generation
+        self.stats = CacheStats()
+
+    def match(self, method: str, path: typing.Optional[str], params: typing.Any, body: typing.Any,
+              headers: typing.Mapping[str, typing.Any],
+              identity: typing.Optional[str] = None) -> typing.Optional[CacheRequest]:
+        """
+        Returns the cache key of a request to a query endpoint, or None if the request should not be cached.
+
+        :param identity: a stable identity of the caller, such as its OAuth client id. The bearer token is left out of
+        the key as it changes on every refresh, so callers authenticating with one are told apart by their identity.
+        """
+        if path is None or method.upper() not in ("GET", "POST"):
+            return None
+        match = _QUERY_PATH.match(path)
+        if match is None:
+            return None
+        try:
+            body = _canonical_body(body)
+        except ValueError:
+            return None
+        if not self.cache_generation and _generates(body):
+            return None
+
+        lowered = {name.lower(): value for name, value in headers.items()}
+        canonical = json.dumps(
+            [method.upper(), path.strip("/"), params, body, [lowered.get(name) for name in _KEY_HEADERS], identity],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return CacheRequest(key=key, corpora=_queried_corpora(match.group("corpus_key"), body))
+
+    def get(self, request: CacheRequest, http_request: httpx.Request) -> typing.Optional[httpx.Response]:
+        entry = self.backend.get(request.key)
+        if entry is None:
+            self.stats.record("misses")
+            return None
+        self.stats.record("hits")
+        return httpx.Response(entry.status_code, headers=entry.headers, content=entry.content, request=http_request)
+
+    def put(self, request: CacheRequest, response: httpx.Response) -> None:
+        if response.status_code != 200:
+            return
+        entry = CachedResponse(
+            status_code=response.status_code,
+            headers=[(name, value) for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS],
+            content=response.content,
+            corpora=request.corpora,
+            expires_at=time.time() + self.ttl,
+        )
+        self.stats.record("stores")
+        evicted = self.backend.put(request.key, entry)
+        if evicted:
+            self.stats.record("evictions", evicted)
+
+    def written(self, method: str, path: typing.Optional[str]) -> None:
+        """
+        Invalidates the cached queries of the corpus a request writes to, if any.
+        """
+        if path is None or method.upper() in _READ_METHODS or _QUERY_PATH.match(path):
+            return
+        match = _CORPUS_PATH.match(path)
+        if match is not None:
+            self.invalidate(urllib.parse.unquote(match.group("corpus_key")))
+
+    def invalidate(self, corpus_key: str) -> None:
+        """
+        Removes the cached queries of the corpus.
+        """
+        removed = self.backend.invalidate(corpus_key)
+        if removed:
+            self.stats.record("invalidations", removed)
+
+    def clear(self) -> None:
+        self.backend.clear()
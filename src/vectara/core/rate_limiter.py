@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+import typing
+
+import httpx
+
+# Values of X-RateLimit-Reset above this are unix timestamps, below it they are a number of seconds.
+_EPOCH_THRESHOLD = 1_000_000_000
+
+MAX_PAUSE_SECONDS = 60.0
+
+
+def _parse_float(value: typing.Optional[str]) -> typing.Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_in_seconds(headers: httpx.Headers) -> typing.Optional[float]:
+    """
+    Parse X-RateLimit-Reset, which may either be a unix timestamp or a delay in seconds.
+    """
+    reset = _parse_float(headers.get("x-ratelimit-reset"))
+    if reset is None:
+        return None
+    if reset > _EPOCH_THRESHOLD:
+        reset = reset - time.time()
+    return max(reset, 0.0)
+
+
+class RateLimiter:
+    """
+    A token bucket which paces requests across every thread and coroutine sharing a client.
+
+    The limiter can be given a fixed rate, and otherwise learns the quota from the X-RateLimit-Remaining and
+    X-RateLimit-Reset response headers: the remaining quota is spread evenly over the
+    time until the window resets, so concurrent workers get a steady throughput rather than all exhausting the
+    quota, receiving a 429 and backing off together. A 429 pauses every caller until the quota resets.
+
+    Waiting is done by the caller (time.sleep or asyncio.sleep), so one limiter can be shared by sync and async
+    clients alike.
+    """
+
+    def __init__(self, rate: typing.Optional[float] = None, burst: typing.Optional[float] = None, learn: bool = True):
+        """
+        :param rate: the initial number of requests per second, or None to not limit until a quota is learned.
+        :param burst: the number of requests which may be made back to back, defaulting to one second's worth.
+        :param learn: whether to adapt the rate from the rate limit headers of each response.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.learn = learn
+        self._tokens = self._capacity()
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _capacity(self) -> float:
+        if self.burst is not None:
+            return self.burst
+        return max(self.rate or 1.0, 1.0)
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None and now > self._updated:
+            self._tokens = min(self._capacity(), self._tokens + (now - self._updated) * self.rate)
+        self._updated = max(now, self._updated)
+
+    def reserve(self) -> float:
+        """
+        Takes a token, returning the number of seconds the caller must wait before making its request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            blocked = max(self._blocked_until - now, 0.0)
+            if self.rate is None:
+                return blocked
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return blocked
+            if self.rate <= 0:
+                return max(blocked, 1.0)
+            return max(blocked, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> float:
+        """
+        Stops all callers from proceeding for the given number of seconds, returning the length of the pause.
+        """
+        seconds = min(seconds, MAX_PAUSE_SECONDS)
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = self._blocked_until
+        return seconds
+
+    def update(self, response: httpx.Response) -> float:
+        """
+        Adapts the limiter to the rate limit headers of a response.
+
+        Returns the number of seconds every caller is now paused for, which is 0 if the response did not pause the
+        limiter. The next acquire waits out the pause, so a caller retrying the request need not wait again.
+        """
+        headers = response.headers
+        reset = _reset_in_seconds(headers)
+        paused = 0.0
+
+        if response.status_code == 429:
+            retry_after = _parse_float(headers.get("retry-after"))
+            wait = retry_after if retry_after is not None else reset
+            if wait is not None and wait > 0:
+                paused = self.pause(wait)
+
+        if not self.learn:
+            return paused
+
+        remaining = _parse_float(headers.get("x-ratelimit-remaining"))
+        if remaining is None or reset is None:
+            return paused
+
+        if remaining <= 0:
+            # The quota is exhausted, hold everyone until the window resets.
+            if reset > 0:
+                paused = max(paused, self.pause(reset))
+            return paused
+
+        if reset <= 0:
+            # The window is resetting right now, and without its length there is no rate to learn: keep the current one.
+            return paused
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = remaining / reset
+            self._tokens = min(self._tokens, remaining, self._capacity())
+        return paused
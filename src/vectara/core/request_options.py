@@ -25,6 +25,8 @@ class RequestOptions(typing.TypedDict, total=False):
         - additional_body_parameters: typing.Dict[str, typing.Any]. A dictionary containing additional parameters to spread into the request's body parameters dict
 
         - chunk_size: int. The size, in bytes, to process each chunk of data being streamed back within the response. This equates to leveraging `chunk_size` within `requests` or `httpx`, and is only leveraged for file downloads.
+
+        - coalesce: bool. Whether identical requests in flight at the same time (same method, URL, parameters, body and headers) should share a single call and its response. Only use this for reads.
     """
 
     timeout_in_seconds: NotRequired[int]
@@ -33,3 +35,4 @@ class RequestOptions(typing.TypedDict, total=False):
     additional_query_parameters: NotRequired[typing.Dict[str, typing.Any]]
     additional_body_parameters: NotRequired[typing.Dict[str, typing.Any]]
     chunk_size: NotRequired[int]
+    coalesce: NotRequired[bool]
@@ -0,0 +1,103 @@
+import collections
+import threading
+import time
+import typing
+
+CONNECTION_ERROR = "connection_error"
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of the requests made over a sliding window, so that when the API is failing
+    every caller retrying does not multiply the load on it.
+
+    A small number of retries per second is always allowed so that quiet clients can still retry the odd failure.
+    """
+
+    def __init__(self, ratio: float = 0.2, window: float = 10.0, min_retries_per_second: float = 1.0):
+        """
+        :param ratio: the maximum number of retries as a fraction of the requests made in the window.
+        :param window: the length of the sliding window, in seconds.
+        :param min_retries_per_second: retries which are allowed regardless of the number of requests.
+        """
+        if ratio < 0 or window <= 0 or min_retries_per_second < 0:
+            raise ValueError("ratio and min_retries_per_second must not be negative and window must be positive")
+        self.ratio = ratio
+        self.window = window
+        self.min_retries_per_second = min_retries_per_second
+        self._requests: typing.Deque[float] = collections.deque()
+        self._retries: typing.Deque[float] = collections.deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    def record_request(self) -> None:
+        """
+        Records a request made for the first time, which earns the budget a fraction of a retry.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """
+        Spends a retry from the budget, returning False if there are none left.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            allowed = len(self._requests) * self.ratio + self.min_retries_per_second * self.window
+            if len(self._retries) + 1 > allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryStats:
+    """
+    Counters describing the retries made by a client, which are safe to read at any time.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.budget_exhausted = 0
+        self.retries_by_cause: typing.Counter[typing.Union[int, str]] = collections.Counter()
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_retry(self, cause: typing.Union[int, str]) -> None:
+        """
+        :param cause: the status code which caused the retry, or CONNECTION_ERROR.
+        """
+        with self._lock:
+            self.retries += 1
+            self.retries_by_cause[cause] += 1
+
+    def record_budget_exhausted(self) -> None:
+        with self._lock:
+            self.budget_exhausted += 1
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "budget_exhausted": self.budget_exhausted,
+                "retries_by_cause": dict(self.retries_by_cause),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.budget_exhausted = 0
+            self.retries_by_cause.clear()
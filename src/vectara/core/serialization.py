@@ -58,25 +58,16 @@ def convert_and_respect_annotation_metadata(
     if inner_type is None:
         inner_type = annotation
 
-    clean_type = _remove_annotations(inner_type)
-    # Pydantic models
-    if (
-        inspect.isclass(clean_type)
-        and issubclass(clean_type, pydantic.BaseModel)
-        and isinstance(object_, typing.Mapping)
-    ):
-        return _convert_mapping(object_, clean_type, direction)
-    # TypedDicts
-    if typing_extensions.is_typeddict(clean_type) and isinstance(object_, typing.Mapping):
+    info = _get_type_info(inner_type)
+    clean_type = info.clean_type
+    # Pydantic models and TypedDicts
+    if info.is_mapping_type and isinstance(object_, typing.Mapping):
         return _convert_mapping(object_, clean_type, direction)
 
-    if (
-        typing_extensions.get_origin(clean_type) == typing.Dict
-        or typing_extensions.get_origin(clean_type) == dict
-        or clean_type == typing.Dict
-    ) and isinstance(object_, typing.Dict):
-        key_type = typing_extensions.get_args(clean_type)[0]
-        value_type = typing_extensions.get_args(clean_type)[1]
+    origin = info.origin
+    if (origin == typing.Dict or origin == dict or clean_type == typing.Dict) and isinstance(object_, typing.Dict):
+        key_type = info.args[0]
+        value_type = info.args[1]
 
         return {
             key: convert_and_respect_annotation_metadata(
@@ -90,12 +81,8 @@ def convert_and_respect_annotation_metadata(
 
     # If you're iterating on a string, do not bother to coerce it to a sequence.
     if not isinstance(object_, str):
-        if (
-            typing_extensions.get_origin(clean_type) == typing.Set
-            or typing_extensions.get_origin(clean_type) == set
-            or clean_type == typing.Set
-        ) and isinstance(object_, typing.Set):
-            inner_type = typing_extensions.get_args(clean_type)[0]
+        if (origin == typing.Set or origin == set or clean_type == typing.Set) and isinstance(object_, typing.Set):
+            inner_type = info.args[0]
             return {
                 convert_and_respect_annotation_metadata(
                     object_=item,
@@ -106,21 +93,12 @@ def convert_and_respect_annotation_metadata(
                 for item in object_
             }
         elif (
-            (
-                typing_extensions.get_origin(clean_type) == typing.List
-                or typing_extensions.get_origin(clean_type) == list
-                or clean_type == typing.List
-            )
-            and isinstance(object_, typing.List)
+            (origin == typing.List or origin == list or clean_type == typing.List) and isinstance(object_, typing.List)
         ) or (
-            (
-                typing_extensions.get_origin(clean_type) == typing.Sequence
-                or typing_extensions.get_origin(clean_type) == collections.abc.Sequence
-                or clean_type == typing.Sequence
-            )
+            (origin == typing.Sequence or origin == collections.abc.Sequence or clean_type == typing.Sequence)
             and isinstance(object_, typing.Sequence)
         ):
-            inner_type = typing_extensions.get_args(clean_type)[0]
+            inner_type = info.args[0]
             return [
                 convert_and_respect_annotation_metadata(
                     object_=item,
@@ -131,12 +109,12 @@ def convert_and_respect_annotation_metadata(
                 for item in object_
             ]
 
-    if typing_extensions.get_origin(clean_type) == typing.Union:
+    if origin == typing.Union:
         # We should be able to ~relatively~ safely try to convert keys against all
         # member types in the union, the edge case here is if one member aliases a field
         # of the same name to a different name from another member
         # Or if another member aliases a field of the same name that another member does not.
-        for member in typing_extensions.get_args(clean_type):
+        for member in info.args:
             object_ = convert_and_respect_annotation_metadata(
                 object_=object_,
                 annotation=annotation,
@@ -145,28 +123,88 @@ def convert_and_respect_annotation_metadata(
             )
         return object_
 
-    annotated_type = _get_annotation(annotation)
-    if annotated_type is None:
-        return object_
-
     # If the object is not a TypedDict, a Union, or other container (list, set, sequence, etc.)
     # Then we can safely call it on the recursive conversion.
     return object_
 
 
+class _TypeInfo(typing.NamedTuple):
+    """
+    What convert_and_respect_annotation_metadata needs to know about a type, which is resolved once per type.
+    """
+
+    clean_type: typing.Any
+    origin: typing.Any
+    args: typing.Tuple[typing.Any, ...]
+    is_mapping_type: bool
+
+
+class _MappingInfo(typing.NamedTuple):
+    """
+    The resolved annotations and alias maps of a pydantic model or TypedDict.
+    """
+
+    annotations: typing.Dict[str, typing.Any]
+    alias_to_field_name: typing.Dict[str, str]
+    field_to_alias_name: typing.Dict[str, str]
+
+
+_TYPE_INFO_CACHE: typing.Dict[typing.Any, _TypeInfo] = {}
+_MAPPING_INFO_CACHE: typing.Dict[typing.Any, _MappingInfo] = {}
+
+
+def _get_type_info(type_: typing.Any) -> _TypeInfo:
+    try:
+        return _TYPE_INFO_CACHE[type_]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable types (e.g. Literals of unhashable values) are simply not cached.
+        return _resolve_type_info(type_)
+    info = _resolve_type_info(type_)
+    _TYPE_INFO_CACHE[type_] = info
+    return info
+
+
+def _resolve_type_info(type_: typing.Any) -> _TypeInfo:
+    clean_type = _remove_annotations(type_)
+    is_mapping_type = (
+        inspect.isclass(clean_type) and issubclass(clean_type, pydantic.BaseModel)
+    ) or typing_extensions.is_typeddict(clean_type)
+    return _TypeInfo(
+        clean_type=clean_type,
+        origin=typing_extensions.get_origin(clean_type),
+        args=typing_extensions.get_args(clean_type),
+        is_mapping_type=is_mapping_type,
+    )
+
+
+def _get_mapping_info(type_: typing.Any) -> _MappingInfo:
+    try:
+        return _MAPPING_INFO_CACHE[type_]
+    except KeyError:
+        pass
+
+    try:
+        annotations = typing_extensions.get_type_hints(type_, include_extras=True)
+    except NameError:
+        # The TypedDict contains a circular reference, so we use the __annotations__ attribute directly. This is not
+        # cached, as the reference may resolve once the rest of the module has been imported.
+        annotations = getattr(type_, "__annotations__", {})
+        return _MappingInfo(annotations, _get_alias_to_field_name(annotations), _get_field_to_alias_name(annotations))
+
+    info = _MappingInfo(annotations, _get_alias_to_field_name(annotations), _get_field_to_alias_name(annotations))
+    _MAPPING_INFO_CACHE[type_] = info
+    return info
+
+
 def _convert_mapping(
     object_: typing.Mapping[str, object],
     expected_type: typing.Any,
     direction: typing.Literal["read", "write"],
 ) -> typing.Mapping[str, object]:
     converted_object: typing.Dict[str, object] = {}
-    try:
-        annotations = typing_extensions.get_type_hints(expected_type, include_extras=True)
-    except NameError:
-        # The TypedDict contains a circular reference, so
-        # we use the __annotations__ attribute directly.
-        annotations = getattr(expected_type, "__annotations__", {})
-    aliases_to_field_names = _get_alias_to_field_name(annotations)
+    annotations, aliases_to_field_names, field_names_to_aliases = _get_mapping_info(expected_type)
     for key, value in object_.items():
         if direction == "read" and key in aliases_to_field_names:
             dealiased_key = aliases_to_field_names.get(key)
@@ -185,8 +223,11 @@ def _convert_mapping(
                 object_=value, annotation=type_, direction=direction
             )
         else:
-            converted_object[_alias_key(key, type_, direction, aliases_to_field_names)] = (
-                convert_and_respect_annotation_metadata(object_=value, annotation=type_, direction=direction)
+            aliased_key = (
+                aliases_to_field_names.get(key, key) if direction == "read" else field_names_to_aliases.get(key, key)
+            )
+            converted_object[aliased_key] = convert_and_respect_annotation_metadata(
+                object_=value, annotation=type_, direction=direction
             )
     return converted_object
 
@@ -221,13 +262,11 @@ def _remove_annotations(type_: typing.Any) -> typing.Any:
 
 
 def get_alias_to_field_mapping(type_: typing.Any) -> typing.Dict[str, str]:
-    annotations = typing_extensions.get_type_hints(type_, include_extras=True)
-    return _get_alias_to_field_name(annotations)
+    return dict(_get_mapping_info(type_).alias_to_field_name)
 
 
 def get_field_to_alias_mapping(type_: typing.Any) -> typing.Dict[str, str]:
-    annotations = typing_extensions.get_type_hints(type_, include_extras=True)
-    return _get_field_to_alias_name(annotations)
+    return dict(_get_mapping_info(type_).field_to_alias_name)
 
 
 def _get_alias_to_field_name(
@@ -263,14 +302,3 @@ def _get_alias_from_type(type_: typing.Any) -> typing.Optional[str]:
             if isinstance(annotation, FieldMetadata) and annotation.alias is not None:
                 return annotation.alias
     return None
-
-
-def _alias_key(
-    key: str,
-    type_: typing.Any,
-    direction: typing.Literal["read", "write"],
-    aliases_to_field_names: typing.Dict[str, str],
-) -> str:
-    if direction == "read":
-        return aliases_to_field_names.get(key, key)
-    return _get_alias_from_type(type_=type_) or key
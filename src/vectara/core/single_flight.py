@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import json
+import threading
+import typing
+
+T = typing.TypeVar("T")
+
+
+def coalesce_key(
+    method: str,
+    url: str,
+    params: typing.Any,
+    body: typing.Any,
+    headers: typing.Mapping[str, typing.Any],
+) -> typing.Optional[str]:
+    """
+    Identifies a request by its method, URL, query parameters, body and headers, so identical requests share a key.
+    Returns None for bodies which can only be sent once, such as a stream of bytes.
+    """
+    if isinstance(body, (bytes, bytearray)):
+        body_hash = hashlib.sha256(body).hexdigest()
+    elif body is None or isinstance(body, (dict, list, str)):
+        body_hash = hashlib.sha256(
+            json.dumps(body, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        ).hexdigest()
+    else:
+        return None
+    identity = json.dumps(
+        [method.upper(), url, params, body_hash, sorted((str(k).lower(), str(v)) for k, v in headers.items())],
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class _Call(typing.Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: typing.Optional[T] = None
+        self.error: typing.Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls made at the same time from several threads: the first caller makes the call, and
+    the others wait for it and share its result (or its error) rather than making the same call again.
+
+    Only calls which are in flight are shared, a call made after the first one has finished is made again.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._calls: typing.Dict[str, _Call[typing.Any]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: typing.Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return typing.cast(T, call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio equivalent of SingleFlight.
+
+    The shared call runs in its own task, so cancelling the caller which started it does not cancel it for the
+    others waiting on it.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._tasks: typing.Dict[str, "asyncio.Task[typing.Any]"] = {}
+
+    async def do(self, key: str, fn: typing.Callable[[], typing.Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+
+            def forget(done: "asyncio.Task[typing.Any]") -> None:
+                if self._tasks.get(key) is done:
+                    del self._tasks[key]
+
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
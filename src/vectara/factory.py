@@ -1,12 +1,8 @@
-from vectara.config.config import (PathConfigLoader, HomeConfigLoader, ClientConfig, EnvConfigLoader, ApiKeyAuthConfig,
-                                   OAuth2AuthConfig)
+from vectara.config.config import (PathConfigLoader, HomeConfigLoader, ClientConfig, ConnectionPoolConfig,
+                                   EnvConfigLoader, ApiKeyAuthConfig, OAuth2AuthConfig)
+from vectara.core.connection_pool import ConnectionStats, make_httpx_client
 from .client import Vectara
 from vectara.environment import VectaraEnvironment
-import httpx
-from vectara.managers.corpus import CorpusManager
-from vectara.managers.upload import UploadManager
-from vectara.managers.document import DocumentManager
-from vectara.utils import LabHelper
 
 from typing import Union, Optional, Callable, Dict, Any
 import logging
@@ -43,12 +39,14 @@ class Factory():
 
     """
 
-    def __init__(self, config_path: Union[str, None] = None, config: Optional[Union[ClientConfig, Dict[str, Any]]] = None, profile: Union[str,  None] = None):
+    def __init__(self, config_path: Union[str, None] = None, config: Optional[Union[ClientConfig, Dict[str, Any]]] = None, profile: Union[str,  None] = None,
+                 connection_stats: Optional[ConnectionStats] = None):
         """
         Initialize our factory using configuration which may either be in a file or serialized in a JSON string
 
         :param config_path: the file containing our configuration
         :param config_json: the JSON containing our configuration
+        :param connection_stats: counts the requests and connections of the built client, to check their reuse
         """
 
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -57,6 +55,7 @@ class Factory():
         self.config = config
         self.profile = profile
         self.load_method: Optional[str] = None
+        self.connection_stats = connection_stats
 
     def build(self) -> Vectara:
         """
@@ -111,9 +110,11 @@ class Factory():
                 auth=client_config.auth_endpoint or client_config.api_endpoint
             )
 
-        # Add custom httpx client if SSL verification is disabled
-        if not client_config.verify_ssl:
-            kwargs['httpx_client'] = httpx.Client(verify=False)
+        # Add custom httpx client if SSL verification is disabled or the connection pool is tuned
+        if not client_config.verify_ssl or client_config.connection_pool or self.connection_stats:
+            pool_config = client_config.connection_pool or ConnectionPoolConfig()
+            kwargs['httpx_client'] = make_httpx_client(**pool_config.model_dump(), verify=client_config.verify_ssl,
+                                                       stats=self.connection_stats)
 
         # Bind our configuration onto our client class
         client: Vectara
@@ -127,19 +128,28 @@ class Factory():
         else:
             raise TypeError(f"Unknown authentication type: {type(auth_config)}")
 
-        # Inject our convenience managers
+        # Inject our convenience managers, imported here as they pull in most of the SDK
         # TODO Move this into Vectara client
+        from vectara.managers.corpus import CorpusManager
+        from vectara.managers.upload import UploadManager
+        from vectara.managers.document import DocumentManager
+        from vectara.managers.scan import CorpusScanner
+        from vectara.utils.lab_helper import LabHelper
+
         corpus_manager = CorpusManager(client.corpora)
         client.set_corpus_manager(corpus_manager)
 
-        upload_manager = UploadManager(client.upload)
+        document_manager = DocumentManager(client.documents)
+        client.set_document_manager(document_manager)
+
+        upload_manager = UploadManager(client.upload, document_manager)
         client.set_upload_manager(upload_manager)
 
+        corpus_scanner = CorpusScanner(client.documents, client.corpora)
+        client.set_corpus_scanner(corpus_scanner)
+
         lab_helper = LabHelper(corpus_manager)
         client.set_lab_helper(lab_helper)
 
-        document_manager = DocumentManager(client.documents)
-        client.set_document_manager(document_manager)
-
         # Return the client
         return client
@@ -1,3 +1,11 @@
-from .corpus import CorpusManager, CreateCorpusRequest, CorpusBuilder
-from .upload import UploadManager
-
+from .corpus import CorpusManager, AsyncCorpusManager, CreateCorpusRequest, CorpusBuilder
+from .upload import (UploadManager, AsyncUploadManager, UploadResult, UploadStats, DirectoryUpload,
+                     AsyncDirectoryUpload)
+from .document import DocumentManager, AsyncDocumentManager, DocOpEnum
+from .manifest import Manifest, ManifestEntry
+from .scan import CorpusScanner, AsyncCorpusScanner, partition_by_values, partition_by_range, partitions_from_stats
+from .jobs import JobWaiter, AsyncJobWaiter
+from .dead_letters import (DeadLetterReprocessor, DeadLetterReprocess, DeadLetterCheckpoint, ReprocessResult,
+                           ReprocessStats, error_class)
+from .agent_events import (AgentEventMultiplexer, AgentSessionStream, AgentStreamMetrics, AgentStreamIdleTimeout,
+                           SessionEvent, Subscription)
@@ -0,0 +1,470 @@
+import asyncio
+import collections
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Counter, Deque, Dict, Generic, List, NamedTuple, Optional, Set, TypeVar
+
+from vectara.agent_events.client import AsyncAgentEventsClient
+from vectara.agent_events.types.create_agent_events_stream_request_body import CreateAgentEventsStreamRequestBody
+from vectara.core.request_options import RequestOptions
+from vectara.types import AgentStreamedResponse
+
+T = TypeVar("T")
+
+# The number of samples kept for the latency percentiles.
+MAX_SAMPLES = 10_000
+
+_END = object()
+
+
+class AgentStreamIdleTimeout(TimeoutError):
+    """
+    Raised to the subscribers of a session whose stream went without an event for longer than the idle timeout.
+    """
+
+
+class SessionEvent(NamedTuple):
+    """
+    An event of one of the sessions of a multiplexer, as delivered to the subscribers of every session. When the
+    stream of the session failed, event is None and error is set.
+    """
+    agent_key: str
+    session_key: str
+    event: Optional[AgentStreamedResponse]
+    error: Optional[Exception] = None
+
+
+class _Failure(NamedTuple):
+    error: Exception
+
+
+class Subscription(Generic[T]):
+    """
+    A bounded queue of events, iterated over with async for. A subscriber which falls behind holds up the streams
+    feeding it once its queue is full, so a subscriber should either keep consuming or close its subscription. The
+    end of the stream never waits for room in the queue: it is delivered once the queued events have been.
+
+        async with session.subscribe() as events:
+            async for event in events:
+                ...
+    """
+
+    def __init__(self, max_queue: int, owner: Optional[List["Subscription[T]"]] = None):
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue(max_queue)
+        self._owner = owner
+        self._closed = False
+        # The end (or failure) marker which didn't fit in the full queue, delivered once the queue is drained.
+        self._terminal: Any = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def _put(self, item: Any) -> None:
+        if not self._closed and self._terminal is None:
+            await self._queue.put(item)
+
+    def _offer(self, item: Any) -> bool:
+        """
+        Queues the item if there is room, returning whether it was queued (or the subscription is closed).
+        """
+        if self._closed or self._terminal is not None:
+            return True
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def _finish(self, item: Any) -> None:
+        """
+        Ends the subscription with _END or a _Failure after the events already queued, without blocking.
+        """
+        if not self._offer(item):
+            self._terminal = item
+
+    def __aiter__(self) -> AsyncIterator[T]:
+        return self
+
+    async def __anext__(self) -> T:
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        if self._queue.empty() and self._terminal is not None:
+            item, self._terminal = self._terminal, None
+        else:
+            item = await self._queue.get()
+        if item is _END:
+            self.close()
+            raise StopAsyncIteration
+        if isinstance(item, _Failure):
+            self.close()
+            raise item.error
+        return item
+
+    def close(self) -> None:
+        """
+        Stops receiving events, releasing any stream held up by this subscription.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._terminal = None
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if self._owner is not None and self in self._owner:
+            self._owner.remove(self)
+
+    async def __aenter__(self) -> "Subscription[T]":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
+
+
+class _LatencySamples:
+    """
+    The most recent latencies of a kind, summarised as a count, mean and percentiles.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._samples: Deque[float] = collections.deque(maxlen=MAX_SAMPLES)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self._samples.append(seconds)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+        return {
+            "count": self.count,
+            "mean": sum(samples) / len(samples),
+            "p50": samples[int(0.5 * (len(samples) - 1))],
+            "p95": samples[int(0.95 * (len(samples) - 1))],
+            "max": samples[-1],
+        }
+
+    def clear(self) -> None:
+        self.count = 0
+        self._samples.clear()
+
+
+class AgentStreamMetrics:
+    """
+    Aggregate counters of the sessions of a multiplexer, which are safe to read at any time: sessions and events,
+    the time from sending the input to the first streaming_agent_output, and the time from each tool_input to its
+    tool_output. Latency percentiles are over the most recent MAX_SAMPLES samples.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.time_to_first_output = _LatencySamples()
+        self.tool_call_latency = _LatencySamples()
+        # Not reset, as it counts the sessions streaming right now.
+        self.active_sessions = 0
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sessions = 0
+            self.failed_sessions = 0
+            self.idle_timeouts = 0
+            self.events = 0
+            self.events_by_type: Counter[str] = collections.Counter()
+            self.tool_errors = 0
+            self.time_to_first_output.clear()
+            self.tool_call_latency.clear()
+            self.started = time.monotonic()
+
+    def _session_started(self) -> None:
+        with self._lock:
+            self.sessions += 1
+            self.active_sessions += 1
+
+    def _session_ended(self, error: Optional[Exception]) -> None:
+        with self._lock:
+            self.active_sessions -= 1
+            if isinstance(error, AgentStreamIdleTimeout):
+                self.idle_timeouts += 1
+            if error is not None:
+                self.failed_sessions += 1
+
+    def _record_event(self, session: "AgentSessionStream", event: AgentStreamedResponse, now: float) -> None:
+        with self._lock:
+            self.events += 1
+            self.events_by_type[event.type] += 1
+            if event.type == "streaming_agent_output" and session.first_output_at is None:
+                session.first_output_at = now
+                self.time_to_first_output.record(now - session.started_at)
+            elif event.type == "tool_input":
+                session._tool_calls[event.tool_call_id] = now
+            elif event.type == "tool_output":
+                started = session._tool_calls.pop(event.tool_call_id, None)
+                if started is not None:
+                    self.tool_call_latency.record(now - started)
+                if event.error:
+                    self.tool_errors += 1
+
+    @property
+    def events_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.events / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        events_per_second = self.events_per_second
+        with self._lock:
+            return {
+                "sessions": self.sessions,
+                "active_sessions": self.active_sessions,
+                "failed_sessions": self.failed_sessions,
+                "idle_timeouts": self.idle_timeouts,
+                "events": self.events,
+                "events_per_second": events_per_second,
+                "events_by_type": dict(self.events_by_type),
+                "time_to_first_output": self.time_to_first_output.summary(),
+                "tool_call_latency": self.tool_call_latency.summary(),
+                "tool_errors": self.tool_errors,
+            }
+
+
+class AgentSessionStream:
+    """
+    The event stream of one agent session, driven by an AgentEventMultiplexer. Iterating over it receives the
+    session's events, ending after the last one or raising the error which ended the stream (an
+    AgentStreamIdleTimeout when it went idle). Further subscribers can be added with subscribe.
+
+    The stream subscribes to its own events when first iterated over, so a session which is only followed through
+    AgentEventMultiplexer.subscribe isn't held up by a queue nobody reads. Events received before then only go to
+    the other subscribers.
+    """
+
+    def __init__(self, multiplexer: "AgentEventMultiplexer", agent_key: str, session_key: str, max_queue: int):
+        self.multiplexer = multiplexer
+        self.agent_key = agent_key
+        self.session_key = session_key
+        self.max_queue = max_queue
+        self.opened_at = time.monotonic()
+        self.started_at = self.opened_at
+        self.first_output_at: Optional[float] = None
+        self.started = False
+        self.ended = False
+        self.cancelled = False
+        self.error: Optional[Exception] = None
+        self._subscribers: List[Subscription[AgentStreamedResponse]] = []
+        self._events: Optional[Subscription[AgentStreamedResponse]] = None
+        self._tool_calls: Dict[str, float] = {}
+        self._reading = False
+        self._last_activity = self.opened_at
+        self._idle = False
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def subscribe(self, max_queue: Optional[int] = None) -> Subscription[AgentStreamedResponse]:
+        """
+        Subscribes to the events of this session from now on.
+
+        :param max_queue: the number of events buffered for this subscriber, defaulting to the session's.
+        """
+        subscription: Subscription[AgentStreamedResponse] = Subscription(
+            max_queue if max_queue is not None else self.max_queue, self._subscribers)
+        if self.ended:
+            subscription._finish(_Failure(self.error) if self.error is not None else _END)
+        else:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def __aiter__(self) -> AsyncIterator[AgentStreamedResponse]:
+        if self._events is None:
+            self._events = self.subscribe()
+        return self._events
+
+    def cancel(self) -> None:
+        """
+        Stops the stream, ending the iteration of its subscribers.
+        """
+        if self._task is not None:
+            self.cancelled = True
+            self._task.cancel()
+
+    async def wait(self) -> None:
+        """
+        Waits for the stream to end.
+        """
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def _publish(self, item: Any) -> None:
+        for subscriber in list(self._subscribers):
+            await subscriber._put(item)
+
+
+class AgentEventMultiplexer:
+    """
+    Drives the event streams of many agent sessions on one event loop.
+
+    Each session opened is streamed by a task rather than a thread, and its events are fanned out to the session's
+    subscribers and to the subscribers of every session, through bounded queues: a subscriber which falls behind
+    holds up the streams feeding it instead of buffering without limit. A session whose stream goes without an
+    event for idle_timeout seconds is cancelled. metrics aggregates events/sec, time to first output and tool call
+    latency across the sessions.
+
+        multiplexer = AgentEventMultiplexer(client.agent_events, idle_timeout=60)
+        stream = multiplexer.open("support-agent", session_key, request=...)
+        async for event in stream:
+            ...
+        print(multiplexer.metrics.snapshot())
+
+    Every stream holds a connection of the client's pool while open: use make_async_httpx_client to size the pool
+    (or enable HTTP/2), or max_concurrency to queue sessions beyond it.
+    """
+
+    def __init__(self, agent_events_client: AsyncAgentEventsClient, max_queue: int = 256,
+                 idle_timeout: Optional[float] = 120.0, max_concurrency: Optional[int] = None):
+        """
+        :param agent_events_client: the client used to stream the events.
+        :param max_queue: the number of events buffered per subscriber.
+        :param idle_timeout: the seconds a stream may go without an event before it is cancelled, or None.
+        :param max_concurrency: the number of streams open at once, or None for no limit.
+        """
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.agent_events_client = agent_events_client
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self.max_concurrency = max_concurrency
+        self.metrics = AgentStreamMetrics()
+        self.sessions: Dict[str, AgentSessionStream] = {}
+        self._subscribers: List[Subscription[SessionEvent]] = []
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        self._reaper: Optional["asyncio.Task[None]"] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def open(self, agent_key: str, session_key: str, request: CreateAgentEventsStreamRequestBody,
+             request_options: Optional[RequestOptions] = None,
+             max_queue: Optional[int] = None) -> AgentSessionStream:
+        """
+        Sends an input to a session and streams its events in the background.
+
+        :param agent_key: the agent of the session.
+        :param session_key: the session to send the input to.
+        :param request: the input, which should ask for a streamed response.
+        :param request_options: the request options of the stream.
+        :param max_queue: the number of events buffered for the returned stream, defaulting to the multiplexer's.
+        :return: the session's stream, to iterate over or subscribe to.
+        """
+        if session_key in self.sessions:
+            raise ValueError(f"The session [{session_key}] is already streaming")
+        session = AgentSessionStream(self, agent_key, session_key, max_queue or self.max_queue)
+        self.sessions[session_key] = session
+        session._task = asyncio.ensure_future(self._drive(session, request, request_options))
+        self._tasks.add(session._task)
+        session._task.add_done_callback(self._tasks.discard)
+        if self.idle_timeout is not None and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.ensure_future(self._reap())
+        return session
+
+    def subscribe(self, max_queue: Optional[int] = None) -> Subscription[SessionEvent]:
+        """
+        Subscribes to the events of every session from now on, each delivered as a SessionEvent. The subscription
+        ends when the multiplexer is closed.
+        """
+        subscription: Subscription[SessionEvent] = Subscription(max_queue or self.max_queue, self._subscribers)
+        self._subscribers.append(subscription)
+        return subscription
+
+    async def close(self) -> None:
+        """
+        Cancels every stream and ends every subscription.
+        """
+        for session in list(self.sessions.values()):
+            session.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._reaper is not None:
+            self._reaper.cancel()
+        for subscriber in list(self._subscribers):
+            subscriber._finish(_END)
+
+    async def _drive(self, session: AgentSessionStream, request: CreateAgentEventsStreamRequestBody,
+                     request_options: Optional[RequestOptions]) -> None:
+        error: Optional[Exception] = None
+        stream: Optional[AsyncIterator[AgentStreamedResponse]] = None
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+            try:
+                session.started_at = session._last_activity = time.monotonic()
+                session.started = True
+                self.metrics._session_started()
+                stream = self.agent_events_client.create_stream(
+                    session.agent_key, session.session_key, request=request, request_options=request_options
+                ).__aiter__()
+                while True:
+                    session._reading = True
+                    try:
+                        event = await stream.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        session._reading = False
+                        session._last_activity = time.monotonic()
+                    self.metrics._record_event(session, event, session._last_activity)
+                    await session._publish(event)
+                    for subscriber in list(self._subscribers):
+                        await subscriber._put(SessionEvent(session.agent_key, session.session_key, event))
+                    if event.type == "end":
+                        break
+            finally:
+                if self._semaphore is not None:
+                    self._semaphore.release()
+        except asyncio.CancelledError:
+            if session._idle:
+                error = AgentStreamIdleTimeout(
+                    f"The stream of session [{session.session_key}] was idle for over {self.idle_timeout}s")
+            elif not session.cancelled:
+                raise
+        except Exception as e:
+            self.logger.warning(f"The stream of session [{session.session_key}] failed: {e}")
+            error = e
+        finally:
+            if stream is not None and hasattr(stream, "aclose"):
+                try:
+                    await stream.aclose()  # type: ignore
+                except Exception:
+                    pass
+            self._end(session, error)
+
+    def _end(self, session: AgentSessionStream, error: Optional[Exception]) -> None:
+        session.ended = True
+        session.error = error
+        self.sessions.pop(session.session_key, None)
+        if session.started:
+            self.metrics._session_ended(error)
+        # Nothing here may block: the stream may be ending because it was cancelled while held up by a subscriber.
+        for subscriber in list(session._subscribers):
+            subscriber._finish(_Failure(error) if error is not None else _END)
+        if error is not None:
+            for subscriber in list(self._subscribers):
+                if not subscriber._offer(SessionEvent(session.agent_key, session.session_key, None, error)):
+                    self.logger.warning(f"Dropped the failure of session [{session.session_key}] for a subscriber "
+                                        f"whose queue is full")
+
+    async def _reap(self) -> None:
+        """
+        Cancels the streams which have been waiting on the server for longer than the idle timeout.
+        """
+        assert self.idle_timeout is not None
+        while self.sessions:
+            await asyncio.sleep(self.idle_timeout / 4)
+            now = time.monotonic()
+            for session in list(self.sessions.values()):
+                if session._reading and now - session._last_activity > self.idle_timeout:
+                    self.logger.warning(f"The stream of session [{session.session_key}] is idle, cancelling it")
+                    session._idle = True
+                    if session._task is not None:
+                        session._task.cancel()
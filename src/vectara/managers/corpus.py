@@ -1,10 +1,11 @@
 from vectara.core.pydantic_utilities import IS_PYDANTIC_V2
 from vectara.errors.not_found_error import NotFoundError
-from vectara.corpora.client import CorporaClient
+from vectara.corpora.client import CorporaClient, AsyncCorporaClient
 from vectara.types import (Corpus, FilterAttribute, CorpusCustomDimension, CorpusLimits, FilterAttributeType,
                            FilterAttributeLevel)
-from typing import List, Union, Optional, ClassVar, Dict
+from typing import List, Union, Optional, ClassVar, Dict, Iterable, AsyncIterator
 from pydantic import Field, Extra, BaseModel, ConfigDict
+import asyncio
 import logging
 import time
 
@@ -124,6 +125,14 @@ class CorpusBuilder:
         return self.corpus
 
 
+def _create_request(corpus: Union[CreateCorpusRequest, Dict]) -> CreateCorpusRequest:
+    if isinstance(corpus, Dict):
+        corpus = CreateCorpusRequest.model_validate(corpus)
+    if not corpus.name:
+        raise Exception("You must supply a corpus name")
+    return corpus
+
+
 class CorpusManager:
     """
     Provides a layer of intelligence over the operations regarding corpus lifecycle.
@@ -231,11 +240,7 @@ class CorpusManager:
         :return: the key of the new corpus.
 
         """
-        if isinstance(corpus, Dict):
-            corpus = CreateCorpusRequest.model_validate(corpus)
-
-        if not corpus.name:
-            raise Exception("You must supply a corpus name")
+        corpus = _create_request(corpus)
         self.logger.info(f"Performing account checks before corpus creation for name [{corpus.name}]")
         existing_keys: List[Optional[str]] = []
         if corpus.key:
@@ -277,3 +282,137 @@ class CorpusManager:
         self.corpora_client.delete(key)
         self.logger.info(f"Corpus [{key}] deleted")
 
+
+class AsyncCorpusManager:
+    """
+    Asyncio equivalent of the CorpusManager, built over the AsyncCorporaClient.
+
+    Calls made through the manager are limited to max_concurrency at once, however many coroutines use it, so a
+    single event loop can drive thousands of corpus operations without exhausting the connection pool.
+    """
+
+    def __init__(self, corpora_client: AsyncCorporaClient, max_concurrency: int = 32):
+        """
+        :param corpora_client: the client used to manage corpora.
+        :param max_concurrency: the most calls to the corpora API in flight at once through this manager.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.corpora_client = corpora_client
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def find_corpora_with_filter(self, name_filter: Optional[str] = "",
+                                       limit: Optional[int] = None) -> List[Corpus]:
+        corpora: List[Corpus] = []
+        async with self._semaphore:
+            response = await self.corpora_client.list(filter=name_filter or "", limit=100)
+            async for corpus in response:
+                corpora.append(corpus)
+                if limit and len(corpora) >= limit:
+                    break
+        return corpora
+
+    async def find_corpora_by_name(self, name: str) -> List[Corpus]:
+        """
+        Searches for corpora with exactly this name. See CorpusManager.find_corpora_by_name.
+        """
+        found: List[Corpus] = []
+        for potential in await self.find_corpora_with_filter(name):
+            if potential.name == name:
+                self.logger.info(f"Found corpus with name [{potential.name}] and key [{potential.key}]")
+                found.append(potential)
+        return found
+
+    async def find_corpus_by_name(self, name: str, fail_if_not_exist=True) -> Union[Corpus, None]:
+        found = await self.find_corpora_by_name(name)
+        if len(found) > 1:
+            raise Exception(f"We found multiple matching corpus with name [{name}]")
+        if not found:
+            if fail_if_not_exist:
+                raise Exception(f"We did not find a corpus matching [{name}]")
+            self.logger.info("No corpus with name [" + name + "] can be found")
+            return None
+        self.logger.info(f"Our corpus id is [{found[0].id}]")
+        return found[0]
+
+    async def find_corpus_by_key(self, key: str) -> Union[Corpus, None]:
+        try:
+            async with self._semaphore:
+                return await self.corpora_client.get(key)
+        except NotFoundError:
+            self.logger.info(f"No corpus found with key [{key}]")
+            return None
+
+    async def delete_corpus_by_name(self, name: str) -> bool:
+        """
+        Deletes every corpus with exactly this name, concurrently. See CorpusManager.delete_corpus_by_name.
+        """
+        self.logger.info(f"Deleting existing corpus named [{name}]")
+        matching = await self.find_corpora_by_name(name)
+        for existing_corpus in matching:
+            if not existing_corpus.key:
+                raise Exception(f"Corpus result from list has returned a corpus {existing_corpus.name} without "
+                                "a key")
+        await asyncio.gather(*(self.delete(existing_corpus.key) for existing_corpus in matching))
+        return len(matching) > 0
+
+    async def create_corpus(self, corpus: Union[CreateCorpusRequest, Dict], delete_existing=False,
+                            unique=True) -> Corpus:
+        """
+        Creates a new corpus with sensible defaults. See CorpusManager.create_corpus.
+
+        :param corpus: the new corpus to create.
+        :param delete_existing: whether we delete an existing corpus with the same name.
+        :param unique: whether we fail if there is an existing corpus of the same name.
+        :return: the new corpus.
+        """
+        corpus = _create_request(corpus)
+        self.logger.info(f"Performing account checks before corpus creation for name [{corpus.name}]")
+        existing_keys: List[str] = []
+        if corpus.key:
+            existing_corpus = await self.find_corpus_by_key(corpus.key)
+            if existing_corpus and existing_corpus.key:
+                self.logger.info(f"We found existing corpus with key [{existing_corpus.key}]")
+                existing_keys.append(existing_corpus.key)
+        else:
+            existing_keys = [x.key for x in await self.find_corpora_by_name(corpus.name) if x.key]  # type: ignore
+            if existing_keys:
+                self.logger.info(f"We found existing corpus with name [{corpus.name}]")
+
+        if existing_keys:
+            if delete_existing:
+                await asyncio.gather(*(self.delete(key) for key in existing_keys))
+            elif unique:
+                raise Exception(f"Unable to create a corpus with the name [{corpus.name}] as there were existing ones and "
+                                f"the flag \"delete_existing\" is \"False\".")
+            else:
+                self.logger.warning(f"There is a potential for confusion as there is already a corpus with name [{corpus.name}]")
+        self.logger.info("Account checks complete, creating the new corpus")
+
+        async with self._semaphore:
+            return await self.corpora_client.create(**corpus.__dict__)
+
+    async def create_corpora(self, corpora: Iterable[Union[CreateCorpusRequest, Dict]], delete_existing=False,
+                             unique=True) -> AsyncIterator[Corpus]:
+        """
+        Creates many corpora concurrently, within the manager's concurrency limit, yielding each as it is created.
+        If one fails, the others are cancelled and the exception is raised.
+        """
+        from vectara.utils.concurrency import async_bounded_map
+
+        async def create(corpus: Union[CreateCorpusRequest, Dict]) -> Corpus:
+            return await self.create_corpus(corpus, delete_existing=delete_existing, unique=unique)
+
+        async for _, task in async_bounded_map(create, corpora, concurrency=self.max_concurrency):
+            yield task.result()
+
+    async def delete(self, key: Optional[str]):
+        if not key:
+            raise TypeError("You must supply a key")
+
+        self.logger.info(f"Deleting corpus with key [{key}]")
+        async with self._semaphore:
+            await self.corpora_client.delete(key)
+        self.logger.info(f"Corpus [{key}] deleted")
@@ -0,0 +1,417 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Counter, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Set, Union
+import collections
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from vectara.core.rate_limiter import RateLimiter
+from vectara.managers.jobs import JobWaiter
+from vectara.pipeline_dead_letter_entries.client import PipelineDeadLetterEntriesClient
+from vectara.types import DeadLetterOrigin, DeadLetterStatus, PipelineDeadLetterEntry, PipelineRun
+
+# Checkpoint outcomes: the entry was sent to a run which hasn't been checked yet, or the run was checked and the
+# entry resolved or failed again.
+SUBMITTED = "submitted"
+RESOLVED = "resolved"
+FAILED = "failed"
+
+# The longest error class, so that classes stay readable in reports.
+MAX_ERROR_CLASS_LENGTH = 120
+
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_IDENTIFIER = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b|"
+                         r"\b[0-9a-fA-F]{16,}\b|\S*\d\S*")
+_WHITESPACE = re.compile(r"\s+")
+
+ErrorFilter = Union[str, Pattern[str], Callable[[Optional[str]], bool]]
+
+
+def error_class(message: Optional[str]) -> str:
+    """
+    Groups error messages which only differ by the values they mention: quoted strings, ids, numbers, paths and
+    urls containing digits are replaced by placeholders.
+
+        error_class("Timed out after 30s fetching 'legal/doc-17.pdf'") == "Timed out after # fetching '…'"
+    """
+    if not message:
+        return "unknown"
+    message = _QUOTED.sub("'…'", message)
+    message = _IDENTIFIER.sub("#", message)
+    return _WHITESPACE.sub(" ", message).strip()[:MAX_ERROR_CLASS_LENGTH]
+
+
+def _error_matcher(error_filter: Optional[ErrorFilter]) -> Callable[[Optional[str]], bool]:
+    if error_filter is None:
+        return lambda message: True
+    if isinstance(error_filter, str):
+        error_filter = re.compile(error_filter)
+    if isinstance(error_filter, re.Pattern):
+        pattern = error_filter
+        return lambda message: message is not None and pattern.search(message) is not None
+    if callable(error_filter):
+        return error_filter
+    raise TypeError("error_filter must be a regular expression or a callable")
+
+
+class DeadLetterRef(NamedTuple):
+    """
+    A dead letter being reprocessed: the id of the entry, the record it is for, and the class of its error.
+    """
+    id: str
+    source_record_id: str
+    error_class: str
+
+
+class DeadLetterCheckpoint:
+    """
+    A local, on disk record of the dead letters already reprocessed, keyed by (pipeline_key, entry id), so that an
+    interrupted reprocess resumes where it stopped rather than re-driving the same records.
+
+    Entries sent to a run which hasn't been checked yet are recorded as SUBMITTED along with the run, so the run
+    can be checked on resume. Like the Manifest, the checkpoint is backed by SQLite and is safe to share between
+    threads.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        :param path: the SQLite database file, which will be created if it doesn't exist. Use ":memory:" for a
+                     checkpoint which only lives as long as this process.
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letters ("
+                "pipeline_key TEXT NOT NULL, entry_id TEXT NOT NULL, source_record_id TEXT NOT NULL, "
+                "error_class TEXT NOT NULL, run_id TEXT, outcome TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (pipeline_key, entry_id))"
+            )
+
+    def seen(self, pipeline_key: str) -> Set[str]:
+        """
+        Returns the ids of the entries of the pipeline which were already reprocessed, or are being.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT entry_id FROM dead_letters WHERE pipeline_key = ?", (pipeline_key,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def submitted(self, pipeline_key: str) -> Dict[str, List[DeadLetterRef]]:
+        """
+        Returns the entries sent to a run which hasn't been checked yet, by run id.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_id, entry_id, source_record_id, error_class FROM dead_letters "
+                "WHERE pipeline_key = ? AND outcome = ? ORDER BY run_id", (pipeline_key, SUBMITTED)
+            ).fetchall()
+        runs: Dict[str, List[DeadLetterRef]] = {}
+        for run_id, entry_id, source_record_id, entry_error_class in rows:
+            runs.setdefault(run_id, []).append(DeadLetterRef(entry_id, source_record_id, entry_error_class))
+        return runs
+
+    def record(self, pipeline_key: str, refs: Iterable[DeadLetterRef], run_id: Optional[str], outcome: str) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO dead_letters "
+                "(pipeline_key, entry_id, source_record_id, error_class, run_id, outcome, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(pipeline_key, ref.id, ref.source_record_id, ref.error_class, run_id, outcome, now) for ref in refs],
+            )
+
+    def clear(self, pipeline_key: str) -> None:
+        """
+        Forgets the progress recorded for the pipeline, so that its dead letters are reprocessed again.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM dead_letters WHERE pipeline_key = ?", (pipeline_key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+@dataclass
+class ReprocessResult:
+    """
+    The outcome of reprocessing one batch of dead letters, i.e. one pipeline run.
+
+    When the run was waited for, still_dead holds the ids of the entries which failed again; error is set when the
+    run could not be created, or couldn't be waited for.
+    """
+    refs: List[DeadLetterRef]
+    run_id: Optional[str] = None
+    run: Optional[PipelineRun] = None
+    still_dead: Optional[Set[str]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    @property
+    def verified(self) -> bool:
+        return self.still_dead is not None
+
+
+class ErrorClassStats(NamedTuple):
+    entries: int
+    resolved: int
+    failed: int
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        """
+        The share of the checked entries which were resolved, or None if none were checked.
+        """
+        checked = self.resolved + self.failed
+        return self.resolved / checked if checked else None
+
+
+class ReprocessStats:
+    """
+    Counters of a reprocess, per error class: the entries sent to a run, those resolved by it and those which
+    failed again (or whose run couldn't be created). Safe to read at any time.
+    """
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.failed_runs = 0
+        self.entries: Counter[str] = collections.Counter()
+        self.resolved: Counter[str] = collections.Counter()
+        self.failed: Counter[str] = collections.Counter()
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, result: ReprocessResult) -> None:
+        with self._lock:
+            if result.run_id is not None:
+                self.runs += 1
+            if result.error is not None:
+                self.failed_runs += 1
+            for ref in result.refs:
+                self.entries[ref.error_class] += 1
+                if result.error is not None or (result.still_dead is not None and ref.id in result.still_dead):
+                    self.failed[ref.error_class] += 1
+                elif result.still_dead is not None:
+                    self.resolved[ref.error_class] += 1
+
+    def by_error_class(self) -> Dict[str, ErrorClassStats]:
+        with self._lock:
+            return {name: ErrorClassStats(count, self.resolved[name], self.failed[name])
+                    for name, count in self.entries.most_common()}
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def snapshot(self) -> Dict[str, object]:
+        by_class = self.by_error_class()
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "failed_runs": self.failed_runs,
+                "entries": sum(self.entries.values()),
+                "resolved": sum(self.resolved.values()),
+                "failed": sum(self.failed.values()),
+                "by_error_class": {name: {**stats._asdict(), "success_rate": stats.success_rate}
+                                   for name, stats in by_class.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.runs = 0
+            self.failed_runs = 0
+            self.entries.clear()
+            self.resolved.clear()
+            self.failed.clear()
+            self.started = time.monotonic()
+
+
+
+class DeadLetterReprocess:
+    """
+    A reprocess in progress. Iterate over it to drive the reprocess and receive a ReprocessResult per run as each
+    completes, while stats tracks the totals per error class so far. Call run() to drive it to the end instead.
+    """
+
+    def __init__(self, results: Iterator[ReprocessResult]):
+        self.stats = ReprocessStats()
+        self._results = results
+
+    def __iter__(self) -> Iterator[ReprocessResult]:
+        for result in self._results:
+            self.stats.record(result)
+            yield result
+
+    def run(self) -> ReprocessStats:
+        for _ in self:
+            pass
+        return self.stats
+
+
+class DeadLetterReprocessor:
+    """
+    Re-drives the dead letters of a pipeline in bulk.
+
+    The entries are streamed from the paginated list (prefetching pages in the background), filtered on their
+    origin and error message, and sent batch_size records at a time to process, each call creating one pipeline
+    run. Up to max_concurrency runs are in flight at once, and the process calls can be paced with a RateLimiter.
+    When a JobWaiter is given each run is waited for, and the entries still listed against it afterwards are
+    counted as having failed again, giving the success rate per error class.
+
+        reprocessor = DeadLetterReprocessor(client.pipeline_dead_letter_entries, job_waiter=client.job_waiter,
+                                            checkpoint=DeadLetterCheckpoint("dead_letters.db"),
+                                            rate_limiter=RateLimiter(rate=2))
+        stats = reprocessor.reprocess("my-pipeline", error_filter="timed out").run()
+
+    With a DeadLetterCheckpoint, entries already sent to a run are skipped, so an interrupted reprocess can simply
+    be started again. Runs which hadn't been checked when it was interrupted are checked first.
+    """
+
+    def __init__(self, dead_letters_client: PipelineDeadLetterEntriesClient, job_waiter: Optional[JobWaiter] = None,
+                 checkpoint: Optional[DeadLetterCheckpoint] = None, rate_limiter: Optional[RateLimiter] = None,
+                 batch_size: int = 100, max_concurrency: int = 4, prefetch: int = 2):
+        """
+        :param dead_letters_client: the client used to list and process the dead letters.
+        :param job_waiter: used to wait for each run to finish, or None to only create the runs.
+        :param checkpoint: where progress is recorded so that an interrupted reprocess can resume.
+        :param rate_limiter: paces the process calls.
+        :param batch_size: the number of records sent to each run.
+        :param max_concurrency: the number of runs in flight at once.
+        :param prefetch: the number of pages of dead letters fetched ahead.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.dead_letters_client = dead_letters_client
+        self.job_waiter = job_waiter
+        self.checkpoint = checkpoint
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.prefetch = prefetch
+
+    def entries(self, pipeline_key: str, error_filter: Optional[ErrorFilter] = None,
+                origin: Optional[DeadLetterOrigin] = None, status: Optional[DeadLetterStatus] = None,
+                limit: int = 100) -> Iterator[PipelineDeadLetterEntry]:
+        """
+        Streams the dead letters of the pipeline.
+
+        :param pipeline_key: the pipeline whose dead letters to list.
+        :param error_filter: a regular expression searched for in the error message, or a callable taking the error
+                             message, selecting the entries to return. None returns every entry.
+        :param origin: only returns the entries of this origin.
+        :param status: only returns the entries with this status.
+        :param limit: the page size.
+        """
+        matches = _error_matcher(error_filter)
+        pager = self.dead_letters_client.list(pipeline_key, status=status, origin=origin, limit=limit)
+        for entry in pager.iter_items(prefetch=self.prefetch):
+            if matches(entry.error_message):
+                yield entry
+
+    def reprocess(self, pipeline_key: str, error_filter: Optional[ErrorFilter] = None,
+                  origin: Optional[DeadLetterOrigin] = None, status: Optional[DeadLetterStatus] = None,
+                  timeout: Optional[float] = None) -> DeadLetterReprocess:
+        """
+        Reprocesses the dead letters of the pipeline. Nothing happens until the result is iterated over (or run).
+
+        :param pipeline_key: the pipeline whose dead letters to reprocess.
+        :param error_filter: selects the entries to reprocess by their error message, see entries.
+        :param origin: only reprocesses the entries of this origin.
+        :param status: only reprocesses the entries with this status.
+        :param timeout: the seconds to wait for each run to finish.
+        :return: the reprocess, to iterate over.
+        """
+        return DeadLetterReprocess(self._reprocess(pipeline_key, error_filter, origin, status, timeout))
+
+    def _reprocess(self, pipeline_key: str, error_filter: Optional[ErrorFilter], origin: Optional[DeadLetterOrigin],
+                   status: Optional[DeadLetterStatus], timeout: Optional[float]) -> Iterator[ReprocessResult]:
+        from vectara.utils.concurrency import bounded_map
+
+        seen: Set[str] = set()
+        if self.checkpoint is not None:
+            seen = self.checkpoint.seen(pipeline_key)
+            if self.job_waiter is not None:
+                for run_id, refs in self.checkpoint.submitted(pipeline_key).items():
+                    self.logger.info(f"Checking run [{run_id}] from the previous reprocess")
+                    yield self._check(pipeline_key, ReprocessResult(refs=refs, run_id=run_id), timeout)
+
+        def refs() -> Iterator[DeadLetterRef]:
+            for entry in self.entries(pipeline_key, error_filter, origin=origin, status=status):
+                ref = DeadLetterRef(entry.id or entry.source_record_id, entry.source_record_id,
+                                    error_class(entry.error_message))
+                # Entries which fail again are updated rather than duplicated, so skip those already sent.
+                if ref.id not in seen:
+                    seen.add(ref.id)
+                    yield ref
+
+        def run(batch: List[DeadLetterRef]) -> ReprocessResult:
+            return self._run(pipeline_key, batch, timeout)
+
+        for _, future in bounded_map(run, _batches(refs(), self.batch_size), workers=self.max_concurrency):
+            yield future.result()
+
+    def _run(self, pipeline_key: str, refs: List[DeadLetterRef], timeout: Optional[float]) -> ReprocessResult:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        try:
+            run = self.dead_letters_client.process(pipeline_key,
+                                                   source_record_ids=[ref.source_record_id for ref in refs])
+        except Exception as e:
+            # Not checkpointed, so that the entries are tried again when the reprocess is resumed.
+            self.logger.warning(f"Failed to reprocess {len(refs)} dead letters: {e}")
+            return ReprocessResult(refs=refs, error=e)
+
+        self.logger.info(f"Reprocessing {len(refs)} dead letters in run [{run.id}]")
+        if self.checkpoint is not None:
+            self.checkpoint.record(pipeline_key, refs, run.id, SUBMITTED)
+        return self._check(pipeline_key, ReprocessResult(refs=refs, run_id=run.id, run=run), timeout)
+
+    def _check(self, pipeline_key: str, result: ReprocessResult, timeout: Optional[float]) -> ReprocessResult:
+        """
+        Waits for the run of the result to finish, and finds which of its entries are still dead letters.
+        """
+        if self.job_waiter is None or result.run_id is None:
+            return result
+        try:
+            result.run = self.job_waiter.wait_for_pipeline_run(pipeline_key, result.run_id, timeout=timeout).result()
+            if result.run.status == "completed":
+                pager = self.dead_letters_client.list(pipeline_key, last_run_id=result.run_id)
+                result.still_dead = {entry.id or entry.source_record_id for entry in pager}
+            else:
+                # A run which didn't complete may not have reached the records, so none count as resolved.
+                result.still_dead = {ref.id for ref in result.refs}
+        except Exception as e:
+            self.logger.warning(f"Failed to check run [{result.run_id}]: {e}")
+            result.error = e
+            return result
+
+        if self.checkpoint is not None:
+            still_dead = result.still_dead
+            self.checkpoint.record(pipeline_key, [ref for ref in result.refs if ref.id not in still_dead],
+                                   result.run_id, RESOLVED)
+            self.checkpoint.record(pipeline_key, [ref for ref in result.refs if ref.id in still_dead],
+                                   result.run_id, FAILED)
+        return result
+
+
+def _batches(refs: Iterable[DeadLetterRef], size: int) -> Iterator[List[DeadLetterRef]]:
+    batch: List[DeadLetterRef] = []
+    for ref in refs:
+        batch.append(ref)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
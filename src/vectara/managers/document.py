@@ -1,21 +1,175 @@
-from vectara.documents.client import DocumentsClient
+from vectara.documents.client import DocumentsClient, AsyncDocumentsClient
+from vectara.errors.not_found_error import NotFoundError
+from vectara.managers.manifest import Manifest
 from vectara.types import Document, CreateDocumentRequest_Core, CreateDocumentRequest_Structured
+from vectara.utils.concurrency import bounded_map, async_bounded_map
 from vectara.utils.hash import calculate_sha256
-from typing import Optional, Dict, Any, Union, Tuple
+from typing import (Optional, Dict, Any, Union, Tuple, Iterable, Iterator, AsyncIterable, AsyncIterator, List,
+                    NamedTuple)
 from enum import Enum
+from itertools import islice
 import logging
 
 HASH_FIELD = "sha256"
 
+# The number of document ids resolved by a single list call in a batched lookup.
+LOOKUP_BATCH_SIZE = 50
+
+# The maximum page size accepted by the list documents endpoint.
+MAX_LIST_LIMIT = 100
+
+IndexableDocument = Union[CreateDocumentRequest_Core, CreateDocumentRequest_Structured]
+
 class DocOpEnum(Enum):
     CREATED = 1
     UPDATED = 2
     IGNORED = 3
 
+
+class DocState(NamedTuple):
+    """
+    What the corpus knows about a document: whether it exists and the SHA256 hash recorded in its metadata.
+    """
+    exists: bool
+    sha256: Optional[str] = None
+    from_manifest: bool = False
+
+
+MISSING = DocState(exists=False)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _id_filter(doc_ids: List[str]) -> str:
+    """
+    Builds a metadata filter which matches any of the given document ids.
+    """
+    return " OR ".join(f"doc.id = {_quote(doc_id)}" for doc_id in doc_ids)
+
+
+def _doc_state(document: Document) -> DocState:
+    sha256 = document.metadata.get(HASH_FIELD) if document.metadata else None
+    return DocState(exists=True, sha256=sha256 if isinstance(sha256, str) else None)
+
+
+def _compare_state(state: DocState, sha256: str) -> Tuple[bool, Optional[bool]]:
+    """
+    Equivalent of _compare_document for a previously looked up DocState.
+
+    The hash covers the full serialized document including its metadata, so a matching hash is sufficient.
+    """
+    if not state.exists:
+        return False, None
+    if state.sha256 is None:
+        return True, False
+    return True, state.sha256.lower() == sha256.lower()
+
+
+def _manifest_state(manifest: Optional[Manifest], corpus_key: str, doc_id: str) -> Optional[DocState]:
+    """
+    Returns the document state recorded in the manifest, or None if there is no fresh entry and the server
+    needs to be consulted.
+    """
+    if manifest is None:
+        return None
+    entry = manifest.get_fresh(corpus_key, doc_id)
+    if entry is None:
+        return None
+    return DocState(exists=True, sha256=entry.sha256, from_manifest=True)
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _compare_document(doc: Optional[Document], content: bytes,
+                      metadata: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[bool]]:
+    """
+    Compares an existing document from the corpus against the content and metadata we are about to index.
+
+    :param doc: the existing document, or None if it does not exist.
+    :param content: the byte contents of the document we are checking.
+    :param metadata: metadata fields to validate.
+    :return: whether the document exists and, if so, whether it is the same.
+    """
+    if not doc:
+        return False, None
+
+    if doc.metadata and (HASH_FIELD not in doc.metadata or type(doc.metadata[HASH_FIELD]) is not str):
+        return True, False
+
+    # TODO Validate that document has matching metadata
+    if metadata:
+        if len(metadata.keys()) > 0 and doc.metadata is None:
+            return True, False
+
+        for key in metadata.keys():
+            value = metadata[key]
+            if value is None:
+                raise TypeError("Cannot compare a metadata attribute of value None")
+
+            if not doc.metadata or key not in doc.metadata:
+                # Either we don't have any existing metadata or the key isn't present.
+                return True, False
+
+            existing = doc.metadata[key]
+
+            if existing != value:
+                return True, False
+
+    if not doc.metadata or HASH_FIELD not in doc.metadata:
+        # Existing document does not have hash field set.
+        return True, False
+
+    existing_hash: str = str(doc.metadata[HASH_FIELD])
+    current_hash: str = calculate_sha256(content)
+    if existing_hash.lower() != current_hash.lower():
+        # Existing document has different value for hash field.
+        return True, False
+    else:
+        return True, True
+
+
+def _prepare_document(doc: IndexableDocument) -> Tuple[IndexableDocument, bytes]:
+    """
+    Removes any stale hash from the document metadata and returns the document with its canonical content.
+    """
+    # Remove the sha256 hash from metadata.
+    if doc.metadata and HASH_FIELD in doc.metadata:
+        del doc.metadata[HASH_FIELD]
+
+    return doc, doc.model_dump_json().encode("utf-8")
+
+
+def _with_hash(doc: IndexableDocument, sha256_hash: str) -> IndexableDocument:
+    """
+    Returns a copy of the document with the SHA256 hash of its content set in the metadata.
+    """
+    if doc.metadata:
+        metadata_copy = dict(doc.metadata)
+        metadata_copy[HASH_FIELD] = sha256_hash
+        return doc.model_copy(update={"metadata": metadata_copy})
+    else:
+        return doc.model_copy(update={"metadata": {HASH_FIELD: sha256_hash}})
+
+
 class DocumentManager:
 
-    def __init__(self, documents_client: DocumentsClient):
+    def __init__(self, documents_client: DocumentsClient, manifest: Optional[Manifest] = None):
+        """
+        :param documents_client: the client used to check, create and delete documents.
+        :param manifest: an optional local manifest, consulted before the server so unchanged documents can be
+                         skipped without any network calls.
+        """
         self.documents_client = documents_client
+        self.manifest = manifest
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def check_exists(self, corpus_key: str, doc_id: str) -> Optional[Document]:
@@ -27,7 +181,7 @@ class DocumentManager:
         :return: The found document or None
         """
         def list_documents_gen():
-            response = self.documents_client.list(corpus_key, metadata_filter=f"doc.id = '{doc_id}'")
+            response = self.documents_client.list(corpus_key, metadata_filter=_id_filter([doc_id]))
 
             for item in response:
                 yield item
@@ -40,10 +194,10 @@ class DocumentManager:
     def check_same(self, corpus_key: str, doc_id: str, content: bytes, metadata: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[bool]]:
         """
         Checks whether the corpus contains the existing document with a matching SHA256 hash and same metadata attributes.
-        
+
         This will only check the metadata attributes listed in the method signature, if there are additional metadata
         attributes on the document in the corpus, these will be ignored.
-        
+
         :param corpus_key: the corpus which holds the document
         :param doc_id: the id of the document we are checking
         :param content: the byte contents of the document we are checking.
@@ -52,90 +206,307 @@ class DocumentManager:
         """
 
         doc = self.check_exists(corpus_key, doc_id)
-        if not doc:
-            return False, None
-
-        if doc.metadata and (HASH_FIELD not in doc.metadata or type(doc.metadata[HASH_FIELD]) is not str):
-            return True, False
+        return _compare_document(doc, content, metadata)
 
-        # TODO Validate that document has matching metadata
-        if metadata:
-            if len(metadata.keys()) > 0 and doc.metadata is None:
-                return True, False
-
-            for key in metadata.keys():
-                value = metadata[key]
-                if value is None:
-                    raise TypeError("Cannot compare a metadata attribute of value None")
+    def lookup_docs(self, corpus_key: str, doc_ids: Iterable[str],
+                    batch_size: int = LOOKUP_BATCH_SIZE) -> Dict[str, DocState]:
+        """
+        Resolves the existence and stored SHA256 hash of many documents, using one list call (with an OR
+        metadata filter) per batch of ids rather than one call per document.
 
-                if not doc.metadata or key not in doc.metadata:
-                    # Either we don't have any existing metadata or the key isn't present.
-                    return True, False
+        :param corpus_key: the corpus which holds the documents.
+        :param doc_ids: the ids of the documents we are checking.
+        :param batch_size: how many ids are resolved in a single list call.
+        :return: a map of every requested id to its DocState.
+        """
+        states: Dict[str, DocState] = {}
+        for batch in _batched(doc_ids, batch_size):
+            states.update({doc_id: MISSING for doc_id in batch})
+            response = self.documents_client.list(corpus_key, metadata_filter=_id_filter(batch),
+                                                  limit=min(len(batch), MAX_LIST_LIMIT))
+            for document in response:
+                if document.id in states:
+                    states[document.id] = _doc_state(document)
+        return states
+
+    def scan_docs(self, corpus_key: str, metadata_filter: Optional[str] = None) -> Dict[str, DocState]:
+        """
+        Builds the DocState of every document in the corpus (or those matching the filter) with a single
+        paginated scan. This is cheaper than lookup_docs when re-syncing most of a corpus.
 
-                existing = doc.metadata[key]
+        Ids missing from the returned map do not exist in the corpus.
+        """
+        states: Dict[str, DocState] = {}
+        for document in self.documents_client.list(corpus_key, metadata_filter=metadata_filter, limit=MAX_LIST_LIMIT):
+            if document.id:
+                states[document.id] = _doc_state(document)
+        return states
+
+    def resolve_docs(self, corpus_key: str, doc_ids: Iterable[str],
+                     batch_size: int = LOOKUP_BATCH_SIZE) -> Dict[str, DocState]:
+        """
+        Resolves document states from the manifest where it holds a fresh entry, looking up the remainder
+        on the server with lookup_docs.
+        """
+        states: Dict[str, DocState] = {}
+        unresolved: List[str] = []
+        for doc_id in doc_ids:
+            state = _manifest_state(self.manifest, corpus_key, doc_id)
+            if state is not None:
+                states[doc_id] = state
+            else:
+                unresolved.append(doc_id)
+        if unresolved:
+            states.update(self.lookup_docs(corpus_key, unresolved, batch_size=batch_size))
+        return states
 
-                if existing != value:
-                    return True, False
+    def record_indexed(self, corpus_key: str, doc_id: str, sha256: str) -> None:
+        """
+        Records the document as indexed with the given hash in the manifest, if there is one.
+        """
+        if self.manifest is not None:
+            self.manifest.put(corpus_key, doc_id, sha256)
 
-        if not doc.metadata or HASH_FIELD not in doc.metadata:
-            # Existing document does not have hash field set.
-            return True, False
+    def delete_quietly(self, corpus_key: str, doc_id: str) -> None:
+        """
+        Deletes a document we believe exists, tolerating it having been removed by someone else.
+        """
+        try:
+            self.documents_client.delete(corpus_key, doc_id)
+        except NotFoundError:
+            self.logger.info(f"Document with id [{doc_id}] was already deleted")
 
-        existing_hash: str = str(doc.metadata[HASH_FIELD])
-        current_hash: str = calculate_sha256(content)
-        if existing_hash.lower() != current_hash.lower():
-            # Existing document has different value for hash field.
-            return True, False
-        else:
-            return True, True
+    def index_doc(self, corpus_key: str, doc: IndexableDocument, state: Optional[DocState] = None) -> DocOpEnum:
+        """
+        Creates the document, replaces it if the content has changed, or ignores it if unchanged.
 
+        If a manifest is configured and holds a fresh entry for the document it is used in place of a server
+        check, otherwise the server is consulted and the manifest updated with the result.
 
-    def index_doc(self, corpus_key: str, doc: Union[CreateDocumentRequest_Core, CreateDocumentRequest_Structured]) -> DocOpEnum:
+        :param corpus_key: the corpus to index the document into.
+        :param doc: the document to index.
+        :param state: the document state from lookup_docs or scan_docs, avoiding a per document existence check.
+        :return: the operation performed.
+        """
 
-        # Remove the sha256 hash from metadata.
-        if doc.metadata and HASH_FIELD in doc.metadata:
-            del doc.metadata[HASH_FIELD]
+        doc, content = _prepare_document(doc)
+        sha256 = calculate_sha256(content)
 
-        content = doc.model_dump_json().encode("utf-8")
+        if state is None:
+            state = _manifest_state(self.manifest, corpus_key, doc.id)
 
         # Check exists and whether same.
-        exists, same = self.check_same(corpus_key, doc.id, content, doc.metadata)
-
-        def set_metadata():
-            sha256_hash = calculate_sha256(content)
-            if doc.metadata:
-                metadata_copy = dict(doc.metadata)
-                metadata_copy[HASH_FIELD] = sha256_hash
-                result = doc.model_copy(update={"metadata": metadata_copy})
-            else:
-                result = doc.model_copy(update={"metadata": {HASH_FIELD: sha256_hash}})
-
-            return result
+        if state is not None:
+            exists, same = _compare_state(state, sha256)
+        else:
+            exists, same = self.check_same(corpus_key, doc.id, content, doc.metadata)
 
         if exists and same:
             self.logger.info("Document already exists with same hash, skipping")
+            if state is None or not state.from_manifest:
+                self.record_indexed(corpus_key, doc.id, sha256)
             return DocOpEnum.IGNORED
 
-        doc = set_metadata()
+        doc = _with_hash(doc, sha256)
 
         if not exists:
             self.logger.info("Document doesnt exist, creating fresh")
             self.documents_client.create(corpus_key, request=doc)
+            self.record_indexed(corpus_key, doc.id, sha256)
             return DocOpEnum.CREATED
 
         if exists and not same:
             self.logger.info(f"Document with id [{doc.id}] exists deleting existing and creating fresh (upsert)")
-            self.documents_client.delete(corpus_key, doc.id)
+            self.delete_quietly(corpus_key, doc.id)
             self.documents_client.create(corpus_key, request=doc)
+            self.record_indexed(corpus_key, doc.id, sha256)
             return DocOpEnum.UPDATED
         else:
             raise Exception("Invalid combination of exists/same, should not get here")
 
+    def index_docs(self, corpus_key: str, docs: Iterable[IndexableDocument], concurrency: int = 8,
+                   batch_size: int = LOOKUP_BATCH_SIZE) -> Iterator[Tuple[str, DocOpEnum]]:
+        """
+        Indexes many documents concurrently, running the delete and create for up to "concurrency"
+        documents at once on a thread pool sharing this client's connection pool. Existence checks are
+        resolved with resolve_docs: from the manifest if configured, otherwise one list call per batch_size
+        documents.
+
+        The input is consumed lazily, so generators of millions of documents can be passed without
+        holding them in memory. Results are streamed back in completion order (not input order), and the
+        next document is only read once a slot frees up, so a slow consumer naturally throttles indexing.
+
+        If indexing a document fails, outstanding work is cancelled and the exception is raised.
+
+        :param corpus_key: the corpus to index the documents into.
+        :param docs: an iterable of documents to index.
+        :param concurrency: the maximum number of documents being indexed at once.
+        :param batch_size: how many documents are checked for existence with a single list call.
+        :return: a generator of (document id, operation) tuples.
+        """
+        def with_states() -> Iterator[Tuple[IndexableDocument, DocState]]:
+            for batch in _batched(docs, batch_size):
+                states = self.resolve_docs(corpus_key, [doc.id for doc in batch], batch_size=batch_size)
+                for doc in batch:
+                    yield doc, states[doc.id]
+
+        def index(item: Tuple[IndexableDocument, DocState]) -> DocOpEnum:
+            return self.index_doc(corpus_key, item[0], state=item[1])
+
+        for (doc, _), future in bounded_map(index, with_states(), workers=concurrency):
+            yield doc.id, future.result()
+
+
+class AsyncDocumentManager:
+    """
+    Asyncio equivalent of the DocumentManager, built over the AsyncDocumentsClient.
+    """
+
+    def __init__(self, documents_client: AsyncDocumentsClient, manifest: Optional[Manifest] = None):
+        self.documents_client = documents_client
+        self.manifest = manifest
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def check_exists(self, corpus_key: str, doc_id: str) -> Optional[Document]:
+        """
+        Checks for a document by Id, returning that Document if it exists, otherwise returning None.
+
+        :param corpus_key: The corpus we expect the document to exist in.
+        :param doc_id: The ID of the document
+        :return: The found document or None
+        """
+        response = await self.documents_client.list(corpus_key, metadata_filter=_id_filter([doc_id]))
+        async for document in response:
+            return document
+
+        return None
 
+    async def check_same(self, corpus_key: str, doc_id: str, content: bytes,
+                         metadata: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[bool]]:
+        """
+        Checks whether the corpus contains the existing document with a matching SHA256 hash and same metadata
+        attributes. See DocumentManager.check_same.
+        """
+        doc = await self.check_exists(corpus_key, doc_id)
+        return _compare_document(doc, content, metadata)
 
+    async def lookup_docs(self, corpus_key: str, doc_ids: Iterable[str],
+                          batch_size: int = LOOKUP_BATCH_SIZE) -> Dict[str, DocState]:
+        """
+        Resolves the existence and stored SHA256 hash of many documents. See DocumentManager.lookup_docs.
+        """
+        states: Dict[str, DocState] = {}
+        for batch in _batched(doc_ids, batch_size):
+            states.update({doc_id: MISSING for doc_id in batch})
+            response = await self.documents_client.list(corpus_key, metadata_filter=_id_filter(batch),
+                                                        limit=min(len(batch), MAX_LIST_LIMIT))
+            async for document in response:
+                if document.id in states:
+                    states[document.id] = _doc_state(document)
+        return states
+
+    async def scan_docs(self, corpus_key: str, metadata_filter: Optional[str] = None) -> Dict[str, DocState]:
+        """
+        Builds the DocState of every document in the corpus with a single paginated scan.
+        See DocumentManager.scan_docs.
+        """
+        states: Dict[str, DocState] = {}
+        response = await self.documents_client.list(corpus_key, metadata_filter=metadata_filter, limit=MAX_LIST_LIMIT)
+        async for document in response:
+            if document.id:
+                states[document.id] = _doc_state(document)
+        return states
+
+    async def resolve_docs(self, corpus_key: str, doc_ids: Iterable[str],
+                           batch_size: int = LOOKUP_BATCH_SIZE) -> Dict[str, DocState]:
+        """
+        Resolves document states from the manifest, falling back to the server. See DocumentManager.resolve_docs.
+        """
+        states: Dict[str, DocState] = {}
+        unresolved: List[str] = []
+        for doc_id in doc_ids:
+            state = _manifest_state(self.manifest, corpus_key, doc_id)
+            if state is not None:
+                states[doc_id] = state
+            else:
+                unresolved.append(doc_id)
+        if unresolved:
+            states.update(await self.lookup_docs(corpus_key, unresolved, batch_size=batch_size))
+        return states
+
+    def record_indexed(self, corpus_key: str, doc_id: str, sha256: str) -> None:
+        if self.manifest is not None:
+            self.manifest.put(corpus_key, doc_id, sha256)
+
+    async def delete_quietly(self, corpus_key: str, doc_id: str) -> None:
+        try:
+            await self.documents_client.delete(corpus_key, doc_id)
+        except NotFoundError:
+            self.logger.info(f"Document with id [{doc_id}] was already deleted")
 
+    async def index_doc(self, corpus_key: str, doc: IndexableDocument, state: Optional[DocState] = None) -> DocOpEnum:
 
+        doc, content = _prepare_document(doc)
+        sha256 = calculate_sha256(content)
+
+        if state is None:
+            state = _manifest_state(self.manifest, corpus_key, doc.id)
+
+        if state is not None:
+            exists, same = _compare_state(state, sha256)
+        else:
+            exists, same = await self.check_same(corpus_key, doc.id, content, doc.metadata)
 
+        if exists and same:
+            self.logger.info("Document already exists with same hash, skipping")
+            if state is None or not state.from_manifest:
+                self.record_indexed(corpus_key, doc.id, sha256)
+            return DocOpEnum.IGNORED
+
+        doc = _with_hash(doc, sha256)
+
+        if not exists:
+            self.logger.info("Document doesnt exist, creating fresh")
+            await self.documents_client.create(corpus_key, request=doc)
+            self.record_indexed(corpus_key, doc.id, sha256)
+            return DocOpEnum.CREATED
+
+        self.logger.info(f"Document with id [{doc.id}] exists deleting existing and creating fresh (upsert)")
+        await self.delete_quietly(corpus_key, doc.id)
+        await self.documents_client.create(corpus_key, request=doc)
+        self.record_indexed(corpus_key, doc.id, sha256)
+        return DocOpEnum.UPDATED
+
+    async def index_docs(self, corpus_key: str, docs: Union[Iterable[IndexableDocument], AsyncIterable[IndexableDocument]],
+                         concurrency: int = 32, batch_size: int = LOOKUP_BATCH_SIZE) -> AsyncIterator[Tuple[str, DocOpEnum]]:
+        """
+        Indexes many documents concurrently on the event loop, with at most "concurrency" in flight.
+
+        Accepts a regular or async iterable, consumed lazily, and streams back (document id, operation) tuples
+        in completion order. See DocumentManager.index_docs.
+        """
+        async def batches() -> AsyncIterator[List[IndexableDocument]]:
+            if isinstance(docs, AsyncIterable):
+                batch: List[IndexableDocument] = []
+                async for doc in docs:
+                    batch.append(doc)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+            else:
+                for batch in _batched(docs, batch_size):
+                    yield batch
 
+        async def with_states() -> AsyncIterator[Tuple[IndexableDocument, DocState]]:
+            async for batch in batches():
+                states = await self.resolve_docs(corpus_key, [doc.id for doc in batch], batch_size=batch_size)
+                for doc in batch:
+                    yield doc, states[doc.id]
 
+        async def index(item: Tuple[IndexableDocument, DocState]) -> DocOpEnum:
+            return await self.index_doc(corpus_key, item[0], state=item[1])
 
+        async for (doc, _), task in async_bounded_map(index, with_states(), concurrency=concurrency):
+            yield doc.id, task.result()
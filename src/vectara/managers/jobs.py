@@ -0,0 +1,496 @@
+import asyncio
+import datetime as dt
+import logging
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from vectara.errors.not_found_error import NotFoundError
+from vectara.jobs.client import JobsClient, AsyncJobsClient
+from vectara.pipeline_runs.client import PipelineRunsClient, AsyncPipelineRunsClient
+from vectara.types import Job, PipelineRun
+
+# The states in which a job or pipeline run will not change again.
+JOB_TERMINAL_STATES = frozenset({"completed", "failed", "aborted"})
+RUN_TERMINAL_STATES = frozenset({"completed", "failed", "cancelled"})
+
+# The most jobs or runs read from one batched list before the remainder are fetched one by one.
+MAX_LISTED = 1000
+
+# The page size of the batched list calls.
+LIST_LIMIT = 100
+
+_JOB = "job"
+_RUN = "run"
+
+
+class _Watch:
+    """
+    A job or pipeline run being waited on, with the futures of everyone waiting on it and their deadlines.
+    """
+
+    def __init__(self, kind: str, key: Tuple[str, ...]):
+        self.kind = kind
+        self.key = key
+        self.state: Optional[str] = None
+        self.created_at: Optional[dt.datetime] = None
+        self.corpus_keys: Optional[List[str]] = None
+        self.waiters: List[Tuple[Any, Optional[float]]] = []
+
+
+def _settle(future: Any, result: Any = None, error: Optional[BaseException] = None) -> None:
+    """
+    Resolves a future, unless its waiter cancelled it in the meantime.
+    """
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except (InvalidStateError, asyncio.InvalidStateError):
+        pass
+
+
+class _Backoff:
+    """
+    The polling interval: back to min_interval whenever something changes state, growing by factor up to
+    max_interval while nothing does.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, factor: float):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("The polling intervals must be positive, with max_interval at least min_interval")
+        if factor < 1:
+            raise ValueError("backoff must be at least 1")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+
+    def reset(self) -> None:
+        self.interval = self.min_interval
+
+    def next(self, changed: bool) -> float:
+        self.interval = self.min_interval if changed else min(self.interval * self.factor, self.max_interval)
+        return self.interval
+
+
+def _list_jobs_kwargs(watches: List[_Watch]) -> Dict[str, Any]:
+    """
+    Narrows a batched list of jobs to those created since the oldest one waited on, in the corpora they touch.
+    """
+    kwargs: Dict[str, Any] = {"limit": LIST_LIMIT}
+    created = [watch.created_at for watch in watches if watch.created_at is not None]
+    if created:
+        kwargs["after"] = min(created) - dt.timedelta(seconds=1)
+    if all(watch.corpus_keys for watch in watches):
+        kwargs["corpus_key"] = sorted({key for watch in watches for key in watch.corpus_keys or []})
+    return kwargs
+
+
+class _JobWaiterBase:
+
+    def __init__(self, min_interval: float, max_interval: float, backoff: float):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._backoff = _Backoff(min_interval, max_interval, backoff)
+        self._watches: Dict[Tuple[str, ...], _Watch] = {}
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of jobs and pipeline runs still being waited on.
+        """
+        return len(self._watches)
+
+    def _add(self, kind: str, key: Tuple[str, ...], future: Any, timeout: Optional[float]) -> None:
+        watch = self._watches.get((kind, *key))
+        if watch is None:
+            watch = self._watches[(kind, *key)] = _Watch(kind, key)
+        watch.waiters.append((future, time.monotonic() + timeout if timeout is not None else None))
+        self._backoff.reset()
+
+    def _prune(self) -> None:
+        """
+        Forgets the waiters who cancelled their future, and times out those past their deadline.
+        """
+        now = time.monotonic()
+        for name, watch in list(self._watches.items()):
+            waiters = []
+            for future, deadline in watch.waiters:
+                if future.done():
+                    continue
+                if deadline is not None and deadline <= now:
+                    _settle(future, error=TimeoutError(
+                        f"Timed out waiting for {watch.kind} [{'/'.join(watch.key)}] in state [{watch.state}]"))
+                    continue
+                waiters.append((future, deadline))
+            watch.waiters = waiters
+            if not waiters:
+                del self._watches[name]
+
+    def _resolve(self, watch: _Watch, result: Any = None, error: Optional[BaseException] = None) -> None:
+        for future, _ in watch.waiters:
+            if not future.done():
+                _settle(future, result, error)
+        self._watches.pop((watch.kind, *watch.key), None)
+
+    def _apply(self, outcomes: List[Tuple[_Watch, Any]]) -> bool:
+        """
+        Records the latest state of each job or run, resolving those which have finished. Returns whether any of
+        them changed state.
+        """
+        changed = False
+        for watch, outcome in outcomes:
+            if isinstance(outcome, NotFoundError):
+                self._resolve(watch, error=outcome)
+                changed = True
+                continue
+            if isinstance(outcome, Exception):
+                self.logger.warning(f"Failed to poll {watch.kind} [{'/'.join(watch.key)}]: {outcome}")
+                continue
+
+            if watch.kind == _JOB:
+                state, terminal = outcome.state, JOB_TERMINAL_STATES
+                watch.corpus_keys = outcome.corpus_keys
+            else:
+                state, terminal = outcome.status, RUN_TERMINAL_STATES
+            watch.created_at = outcome.created_at
+            if state != watch.state:
+                self.logger.info(f"The {watch.kind} [{'/'.join(watch.key)}] is now [{state}]")
+                watch.state = state
+                changed = True
+            if state in terminal:
+                self._resolve(watch, result=outcome)
+        return changed
+
+    def _next_wait(self, changed: bool) -> float:
+        """
+        How long to wait before the next poll: the polling interval, cut short by the nearest deadline.
+        """
+        interval = self._backoff.next(changed)
+        deadlines = [deadline for watch in self._watches.values() for _, deadline in watch.waiters
+                     if deadline is not None]
+        if deadlines:
+            interval = min(interval, max(min(deadlines) - time.monotonic(), 0.0))
+        return interval
+
+    def _cancel_all(self) -> None:
+        for watch in list(self._watches.values()):
+            for future, _ in watch.waiters:
+                future.cancel()
+        self._watches.clear()
+
+
+class JobWaiter(_JobWaiterBase):
+    """
+    Waits for corpus jobs and pipeline runs to finish, returning a future for each.
+
+    Every job and run waited on through the same waiter is multiplexed onto one background poller: outstanding
+    jobs are read with a single (paginated) jobs.list call per round rather than a get per job, and the runs of a
+    pipeline with a single list of its running runs. The polling interval starts at min_interval and grows by the
+    backoff factor up to max_interval while nothing changes, dropping back as soon as anything changes state.
+
+        futures = waiter.wait_for_jobs(["job_1", "job_2"], timeout=600)
+        for job_id, future in futures.items():
+            print(job_id, future.result().state)
+
+    A future resolves to the job or run once it is in a terminal state (including failed ones), raises a
+    TimeoutError when its timeout passes first, and can be cancelled to stop waiting.
+    """
+
+    def __init__(self, jobs_client: JobsClient, pipeline_runs_client: Optional[PipelineRunsClient] = None,
+                 min_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 1.5):
+        """
+        :param jobs_client: the client used to poll jobs.
+        :param pipeline_runs_client: the client used to poll pipeline runs.
+        :param min_interval: the seconds between polls just after something changed state.
+        :param max_interval: the most seconds between polls.
+        :param backoff: how much the interval grows after each poll in which nothing changed.
+        """
+        super().__init__(min_interval, max_interval, backoff)
+        self.jobs_client = jobs_client
+        self.pipeline_runs_client = pipeline_runs_client
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        # Set when jobs or runs are added while the poller is polling outside the lock, so that it polls again
+        # straight away instead of missing the notification and sleeping through its interval.
+        self._pending = False
+
+    def wait_for_jobs(self, job_ids: Iterable[str], timeout: Optional[float] = None) -> Dict[str, "Future[Job]"]:
+        """
+        Waits for the jobs to finish.
+
+        :param job_ids: the jobs to wait for.
+        :param timeout: the seconds to wait for each job before its future raises a TimeoutError, or None to wait
+                        for as long as it takes.
+        :return: a future per job id, resolving to the finished job.
+        """
+        futures: Dict[str, "Future[Job]"] = {}
+        with self._condition:
+            for job_id in job_ids:
+                if job_id in futures:
+                    continue
+                futures[job_id] = Future()
+                self._add(_JOB, (job_id,), futures[job_id], timeout)
+            self._start()
+        return futures
+
+    def wait_for_pipeline_run(self, pipeline_key: str, run_id: str,
+                              timeout: Optional[float] = None) -> "Future[PipelineRun]":
+        """
+        Waits for a pipeline run to finish.
+
+        :param pipeline_key: the pipeline of the run.
+        :param run_id: the run to wait for.
+        :param timeout: the seconds to wait before the future raises a TimeoutError, or None to wait for as long as
+                        it takes.
+        :return: a future resolving to the finished run.
+        """
+        if self.pipeline_runs_client is None:
+            raise TypeError("You must supply a PipelineRunsClient to wait for pipeline runs")
+        future: "Future[PipelineRun]" = Future()
+        with self._condition:
+            self._add(_RUN, (pipeline_key, run_id), future, timeout)
+            self._start()
+        return future
+
+    def close(self) -> None:
+        """
+        Stops waiting, cancelling every outstanding future.
+        """
+        with self._condition:
+            self._cancel_all()
+            self._pending = True
+            self._condition.notify_all()
+
+    def _start(self) -> None:
+        # Called with the condition held, waking the poller to poll the new jobs or runs straight away.
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="vectara-job-waiter", daemon=True)
+            self._thread.start()
+        self._pending = True
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        try:
+            self._poll_until_done()
+        except Exception:
+            self.logger.exception("The job poller failed, it will be restarted by the next wait")
+        finally:
+            with self._condition:
+                # Unless the poller ended normally, making way for a new one which may be running by now.
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _poll_until_done(self) -> None:
+        while True:
+            with self._condition:
+                self._prune()
+                if not self._watches:
+                    self._thread = None
+                    return
+                watches = list(self._watches.values())
+                self._pending = False
+
+            outcomes = self._poll_jobs([watch for watch in watches if watch.kind == _JOB])
+            outcomes += self._poll_runs([watch for watch in watches if watch.kind == _RUN])
+
+            with self._condition:
+                changed = self._apply(outcomes)
+                if not self._pending:
+                    self._condition.wait(self._next_wait(changed))
+
+    def _poll_jobs(self, watches: List[_Watch]) -> List[Tuple[_Watch, Any]]:
+        found: Dict[str, Job] = {}
+        # Jobs we have seen once can be found in a batched list, the others are fetched one by one.
+        listed = [watch for watch in watches if watch.created_at is not None]
+        if len(listed) > 1:
+            wanted = {watch.key[0] for watch in listed}
+            try:
+                for i, job in enumerate(self.jobs_client.list(**_list_jobs_kwargs(listed))):
+                    if job.id in wanted:
+                        found[job.id] = job
+                    if len(found) == len(wanted) or i + 1 >= MAX_LISTED:
+                        break
+            except Exception as e:
+                self.logger.warning(f"Failed to list jobs, fetching them one by one: {e}")
+
+        outcomes: List[Tuple[_Watch, Any]] = []
+        for watch in watches:
+            job_id = watch.key[0]
+            if job_id in found:
+                outcomes.append((watch, found[job_id]))
+                continue
+            try:
+                outcomes.append((watch, self.jobs_client.get(job_id)))
+            except Exception as e:
+                outcomes.append((watch, e))
+        return outcomes
+
+    def _poll_runs(self, watches: List[_Watch]) -> List[Tuple[_Watch, Any]]:
+        by_pipeline: Dict[str, List[_Watch]] = {}
+        for watch in watches:
+            by_pipeline.setdefault(watch.key[0], []).append(watch)
+
+        outcomes: List[Tuple[_Watch, Any]] = []
+        for pipeline_key, pipeline_watches in by_pipeline.items():
+            running: Optional[Dict[str, PipelineRun]] = None
+            # The runs missing from the list of running runs have finished, and are fetched to learn how.
+            if len(pipeline_watches) > 1:
+                try:
+                    running = {}
+                    pager = self.pipeline_runs_client.list(pipeline_key, status="running",  # type: ignore
+                                                           limit=LIST_LIMIT)
+                    for i, run in enumerate(pager):
+                        running[run.id] = run
+                        if i + 1 >= MAX_LISTED:
+                            running = None
+                            break
+                except Exception as e:
+                    self.logger.warning(f"Failed to list the runs of pipeline [{pipeline_key}]: {e}")
+                    running = None
+
+            for watch in pipeline_watches:
+                run_id = watch.key[1]
+                if running is not None and run_id in running:
+                    outcomes.append((watch, running[run_id]))
+                    continue
+                try:
+                    outcomes.append((watch, self.pipeline_runs_client.get(pipeline_key, run_id)))  # type: ignore
+                except Exception as e:
+                    outcomes.append((watch, e))
+        return outcomes
+
+
+class AsyncJobWaiter(_JobWaiterBase):
+    """
+    The asyncio equivalent of JobWaiter, polling in a task on the running event loop and returning asyncio futures.
+
+        futures = waiter.wait_for_jobs(["job_1", "job_2"], timeout=600)
+        jobs = await asyncio.gather(*futures.values())
+    """
+
+    def __init__(self, jobs_client: AsyncJobsClient, pipeline_runs_client: Optional[AsyncPipelineRunsClient] = None,
+                 min_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 1.5):
+        super().__init__(min_interval, max_interval, backoff)
+        self.jobs_client = jobs_client
+        self.pipeline_runs_client = pipeline_runs_client
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def wait_for_jobs(self, job_ids: Iterable[str],
+                      timeout: Optional[float] = None) -> Dict[str, "asyncio.Future[Job]"]:
+        """
+        Waits for the jobs to finish. See JobWaiter.wait_for_jobs.
+        """
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, "asyncio.Future[Job]"] = {}
+        for job_id in job_ids:
+            if job_id in futures:
+                continue
+            futures[job_id] = loop.create_future()
+            self._add(_JOB, (job_id,), futures[job_id], timeout)
+        self._start()
+        return futures
+
+    def wait_for_pipeline_run(self, pipeline_key: str, run_id: str,
+                              timeout: Optional[float] = None) -> "asyncio.Future[PipelineRun]":
+        """
+        Waits for a pipeline run to finish. See JobWaiter.wait_for_pipeline_run.
+        """
+        if self.pipeline_runs_client is None:
+            raise TypeError("You must supply an AsyncPipelineRunsClient to wait for pipeline runs")
+        future: "asyncio.Future[PipelineRun]" = asyncio.get_running_loop().create_future()
+        self._add(_RUN, (pipeline_key, run_id), future, timeout)
+        self._start()
+        return future
+
+    def close(self) -> None:
+        """
+        Stops waiting, cancelling every outstanding future.
+        """
+        self._cancel_all()
+        self._wakeup.set()
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._prune()
+            if not self._watches:
+                return
+            self._wakeup.clear()
+            watches = list(self._watches.values())
+
+            outcomes = await self._poll_jobs([watch for watch in watches if watch.kind == _JOB])
+            outcomes += await self._poll_runs([watch for watch in watches if watch.kind == _RUN])
+            changed = self._apply(outcomes)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_wait(changed))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_jobs(self, watches: List[_Watch]) -> List[Tuple[_Watch, Any]]:
+        found: Dict[str, Job] = {}
+        listed = [watch for watch in watches if watch.created_at is not None]
+        if len(listed) > 1:
+            wanted = {watch.key[0] for watch in listed}
+            try:
+                i = 0
+                async for job in await self.jobs_client.list(**_list_jobs_kwargs(listed)):
+                    if job.id in wanted:
+                        found[job.id] = job
+                    i += 1
+                    if len(found) == len(wanted) or i >= MAX_LISTED:
+                        break
+            except Exception as e:
+                self.logger.warning(f"Failed to list jobs, fetching them one by one: {e}")
+
+        async def get(watch: _Watch) -> Tuple[_Watch, Any]:
+            job_id = watch.key[0]
+            if job_id in found:
+                return watch, found[job_id]
+            try:
+                return watch, await self.jobs_client.get(job_id)
+            except Exception as e:
+                return watch, e
+
+        return list(await asyncio.gather(*(get(watch) for watch in watches)))
+
+    async def _poll_runs(self, watches: List[_Watch]) -> List[Tuple[_Watch, Any]]:
+        by_pipeline: Dict[str, List[_Watch]] = {}
+        for watch in watches:
+            by_pipeline.setdefault(watch.key[0], []).append(watch)
+
+        running: Dict[str, Optional[Dict[str, PipelineRun]]] = {}
+        for pipeline_key, pipeline_watches in by_pipeline.items():
+            running[pipeline_key] = None
+            if len(pipeline_watches) > 1:
+                try:
+                    runs: Optional[Dict[str, PipelineRun]] = {}
+                    pager = await self.pipeline_runs_client.list(pipeline_key, status="running",  # type: ignore
+                                                                 limit=LIST_LIMIT)
+                    async for run in pager:
+                        runs[run.id] = run  # type: ignore
+                        if len(runs) >= MAX_LISTED:  # type: ignore
+                            runs = None
+                            break
+                    running[pipeline_key] = runs
+                except Exception as e:
+                    self.logger.warning(f"Failed to list the runs of pipeline [{pipeline_key}]: {e}")
+
+        async def get(watch: _Watch) -> Tuple[_Watch, Any]:
+            pipeline_key, run_id = watch.key
+            runs = running[pipeline_key]
+            if runs is not None and run_id in runs:
+                return watch, runs[run_id]
+            try:
+                return watch, await self.pipeline_runs_client.get(pipeline_key, run_id)  # type: ignore
+            except Exception as e:
+                return watch, e
+
+        return list(await asyncio.gather(*(get(watch) for watch in watches)))
@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Optional, Union, NamedTuple
+import sqlite3
+import threading
+import time
+
+
+class ManifestEntry(NamedTuple):
+    """
+    The last known indexed state of a document.
+    """
+    sha256: str
+    indexed_at: float
+
+
+class Manifest:
+    """
+    A local, on disk record of the documents we have indexed, keyed by (corpus_key, doc_id).
+
+    Consulting the manifest lets incremental syncs skip unchanged documents without any network calls. Entries
+    older than max_age seconds are considered stale, in which case the caller should reconcile against the
+    SHA256 hash stored in the document metadata on the server and record the result again.
+
+    The manifest is backed by SQLite and is safe to share between threads.
+    """
+
+    def __init__(self, path: Union[str, Path], max_age: Optional[float] = None):
+        """
+        :param path: the SQLite database file, which will be created if it doesn't exist. Use ":memory:" for a
+                     manifest which only lives as long as this process.
+        :param max_age: the number of seconds an entry is trusted before it is reconciled with the server, or
+                        None to always trust entries.
+        """
+        self.path = str(path)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            if self.path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS manifest ("
+                "corpus_key TEXT NOT NULL, doc_id TEXT NOT NULL, sha256 TEXT NOT NULL, indexed_at REAL NOT NULL, "
+                "PRIMARY KEY (corpus_key, doc_id))"
+            )
+
+    def get(self, corpus_key: str, doc_id: str) -> Optional[ManifestEntry]:
+        """
+        Returns the recorded entry for the document, whether or not it is stale.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT sha256, indexed_at FROM manifest WHERE corpus_key = ? AND doc_id = ?", (corpus_key, doc_id)
+            ).fetchone()
+        return ManifestEntry(sha256=row[0], indexed_at=row[1]) if row else None
+
+    def get_fresh(self, corpus_key: str, doc_id: str) -> Optional[ManifestEntry]:
+        """
+        Returns the recorded entry for the document, or None if it is missing or stale.
+        """
+        entry = self.get(corpus_key, doc_id)
+        if entry is None or self.is_stale(entry):
+            return None
+        return entry
+
+    def is_stale(self, entry: ManifestEntry) -> bool:
+        return self.max_age is not None and time.time() - entry.indexed_at > self.max_age
+
+    def put(self, corpus_key: str, doc_id: str, sha256: str, indexed_at: Optional[float] = None) -> None:
+        """
+        Records that the document with the given hash is indexed in the corpus.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO manifest (corpus_key, doc_id, sha256, indexed_at) VALUES (?, ?, ?, ?)",
+                (corpus_key, doc_id, sha256, indexed_at if indexed_at is not None else time.time()),
+            )
+
+    def remove(self, corpus_key: str, doc_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM manifest WHERE corpus_key = ? AND doc_id = ?", (corpus_key, doc_id))
+
+    def clear(self, corpus_key: str) -> None:
+        """
+        Forgets every document recorded for the corpus, e.g. after the corpus has been deleted or reset.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM manifest WHERE corpus_key = ?", (corpus_key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
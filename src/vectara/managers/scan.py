@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Sequence
+
+from vectara.corpora.client import CorporaClient, AsyncCorporaClient
+from vectara.documents.client import DocumentsClient, AsyncDocumentsClient
+from vectara.managers.document import MAX_LIST_LIMIT, _quote
+from vectara.types import Document, FilterAttributeStat
+
+# The number of partitions a scan is split into when they are derived from the filter attribute statistics.
+DEFAULT_PARTITIONS = 16
+
+# Marks that a partition has been fully paginated.
+_DONE = object()
+
+
+class _ScanError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return _quote(str(value))
+
+
+def partition_by_values(attribute: str, values: Iterable[Any]) -> List[str]:
+    """
+    Builds metadata filters which split a corpus on the values of an attribute: one filter per value, and one for
+    the documents with any other value (or none at all), so that together they cover the whole corpus.
+
+    :param attribute: the qualified name of a scalar filter attribute, e.g. "doc.category".
+    :param values: the values to give their own partition, ideally the most common ones.
+    :return: the disjoint metadata filters.
+    """
+    literals = list(dict.fromkeys(_literal(value) for value in values))
+    if not literals:
+        return []
+    filters = [f"{attribute} = {literal}" for literal in literals]
+    filters.append(f"({attribute} IS NULL OR NOT ({attribute} IN ({', '.join(literals)})))")
+    return filters
+
+
+def partition_by_range(attribute: str, boundaries: Sequence[float]) -> List[str]:
+    """
+    Builds metadata filters which split a corpus into ranges of a numeric attribute at the given boundaries. The
+    first and last ranges are open ended, and documents without the attribute get their own partition, so that
+    together they cover the whole corpus.
+
+    :param attribute: the qualified name of a numeric filter attribute, e.g. "doc.year".
+    :param boundaries: the values at which a new range starts.
+    :return: the disjoint metadata filters.
+    """
+    bounds = sorted(set(boundaries))
+    if not bounds:
+        return []
+    filters = [f"{attribute} < {_literal(bounds[0])}"]
+    for lower, upper in zip(bounds, bounds[1:]):
+        filters.append(f"{attribute} >= {_literal(lower)} AND {attribute} < {_literal(upper)}")
+    filters.append(f"{attribute} >= {_literal(bounds[-1])}")
+    filters.append(f"{attribute} IS NULL")
+    return filters
+
+
+def partitions_from_stats(stat: FilterAttributeStat, partitions: int = DEFAULT_PARTITIONS) -> List[str]:
+    """
+    Derives disjoint metadata filters from the statistics of a filter attribute: numeric attributes are split into
+    equal width ranges between their minimum and maximum, other attributes on their most common values.
+
+    :param stat: the statistics of the attribute, from corpora.get_filter_attribute_stats.
+    :param partitions: the approximate number of partitions to produce.
+    :return: the disjoint metadata filters.
+    """
+    if str(stat.type).startswith("list"):
+        raise TypeError(f"Cannot partition on the list attribute [{stat.name}], a document may hold several values")
+
+    if stat.type in ("integer", "real_number"):
+        if stat.stats is None:
+            return []
+        low, high = stat.stats.min, stat.stats.max
+        if high <= low:
+            return partition_by_values(stat.name, [int(low) if stat.type == "integer" else low])
+        width = (high - low) / max(partitions - 1, 1)
+        boundaries = [low + width * i for i in range(1, max(partitions - 1, 1))]
+        if stat.type == "integer":
+            boundaries = [int(round(boundary)) for boundary in boundaries]
+        return partition_by_range(stat.name, boundaries or [high])
+
+    return partition_by_values(stat.name, [value.value for value in stat.values[:max(partitions - 1, 1)]])
+
+
+def _with_filter(metadata_filter: Optional[str], partition: str) -> str:
+    if not metadata_filter:
+        return partition
+    return f"({metadata_filter}) AND ({partition})"
+
+
+class CorpusScanner:
+    """
+    Lists every document in a corpus by paginating disjoint metadata filter partitions of it concurrently.
+
+    A single list is a chain of page_key requests, so enumerating a large corpus is bound by the latency of each
+    page. Splitting the corpus into partitions gives several independent chains which can run side by side, bounded
+    by the concurrency rather than the size of the corpus. Partitions should be disjoint (every document matches
+    exactly one of them) for each document to be listed once, which the partition_by_* helpers guarantee.
+
+        scanner = CorpusScanner(client.documents, client.corpora)
+        for document in scanner.scan("my-corpus", attribute="doc.year", concurrency=8):
+            ...
+    """
+
+    def __init__(self, documents_client: DocumentsClient, corpora_client: Optional[CorporaClient] = None):
+        """
+        :param documents_client: the client used to list documents.
+        :param corpora_client: the client used to fetch filter attribute statistics, when partitioning on an
+                               attribute.
+        """
+        self.documents_client = documents_client
+        self.corpora_client = corpora_client
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def partitions(self, corpus_key: str, attribute: str, partitions: int = DEFAULT_PARTITIONS,
+                   metadata_filter: Optional[str] = None) -> List[str]:
+        """
+        Derives disjoint metadata filters for the corpus from the statistics of one of its filter attributes.
+
+        :param corpus_key: the corpus to partition.
+        :param attribute: the qualified name of the filter attribute to partition on, e.g. "doc.year".
+        :param partitions: the approximate number of partitions to produce.
+        :param metadata_filter: restricts the statistics to the documents which will be scanned.
+        :return: the metadata filters.
+        """
+        if self.corpora_client is None:
+            raise TypeError("You must supply a CorporaClient to partition a corpus on an attribute")
+        response = self.corpora_client.get_filter_attribute_stats(corpus_key, fields=attribute,
+                                                                  metadata_filter=metadata_filter,
+                                                                  max_values=max(partitions - 1, 1))
+        return _partitions_from_response(attribute, response.filter_attribute_stats, partitions)
+
+    def scan(self, corpus_key: str, partitions: Optional[Sequence[str]] = None, attribute: Optional[str] = None,
+             concurrency: int = 8, metadata_filter: Optional[str] = None,
+             page_size: int = MAX_LIST_LIMIT) -> Iterator[Document]:
+        """
+        Lists the documents of the corpus, paginating up to concurrency partitions at once and yielding the
+        documents of each page as it arrives. Documents from different partitions are interleaved.
+
+        :param corpus_key: the corpus to scan.
+        :param partitions: the disjoint metadata filters to split the corpus into.
+        :param attribute: a filter attribute to derive the partitions from, when they are not given.
+        :param concurrency: the number of partitions paginated at once.
+        :param metadata_filter: restricts the scan to the documents matching this filter.
+        :param page_size: the number of documents requested per page.
+        :return: a generator of the documents.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if partitions is None and attribute is not None:
+            partitions = self.partitions(corpus_key, attribute, partitions=max(concurrency * 2, DEFAULT_PARTITIONS),
+                                         metadata_filter=metadata_filter)
+        filters = [_with_filter(metadata_filter, partition) for partition in partitions or []]
+        if not filters:
+            yield from self.documents_client.list(corpus_key, metadata_filter=metadata_filter, limit=page_size)
+            return
+
+        self.logger.info(f"Scanning corpus [{corpus_key}] in {len(filters)} partitions")
+        pages: "queue.Queue[Any]" = queue.Queue(maxsize=concurrency * 2)
+        stopped = threading.Event()
+
+        def put(item: Any) -> None:
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def paginate(partition: str) -> None:
+            try:
+                pager = self.documents_client.list(corpus_key, metadata_filter=partition, limit=page_size)
+                for page in pager.iter_pages():
+                    if stopped.is_set():
+                        return
+                    put(page.items or [])
+            except BaseException as e:
+                put(_ScanError(e))
+            finally:
+                put(_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=min(concurrency, len(filters)))
+        futures = [executor.submit(paginate, partition) for partition in filters]
+        try:
+            remaining = len(filters)
+            while remaining:
+                item = pages.get()
+                if item is _DONE:
+                    remaining -= 1
+                elif isinstance(item, _ScanError):
+                    raise item.error
+                else:
+                    yield from item
+        finally:
+            stopped.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+
+class AsyncCorpusScanner:
+    """
+    Asyncio equivalent of the CorpusScanner, built over the AsyncDocumentsClient.
+    """
+
+    def __init__(self, documents_client: AsyncDocumentsClient, corpora_client: Optional[AsyncCorporaClient] = None):
+        self.documents_client = documents_client
+        self.corpora_client = corpora_client
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def partitions(self, corpus_key: str, attribute: str, partitions: int = DEFAULT_PARTITIONS,
+                         metadata_filter: Optional[str] = None) -> List[str]:
+        """
+        Derives disjoint metadata filters for the corpus. See CorpusScanner.partitions.
+        """
+        if self.corpora_client is None:
+            raise TypeError("You must supply an AsyncCorporaClient to partition a corpus on an attribute")
+        response = await self.corpora_client.get_filter_attribute_stats(corpus_key, fields=attribute,
+                                                                        metadata_filter=metadata_filter,
+                                                                        max_values=max(partitions - 1, 1))
+        return _partitions_from_response(attribute, response.filter_attribute_stats, partitions)
+
+    async def scan(self, corpus_key: str, partitions: Optional[Sequence[str]] = None,
+                   attribute: Optional[str] = None, concurrency: int = 8, metadata_filter: Optional[str] = None,
+                   page_size: int = MAX_LIST_LIMIT) -> AsyncIterator[Document]:
+        """
+        Lists the documents of the corpus, paginating up to concurrency partitions at once. See CorpusScanner.scan.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if partitions is None and attribute is not None:
+            partitions = await self.partitions(corpus_key, attribute,
+                                               partitions=max(concurrency * 2, DEFAULT_PARTITIONS),
+                                               metadata_filter=metadata_filter)
+        filters = [_with_filter(metadata_filter, partition) for partition in partitions or []]
+        if not filters:
+            pager = await self.documents_client.list(corpus_key, metadata_filter=metadata_filter, limit=page_size)
+            async for document in pager:
+                yield document
+            return
+
+        self.logger.info(f"Scanning corpus [{corpus_key}] in {len(filters)} partitions")
+        pages: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=concurrency * 2)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def paginate(partition: str) -> None:
+            try:
+                async with semaphore:
+                    pager = await self.documents_client.list(corpus_key, metadata_filter=partition,
+                                                             limit=page_size)
+                    async for page in pager.iter_pages():
+                        await pages.put(page.items or [])
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                await pages.put(_ScanError(e))
+            await pages.put(_DONE)
+
+        tasks = [asyncio.ensure_future(paginate(partition)) for partition in filters]
+        try:
+            remaining = len(filters)
+            while remaining:
+                item = await pages.get()
+                if item is _DONE:
+                    remaining -= 1
+                elif isinstance(item, _ScanError):
+                    raise item.error
+                else:
+                    for document in item:
+                        yield document
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _partitions_from_response(attribute: str, stats: List[FilterAttributeStat], partitions: int) -> List[str]:
+    for stat in stats:
+        if stat.name == attribute:
+            return partitions_from_stats(stat, partitions)
+    raise TypeError(f"The corpus has no filter attribute [{attribute}]")
@@ -1,40 +1,509 @@
+import asyncio
 import json
 import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Union, Optional, Dict
-from vectara.upload.client import UploadClient
+from typing import Union, Optional, Dict, Iterator, AsyncIterator, Tuple, BinaryIO, List
+from vectara.upload.client import UploadClient, AsyncUploadClient
 from vectara.types import Document
+from vectara.managers.document import (DocumentManager, AsyncDocumentManager, DocOpEnum, DocState, HASH_FIELD,
+                                       LOOKUP_BATCH_SIZE, _batched, _compare_state)
+from vectara.utils.concurrency import bounded_map, async_bounded_map
+from vectara.utils.hash import calculate_file_sha256
 import mimetypes
 
 
+class ByteBudget:
+    """
+    Caps the total number of bytes in flight across concurrent uploads sharing this budget.
+
+    Uploads larger than the whole budget are allowed, but only once nothing else is in flight.
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[None]:
+        size = min(size, self.max_bytes)
+        with self._condition:
+            while self.in_flight + size > self.max_bytes:
+                self._condition.wait()
+            self.in_flight += size
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= size
+                self._condition.notify_all()
+
+
+class AsyncByteBudget:
+    """
+    The asyncio equivalent of ByteBudget, shared by the coroutines of one event loop.
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def reserve(self, size: int) -> AsyncIterator[None]:
+        size = min(size, self.max_bytes)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight + size <= self.max_bytes)
+            self.in_flight += size
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= size
+                self._condition.notify_all()
+
+
+@dataclass
+class UploadResult:
+    """
+    The outcome of uploading a single file as part of a directory upload.
+    """
+    doc_id: str
+    path: Path
+    size: int
+    elapsed: float
+    document: Optional[Document] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class UploadStats:
+    """
+    Running totals for a directory upload, updated as each result is yielded.
+    """
+    files: int = 0
+    failed: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def succeeded(self) -> int:
+        return self.files - self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def files_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.files / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def record(self, result: UploadResult) -> None:
+        self.files += 1
+        if result.succeeded:
+            self.bytes += result.size
+        else:
+            self.failed += 1
+
+
+class DirectoryUpload:
+    """
+    A directory upload in progress. Iterate over it to drive the upload and receive an UploadResult per file
+    as each completes, while stats tracks the totals and throughput so far.
+    """
+
+    def __init__(self, results: Iterator[UploadResult]):
+        self.stats = UploadStats()
+        self._results = results
+
+    def __iter__(self) -> Iterator[UploadResult]:
+        for result in self._results:
+            self.stats.record(result)
+            yield result
+
+
+class AsyncDirectoryUpload:
+    """
+    The asyncio equivalent of DirectoryUpload: iterate over it with async for to drive the upload.
+    """
+
+    def __init__(self, results: AsyncIterator[UploadResult]):
+        self.stats = UploadStats()
+        self._results = results
+
+    async def __aiter__(self) -> AsyncIterator[UploadResult]:
+        async for result in self._results:
+            self.stats.record(result)
+            yield result
+
+
+def _file_size(f: BinaryIO) -> int:
+    try:
+        return os.fstat(f.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        position = f.tell()
+        size = f.seek(0, os.SEEK_END) - position
+        f.seek(position)
+        return size
+
+
+def _discover_mime_type(name: str) -> Optional[str]:
+    mime_type, encoding = mimetypes.guess_type(name)
+    return mime_type
+
+
+def _walk(root: Path, pattern: str) -> Iterator[Path]:
+    """
+    Lazily yields the files under root matching the glob pattern.
+    """
+    for path in root.glob(pattern):
+        if path.is_file():
+            yield path
+
+
+def _doc_id(root: Path, path: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+def _sync_metadata(metadata: Optional[Dict]) -> Optional[bytes]:
+    """
+    The metadata hashed along with a file when syncing, so a change of metadata is a change of the document.
+    """
+    return json.dumps(metadata, sort_keys=True).encode("utf-8") if metadata else None
+
+
 class UploadManager:
 
-    def __init__(self, upload_client: UploadClient):
+    def __init__(self, upload_client: UploadClient, document_manager: Optional[DocumentManager] = None,
+                 max_inflight_bytes: Optional[int] = None):
+        """
+        :param upload_client: the client used to upload files.
+        :param document_manager: used to track document state (and its manifest) when syncing directories.
+        :param max_inflight_bytes: caps the combined size of the files being uploaded at once across all threads
+                                   using this manager, or None for no limit.
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.upload_client = upload_client
+        self.document_manager = document_manager
+        self.budget: Optional[ByteBudget] = ByteBudget(max_inflight_bytes) if max_inflight_bytes else None
 
     def _discover_mime_type(self, name: str):
-        mime_type, encoding = mimetypes.guess_type(name)
-        return mime_type
+        return _discover_mime_type(name)
+
+    def _walk(self, root: Path, pattern: str) -> Iterator[Path]:
+        return _walk(root, pattern)
+
+    def _doc_id(self, root: Path, path: Path) -> str:
+        return _doc_id(root, path)
 
-    def upload(self, corpus_key: str, target: Union[str, Path], doc_id: Union[None, str] = None,
+    def upload(self, corpus_key: str, target: Union[str, Path, BinaryIO], doc_id: Union[None, str] = None,
                metadata: Optional[Dict] = None) -> Document:
+        """
+        Uploads a file to the corpus.
 
+        The file is never read into memory: the open file handle is passed through to the multipart encoder, which
+        streams it from disk in chunks (and rewinds it if the request is retried).
+
+        :param corpus_key: the corpus to upload the file into.
+        :param target: the path of the file, or a binary file object opened by the caller.
+        :param doc_id: the document id, defaulting to the file name.
+        :param metadata: metadata to attach to the document.
+        :return: the created document.
+        """
         if isinstance(target, str):
             target = Path(target)
 
-        # TODO Add directory processing.
+        if not isinstance(target, Path):
+            name = getattr(target, "name", None)
+            if not doc_id:
+                if not isinstance(name, str):
+                    raise TypeError("You must supply a doc_id when uploading from a file object without a name")
+                doc_id = Path(name).name
+            return self._upload_stream(corpus_key, target, doc_id, self._discover_mime_type(doc_id), metadata)
+
         if not doc_id:
             doc_id = target.name
 
         content_type = self._discover_mime_type(target.name)  # Change this based on extension.
         with open(target, "rb") as f:
-            content = f.read()
+            return self._upload_stream(corpus_key, f, doc_id, content_type, metadata)
+
+    def _upload_stream(self, corpus_key: str, f: BinaryIO, doc_id: str, content_type: Optional[str],
+                       metadata: Optional[Dict]) -> Document:
+        if self.budget is None:
+            return self.upload_client.file(corpus_key, file=(doc_id, f, content_type), metadata=metadata)
+
+        with self.budget.reserve(_file_size(f)):
+            return self.upload_client.file(corpus_key, file=(doc_id, f, content_type), metadata=metadata)
+
+    def upload_directory(self, corpus_key: str, root: Union[str, Path], pattern: str = "**/*", workers: int = 4,
+                         metadata: Optional[Dict] = None) -> DirectoryUpload:
+        """
+        Uploads every file under root matching the glob pattern, using the path relative to root as the
+        document id and the file extension to detect the MIME type.
+
+        The tree is walked lazily and files are uploaded by a bounded pool of worker threads, so only "workers"
+        files are open at once regardless of the size of the tree. Retries and back-off for rate limiting are
+        handled by the underlying client. A failed upload does not stop the others; it is reported in its
+        UploadResult instead.
+
+        Nothing is uploaded until the returned DirectoryUpload is iterated:
+
+            upload = upload_manager.upload_directory("my-corpus", "docs/", pattern="**/*.pdf", workers=8)
+            for result in upload:
+                if not result.succeeded:
+                    print(f"{result.doc_id} failed: {result.error}")
+            print(f"{upload.stats.files_per_second:.1f} files/s")
+
+        :param corpus_key: the corpus to upload the files into.
+        :param root: the directory to upload.
+        :param pattern: the glob pattern, relative to root, selecting the files to upload.
+        :param workers: the number of files uploaded concurrently.
+        :param metadata: metadata to attach to every uploaded document.
+        :return: a DirectoryUpload yielding an UploadResult per file in completion order.
+        """
+        if isinstance(root, str):
+            root = Path(root)
+        base: Path = root
+
+        def upload_file(path: Path) -> UploadResult:
+            doc_id = self._doc_id(base, path)
+            started = time.monotonic()
+            size = 0
+            try:
+                size = path.stat().st_size
+                document = self.upload(corpus_key, path, doc_id=doc_id, metadata=metadata)
+                return UploadResult(doc_id=doc_id, path=path, size=size, elapsed=time.monotonic() - started,
+                                    document=document)
+            except Exception as e:
+                self.logger.warning(f"Failed to upload [{doc_id}]: {e}")
+                return UploadResult(doc_id=doc_id, path=path, size=size, elapsed=time.monotonic() - started,
+                                    error=e)
+
+        def results() -> Iterator[UploadResult]:
+            for _, future in bounded_map(upload_file, self._walk(base, pattern), workers=workers):
+                yield future.result()
+
+        return DirectoryUpload(results())
+
+    def sync_directory(self, corpus_key: str, root: Union[str, Path], pattern: str = "**/*",
+                       metadata: Optional[Dict] = None, workers: int = 1) -> Iterator[Tuple[str, DocOpEnum]]:
+        """
+        Incrementally syncs the files under root into the corpus, using the path relative to root as the
+        document id.
+
+        Each file is hashed (along with the metadata) and compared against the document manager's manifest
+        first, so unchanged files are skipped with no network calls. Files without a fresh manifest entry
+        are reconciled against the SHA256 hash stored in the metadata of the uploaded document, in batches.
+        New files are uploaded, changed files are replaced and the manifest is updated as we go.
+
+        :param corpus_key: the corpus to sync the files into.
+        :param root: the directory to sync.
+        :param pattern: the glob pattern, relative to root, selecting the files to sync.
+        :param metadata: metadata to attach to every uploaded document.
+        :param workers: the number of files hashed and uploaded concurrently.
+        :return: a generator of (document id, operation) tuples, in completion order.
+        """
+        document_manager = self.document_manager
+        if not document_manager:
+            raise TypeError("You must supply a DocumentManager to the UploadManager to sync a directory")
+
+        if isinstance(root, str):
+            root = Path(root)
+        base: Path = root
+
+        def with_states() -> Iterator[Tuple[Path, str, DocState]]:
+            for batch in _batched(self._walk(base, pattern), LOOKUP_BATCH_SIZE):
+                doc_ids = [self._doc_id(base, path) for path in batch]
+                states = document_manager.resolve_docs(corpus_key, doc_ids)
+                for path, doc_id in zip(batch, doc_ids):
+                    yield path, doc_id, states[doc_id]
+
+        def sync(item: Tuple[Path, str, DocState]) -> DocOpEnum:
+            path, doc_id, state = item
+            return self._sync_file(corpus_key, path, doc_id, state, metadata)
+
+        for (_, doc_id, _), future in bounded_map(sync, with_states(), workers=workers):
+            yield doc_id, future.result()
+
+    def _sync_file(self, corpus_key: str, path: Path, doc_id: str, state: DocState,
+                   metadata: Optional[Dict]) -> DocOpEnum:
+        # This is only called once we've validated the document manager is present.
+        document_manager: DocumentManager = self.document_manager  # type: ignore
+
+        sha256 = calculate_file_sha256(path, extra=_sync_metadata(metadata))
+        exists, same = _compare_state(state, sha256)
+
+        if exists and same:
+            self.logger.info(f"File [{doc_id}] is unchanged, skipping")
+            if not state.from_manifest:
+                document_manager.record_indexed(corpus_key, doc_id, sha256)
+            return DocOpEnum.IGNORED
+
+        if exists:
+            self.logger.info(f"File [{doc_id}] has changed, deleting existing document and uploading fresh")
+            document_manager.delete_quietly(corpus_key, doc_id)
+
+        self.upload(corpus_key, path, doc_id=doc_id, metadata={**(metadata or {}), HASH_FIELD: sha256})
+        document_manager.record_indexed(corpus_key, doc_id, sha256)
+        return DocOpEnum.UPDATED if exists else DocOpEnum.CREATED
+
+
+class AsyncUploadManager:
+    """
+    Asyncio equivalent of the UploadManager, built over the AsyncUploadClient.
+
+    Uploads through the manager are limited to max_concurrency at once and, optionally, max_inflight_bytes in
+    total, however many coroutines share it. Files are hashed on a worker thread so the event loop isn't blocked.
+    """
+
+    def __init__(self, upload_client: AsyncUploadClient, document_manager: Optional[AsyncDocumentManager] = None,
+                 max_inflight_bytes: Optional[int] = None, max_concurrency: int = 32):
+        """
+        :param upload_client: the client used to upload files.
+        :param document_manager: used to track document state (and its manifest) when syncing directories.
+        :param max_inflight_bytes: caps the combined size of the files being uploaded at once, or None for no limit.
+        :param max_concurrency: the most uploads in flight at once through this manager.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.upload_client = upload_client
+        self.document_manager = document_manager
+        self.budget: Optional[AsyncByteBudget] = AsyncByteBudget(max_inflight_bytes) if max_inflight_bytes else None
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def upload(self, corpus_key: str, target: Union[str, Path, BinaryIO], doc_id: Union[None, str] = None,
+                     metadata: Optional[Dict] = None) -> Document:
+        """
+        Uploads a file to the corpus. See UploadManager.upload.
+        """
+        if isinstance(target, str):
+            target = Path(target)
+
+        if not isinstance(target, Path):
+            name = getattr(target, "name", None)
+            if not doc_id:
+                if not isinstance(name, str):
+                    raise TypeError("You must supply a doc_id when uploading from a file object without a name")
+                doc_id = Path(name).name
+            return await self._upload_stream(corpus_key, target, doc_id, _discover_mime_type(doc_id), metadata)
+
+        if not doc_id:
+            doc_id = target.name
+
+        content_type = _discover_mime_type(target.name)
+        with open(target, "rb") as f:
+            return await self._upload_stream(corpus_key, f, doc_id, content_type, metadata)
+
+    async def _upload_stream(self, corpus_key: str, f: BinaryIO, doc_id: str, content_type: Optional[str],
+                             metadata: Optional[Dict]) -> Document:
+        async with self._semaphore:
+            if self.budget is None:
+                return await self.upload_client.file(corpus_key, file=(doc_id, f, content_type), metadata=metadata)
+
+            async with self.budget.reserve(_file_size(f)):
+                return await self.upload_client.file(corpus_key, file=(doc_id, f, content_type), metadata=metadata)
+
+    def upload_directory(self, corpus_key: str, root: Union[str, Path], pattern: str = "**/*",
+                         concurrency: Optional[int] = None, metadata: Optional[Dict] = None) -> AsyncDirectoryUpload:
+        """
+        Uploads every file under root matching the glob pattern, with at most concurrency uploads in flight
+        (defaulting to max_concurrency). See UploadManager.upload_directory.
+
+            upload = upload_manager.upload_directory("my-corpus", "docs/", pattern="**/*.pdf")
+            async for result in upload:
+                ...
+        """
+        if isinstance(root, str):
+            root = Path(root)
+        base: Path = root
+
+        async def upload_file(path: Path) -> UploadResult:
+            doc_id = _doc_id(base, path)
+            started = time.monotonic()
+            size = 0
+            try:
+                size = path.stat().st_size
+                document = await self.upload(corpus_key, path, doc_id=doc_id, metadata=metadata)
+                return UploadResult(doc_id=doc_id, path=path, size=size, elapsed=time.monotonic() - started,
+                                    document=document)
+            except Exception as e:
+                self.logger.warning(f"Failed to upload [{doc_id}]: {e}")
+                return UploadResult(doc_id=doc_id, path=path, size=size, elapsed=time.monotonic() - started,
+                                    error=e)
+
+        async def results() -> AsyncIterator[UploadResult]:
+            async for _, task in async_bounded_map(upload_file, _walk(base, pattern),
+                                                   concurrency=concurrency or self.max_concurrency):
+                yield task.result()
+
+        return AsyncDirectoryUpload(results())
+
+    async def sync_directory(self, corpus_key: str, root: Union[str, Path], pattern: str = "**/*",
+                             metadata: Optional[Dict] = None,
+                             concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, DocOpEnum]]:
+        """
+        Incrementally syncs the files under root into the corpus. See UploadManager.sync_directory.
+        """
+        document_manager = self.document_manager
+        if not document_manager:
+            raise TypeError("You must supply an AsyncDocumentManager to the AsyncUploadManager to sync a directory")
+
+        if isinstance(root, str):
+            root = Path(root)
+        base: Path = root
 
-        return self.upload_client.file(corpus_key, file=(doc_id, content, content_type), metadata=metadata)
+        async def with_states() -> AsyncIterator[Tuple[Path, str, DocState]]:
+            for batch in _batched(_walk(base, pattern), LOOKUP_BATCH_SIZE):
+                doc_ids: List[str] = [_doc_id(base, path) for path in batch]
+                states = await document_manager.resolve_docs(corpus_key, doc_ids)
+                for path, doc_id in zip(batch, doc_ids):
+                    yield path, doc_id, states[doc_id]
 
+        async def sync(item: Tuple[Path, str, DocState]) -> DocOpEnum:
+            path, doc_id, state = item
+            return await self._sync_file(document_manager, corpus_key, path, doc_id, state, metadata)
 
+        async for (_, doc_id, _), task in async_bounded_map(sync, with_states(),
+                                                            concurrency=concurrency or self.max_concurrency):
+            yield doc_id, task.result()
 
+    async def _sync_file(self, document_manager: AsyncDocumentManager, corpus_key: str, path: Path, doc_id: str,
+                         state: DocState, metadata: Optional[Dict]) -> DocOpEnum:
+        sha256 = await asyncio.to_thread(calculate_file_sha256, path, extra=_sync_metadata(metadata))
+        exists, same = _compare_state(state, sha256)
 
+        if exists and same:
+            self.logger.info(f"File [{doc_id}] is unchanged, skipping")
+            if not state.from_manifest:
+                document_manager.record_indexed(corpus_key, doc_id, sha256)
+            return DocOpEnum.IGNORED
 
+        if exists:
+            self.logger.info(f"File [{doc_id}] has changed, deleting existing document and uploading fresh")
+            await document_manager.delete_quietly(corpus_key, doc_id)
 
+        await self.upload(corpus_key, path, doc_id=doc_id, metadata={**(metadata or {}), HASH_FIELD: sha256})
+        document_manager.record_indexed(corpus_key, doc_id, sha256)
+        return DocOpEnum.UPDATED if exists else DocOpEnum.CREATED
@@ -1 +1,50 @@
-from .lab_helper import LabHelper, render_markdown
+import typing
+from importlib import import_module
+
+if typing.TYPE_CHECKING:
+    from .lab_helper import LabHelper, render_markdown
+    from .resumable_stream import ResumableStream, AsyncResumableStream, StreamResumeError
+    from .stream_aggregator import StreamAggregator, AsyncStreamAggregator, AggregatedResponse, TextBuffer
+_dynamic_imports: typing.Dict[str, str] = {
+    "AggregatedResponse": ".stream_aggregator",
+    "AsyncResumableStream": ".resumable_stream",
+    "AsyncStreamAggregator": ".stream_aggregator",
+    "LabHelper": ".lab_helper",
+    "ResumableStream": ".resumable_stream",
+    "StreamAggregator": ".stream_aggregator",
+    "StreamResumeError": ".resumable_stream",
+    "TextBuffer": ".stream_aggregator",
+    "render_markdown": ".lab_helper",
+}
+
+
+def __getattr__(attr_name: str) -> typing.Any:
+    module_name = _dynamic_imports.get(attr_name)
+    if module_name is None:
+        raise AttributeError(f"No {attr_name} found in _dynamic_imports for module name -> {__name__}")
+    try:
+        module = import_module(module_name, __package__)
+        result = getattr(module, attr_name)
+        return result
+    except ImportError as e:
+        raise ImportError(f"Failed to import {attr_name} from {module_name}: {e}") from e
+    except AttributeError as e:
+        raise AttributeError(f"Failed to get {attr_name} from {module_name}: {e}") from e
+
+
+def __dir__():
+    lazy_attrs = list(_dynamic_imports.keys())
+    return sorted(lazy_attrs)
+
+
+__all__ = [
+    "AggregatedResponse",
+    "AsyncResumableStream",
+    "AsyncStreamAggregator",
+    "LabHelper",
+    "ResumableStream",
+    "StreamAggregator",
+    "StreamResumeError",
+    "TextBuffer",
+    "render_markdown",
+]
@@ -0,0 +1,141 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import (Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Generic, Iterable, Iterator,
+                    Optional, Set, Tuple, TypeVar, Union)
+
+T = TypeVar("T")
+R = TypeVar("R")
+F = TypeVar("F")
+
+
+class _Order(Generic[F]):
+    """
+    Releases finished items either straight away, or in input order holding back those which finish early.
+    """
+
+    def __init__(self, ordered: bool):
+        self.ordered = ordered
+        self.held: Dict[int, Tuple[Any, F]] = {}
+        self._submitted = 0
+        self._expected = 0
+
+    def next_index(self) -> int:
+        self._submitted += 1
+        return self._submitted - 1
+
+    def release(self, entry: Tuple[int, Any], future: F) -> Iterator[Tuple[Any, F]]:
+        index, item = entry
+        if not self.ordered:
+            yield item, future
+            return
+        self.held[index] = (item, future)
+        while self._expected in self.held:
+            yield self.held.pop(self._expected)
+            self._expected += 1
+
+
+def bounded_map(fn: Callable[[T], R], items: Iterable[T], workers: int,
+                max_pending: Optional[int] = None, ordered: bool = False) -> Iterator[Tuple[T, "Future[R]"]]:
+    """
+    Runs fn over items on a thread pool, yielding (item, future) pairs in completion order, or in input order if
+    ordered is set.
+
+    The input iterable is consumed lazily: no more than max_pending items (defaults to workers) are
+    submitted at any one time, so a slow consumer or a slow API applies backpressure all the way back
+    to the producer. The caller decides how to handle failures by inspecting each future.
+
+    If the consumer stops iterating early, any work which has not started is cancelled.
+
+    When ordered, items which finish ahead of an earlier one are held back until it does. No new items are
+    submitted while max_pending of them are held, so a single stalled item bounds the memory used rather than
+    letting the rest of the input pile up behind it.
+
+    :param fn: the function to apply to each item.
+    :param items: the (potentially unbounded) iterable of inputs.
+    :param workers: the number of threads to use.
+    :param max_pending: the maximum number of submitted but not yet finished items, and of finished items held back.
+    :param ordered: whether to yield in the order of the input rather than in completion order.
+    :return: a generator of (item, completed future) tuples.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if max_pending is None:
+        max_pending = workers
+
+    iterator = iter(items)
+    pending: Dict["Future[R]", Tuple[int, T]] = {}
+    order: _Order["Future[R]"] = _Order(ordered)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending and len(order.held) < max_pending:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(fn, item)] = (order.next_index(), item)
+
+            if not pending:
+                return
+
+            done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from order.release(pending.pop(future), future)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+async def async_bounded_map(fn: Callable[[T], Awaitable[R]], items: Union[Iterable[T], AsyncIterable[T]],
+                            concurrency: int, max_pending: Optional[int] = None,
+                            ordered: bool = False) -> AsyncIterator[Tuple[T, "asyncio.Task[R]"]]:
+    """
+    The asyncio equivalent of bounded_map, running at most concurrency coroutines at once.
+
+    Accepts either a regular or an async iterable and yields (item, finished task) pairs in completion order, or
+    in input order if ordered is set. Pending tasks are cancelled if the consumer stops iterating early.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if max_pending is None:
+        max_pending = concurrency
+
+    if isinstance(items, AsyncIterable):
+        async_iterator: Optional[AsyncIterator[T]] = items.__aiter__()
+        sync_iterator: Optional[Iterator[T]] = None
+    else:
+        async_iterator = None
+        sync_iterator = iter(items)
+
+    pending: Dict["asyncio.Task[R]", Tuple[int, T]] = {}
+    order: _Order["asyncio.Task[R]"] = _Order(ordered)
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending and len(order.held) < max_pending:
+                try:
+                    if async_iterator is not None:
+                        item = await async_iterator.__anext__()
+                    else:
+                        item = next(sync_iterator)  # type: ignore
+                except (StopIteration, StopAsyncIteration):
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(fn(item))] = (order.next_index(), item)
+
+            if not pending:
+                return
+
+            done: Set[Any]
+            done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for released in order.release(pending.pop(task), task):
+                    yield released
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending.keys(), return_exceptions=True)
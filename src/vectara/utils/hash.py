@@ -1,4 +1,6 @@
 import hashlib
+from pathlib import Path
+from typing import Optional, Union
 
 # 64KBs chunks
 SHA256_BUFF_SIZE = 65536
@@ -19,4 +21,21 @@ def calculate_sha256(content: bytes):
         chunk = content[index:index + SHA256_BUFF_SIZE]
         sha256.update(chunk)
         index += SHA256_BUFF_SIZE
-    return sha256.hexdigest()
\ No newline at end of file
+    return sha256.hexdigest()
+
+def calculate_file_sha256(file_path: Union[str, Path], extra: Optional[bytes] = None) -> str:
+    """
+    Calculate the SHA256 hash for a file, reading it in chunks so the file is never fully loaded into memory.
+
+    :param file_path: the file to hash.
+    :param extra: optional additional bytes (e.g. serialized metadata) to include in the hash.
+    :return: the hex digest
+    """
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(SHA256_BUFF_SIZE), b""):
+            sha256.update(chunk)
+    if extra:
+        sha256.update(extra)
+    return sha256.hexdigest()
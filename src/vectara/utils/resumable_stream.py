@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, ContextManager, Generic, Iterator, Optional, TypeVar
+
+import httpx
+
+from vectara.core.http_response import AsyncHttpResponse, BaseHttpResponse, HttpResponse
+from vectara.core.http_sse._api import LAST_EVENT_ID_EXTENSION
+from vectara.core.request_options import RequestOptions
+
+T = TypeVar("T")
+
+# Errors where the connection was lost part way through, as opposed to the server rejecting the request.
+TRANSIENT_ERRORS = (httpx.NetworkError, httpx.TimeoutException, httpx.RemoteProtocolError)
+
+MAX_RECONNECT_DELAY_SECONDS = 10.0
+
+
+class StreamResumeError(Exception):
+    """
+    Raised when a stream could not be resumed seamlessly: the replayed response did not match the events
+    already delivered, or it failed too many times.
+    """
+
+
+def _last_event_id(response: BaseHttpResponse) -> Optional[str]:
+    return response._response.extensions.get(LAST_EVENT_ID_EXTENSION)
+
+
+def _update(digest: Any, event_id: Optional[str], event: Any) -> None:
+    digest.update(repr((event_id, event)).encode("utf-8"))
+
+
+class _Resumption(Generic[T]):
+    """
+    The state shared by the sync and async streams: how many events were delivered so far and how to de-duplicate the
+    events of a new connection against them.
+
+    The delivered events themselves are not kept, only a running digest of them, so a long stream is resumed in
+    constant memory. A replayed stream is checked against the digest once it has caught up with the events already
+    delivered, before any new event is yielded.
+    """
+
+    def __init__(self, request_options: Optional[RequestOptions], max_reconnects: int, backoff: float):
+        self.request_options = request_options
+        self.max_reconnects = max_reconnects
+        self.backoff = backoff
+        self.reconnects = 0
+        self.delivered = 0
+        self.first_event_id: Optional[str] = None
+        self.last_event_id: Optional[str] = None
+        self._digest = hashlib.sha256()
+        self._replayed: Optional[int] = None
+        self._replay_digest = hashlib.sha256()
+
+    def options(self) -> Optional[RequestOptions]:
+        if self.last_event_id is None:
+            return self.request_options
+        options: RequestOptions = dict(self.request_options or {})  # type: ignore
+        options["additional_headers"] = {**(options.get("additional_headers") or {}),
+                                         "Last-Event-ID": self.last_event_id}
+        return options
+
+    def connected(self) -> None:
+        # Until we know otherwise, a new connection is assumed to replay the stream from the start.
+        self._replayed = 0 if self.delivered else None
+        self._replay_digest = hashlib.sha256()
+
+    def accept(self, event_id: Optional[str], event: T) -> bool:
+        """
+        Decides whether an event is new, recording it if so, or a duplicate of one already delivered.
+        """
+        event_id = event_id or None
+        if self._replayed is not None:
+            if self._replayed == 0 and event_id and self.last_event_id and event_id != self.first_event_id:
+                # The server honoured Last-Event-ID and resumed after the last event we delivered.
+                self._replayed = None
+            else:
+                _update(self._replay_digest, event_id, event)
+                self._replayed += 1
+                if self._replayed == self.delivered:
+                    if self._replay_digest.digest() != self._digest.digest():
+                        raise StreamResumeError(
+                            f"The stream diverged from the {self.delivered} events already delivered when it was "
+                            f"replayed"
+                        )
+                    self._replayed = None
+                return False
+
+        if self.delivered == 0:
+            self.first_event_id = event_id
+        self.delivered += 1
+        _update(self._digest, event_id, event)
+        if event_id:
+            self.last_event_id = event_id
+        return True
+
+    def finished(self) -> None:
+        """
+        Checks that a stream which ended normally did not end part way through replaying the events delivered.
+        """
+        if self._replayed is not None:
+            raise StreamResumeError(
+                f"The stream ended after replaying {self._replayed} of the {self.delivered} events already delivered"
+            )
+
+    def failed(self, error: Exception) -> float:
+        """
+        Records a lost connection, returning how long to wait before reconnecting.
+        """
+        if self.reconnects >= self.max_reconnects:
+            raise StreamResumeError(f"The stream failed after {self.reconnects} reconnects") from error
+        delay = min(self.backoff * pow(2.0, self.reconnects), MAX_RECONNECT_DELAY_SECONDS)
+        self.reconnects += 1
+        return delay
+
+
+class ResumableStream(Generic[T]):
+    """
+    Iterates over the events of a streamed response, reconnecting transparently if the connection is lost.
+
+    When the server sends event ids, the reconnection carries a Last-Event-ID header so the server can resume after
+    the last event delivered. Otherwise, the request is re-sent and the replayed events which were already delivered
+    are skipped, so the caller sees each event once. If the replayed events differ from those already delivered
+    (e.g. the generation was not deterministic), a StreamResumeError is raised rather than mixing the two.
+
+    Note that re-sending a request repeats its side effects: resuming a chat stream by replay adds another turn.
+
+        stream = ResumableStream(
+            lambda request_options: client.queries.with_raw_response.query_stream(
+                query="...", search=search, generation=generation, request_options=request_options
+            )
+        )
+        for event in stream:
+            ...
+    """
+
+    def __init__(self, open_stream: Callable[[Optional[RequestOptions]], ContextManager[HttpResponse[Iterator[T]]]],
+                 request_options: Optional[RequestOptions] = None, max_reconnects: int = 3, backoff: float = 0.5):
+        """
+        :param open_stream: makes the request with the given request options, returning the raw streamed response.
+        :param request_options: the request options of the first request, which are extended on reconnection.
+        :param max_reconnects: the number of times to reconnect before giving up.
+        :param backoff: the delay before the first reconnection, doubling with each one.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._open_stream = open_stream
+        self._request_options = request_options
+        self._max_reconnects = max_reconnects
+        self._backoff = backoff
+        self.reconnects = 0
+
+    def __iter__(self) -> Iterator[T]:
+        state: _Resumption[T] = _Resumption(self._request_options, self._max_reconnects, self._backoff)
+        while True:
+            try:
+                with self._open_stream(state.options()) as response:
+                    state.connected()
+                    for event in response.data:
+                        if state.accept(_last_event_id(response), event):
+                            yield event
+                state.finished()
+                return
+            except TRANSIENT_ERRORS as e:
+                delay = state.failed(e)
+                self.reconnects = state.reconnects
+                self.logger.warning(f"Stream interrupted ({e}), reconnecting in {delay:.1f}s")
+                time.sleep(delay)
+
+
+class AsyncResumableStream(Generic[T]):
+    """
+    The async equivalent of ResumableStream.
+    """
+
+    def __init__(self,
+                 open_stream: Callable[[Optional[RequestOptions]], AsyncContextManager[AsyncHttpResponse[Any]]],
+                 request_options: Optional[RequestOptions] = None, max_reconnects: int = 3, backoff: float = 0.5):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._open_stream = open_stream
+        self._request_options = request_options
+        self._max_reconnects = max_reconnects
+        self._backoff = backoff
+        self.reconnects = 0
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        state: _Resumption[T] = _Resumption(self._request_options, self._max_reconnects, self._backoff)
+        while True:
+            try:
+                async with self._open_stream(state.options()) as response:
+                    state.connected()
+                    async for event in response.data:
+                        if state.accept(_last_event_id(response), event):
+                            yield event
+                state.finished()
+                return
+            except TRANSIENT_ERRORS as e:
+                delay = state.failed(e)
+                self.reconnects = state.reconnects
+                self.logger.warning(f"Stream interrupted ({e}), reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
@@ -0,0 +1,220 @@
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+from vectara.types import ChatFullResponse, IndividualSearchResult, QueryFullResponse, RewrittenQuery
+
+T = TypeVar("T")
+
+
+class TextBuffer:
+    """
+    Text built up from chunks. Appending a chunk is O(1) and the chunks are only joined when the text is read,
+    rather than concatenating a new string for every chunk.
+    """
+
+    __slots__ = ("_chunks", "_length")
+
+    def __init__(self) -> None:
+        self._chunks: List[str] = []
+        self._length = 0
+
+    def append(self, chunk: Optional[str]) -> None:
+        if chunk:
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            # Keep the joined text, so that reading it again only joins the chunks appended since.
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.text
+
+
+@dataclass
+class AggregatedResponse:
+    """
+    The final response of a stream, built from its events: the generated text (or agent output), the agent's
+    thinking, and the search results, factual consistency score and chat ids sent along the way.
+    """
+    text: str = ""
+    thinking: str = ""
+    search_results: Optional[List[IndividualSearchResult]] = None
+    rewritten_queries: Optional[List[RewrittenQuery]] = None
+    factual_consistency_score: Optional[float] = None
+    chat_id: Optional[str] = None
+    turn_id: Optional[str] = None
+    rendered_prompt: Optional[str] = None
+    rephrased_query: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+    events: int = 0
+    complete: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.errors
+
+    def as_query_response(self) -> QueryFullResponse:
+        return QueryFullResponse(summary=self.text, search_results=self.search_results,
+                                 factual_consistency_score=self.factual_consistency_score,
+                                 rendered_prompt=self.rendered_prompt, rewritten_queries=self.rewritten_queries)
+
+    def as_chat_response(self) -> ChatFullResponse:
+        return ChatFullResponse(chat_id=self.chat_id, turn_id=self.turn_id, answer=self.text,
+                                search_results=self.search_results,
+                                factual_consistency_score=self.factual_consistency_score,
+                                rendered_prompt=self.rendered_prompt, rephrased_query=self.rephrased_query,
+                                rewritten_queries=self.rewritten_queries)
+
+
+class _Aggregation:
+    """
+    The state shared by the sync and async aggregators, updated with each event and keeping none of them.
+    """
+
+    def __init__(self) -> None:
+        self.text = TextBuffer()
+        self.thinking = TextBuffer()
+        self.response = AggregatedResponse()
+
+    def add(self, event: Any) -> None:
+        response = self.response
+        response.events += 1
+        kind = getattr(event, "type", None)
+        if kind == "generation_chunk":
+            self.text.append(event.generation_chunk)
+        elif kind == "streaming_agent_output":
+            self.text.append(event.content)
+        elif kind == "streaming_thinking":
+            self.thinking.append(event.content)
+        elif kind == "search_results":
+            response.search_results = event.search_results
+            response.rewritten_queries = event.rewritten_queries
+        elif kind == "factual_consistency_score":
+            response.factual_consistency_score = event.factual_consistency_score
+        elif kind == "chat_info":
+            response.chat_id = event.chat_id
+            response.turn_id = event.turn_id
+        elif kind == "generation_info":
+            response.rendered_prompt = event.rendered_prompt
+            response.rephrased_query = event.rephrased_query
+        elif kind == "error":
+            response.errors.extend(event.messages or [])
+        elif kind == "end":
+            response.complete = True
+
+    def result(self) -> AggregatedResponse:
+        self.response.text = self.text.text
+        self.response.thinking = self.thinking.text
+        return self.response
+
+
+class _AggregatorBase:
+
+    def __init__(self) -> None:
+        self._aggregation = _Aggregation()
+
+    @property
+    def text(self) -> str:
+        """
+        The text generated so far.
+        """
+        return self._aggregation.text.text
+
+    @property
+    def thinking(self) -> str:
+        """
+        The agent's thinking so far.
+        """
+        return self._aggregation.thinking.text
+
+    @property
+    def search_results(self) -> Optional[List[IndividualSearchResult]]:
+        return self._aggregation.response.search_results
+
+    @property
+    def factual_consistency_score(self) -> Optional[float]:
+        return self._aggregation.response.factual_consistency_score
+
+    @property
+    def chat_id(self) -> Optional[str]:
+        return self._aggregation.response.chat_id
+
+    @property
+    def errors(self) -> List[str]:
+        return self._aggregation.response.errors
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether the end event has been received.
+        """
+        return self._aggregation.response.complete
+
+
+class StreamAggregator(_AggregatorBase, Generic[T]):
+    """
+    Wraps the events of query_stream, chat_stream or an agent event stream, accumulating the text and the other
+    fields of the response as they arrive without keeping the events.
+
+    Iterate over the aggregator to receive the events as they come, while reading the partial text, search results
+    and factual consistency score from it; or call result() straight away to consume the whole stream:
+
+        stream = StreamAggregator(client.query_stream(query="...", search=search))
+        for event in stream:
+            if event.type == "search_results":
+                show(stream.search_results)
+        print(stream.result().text)
+
+    The text is kept as a list of chunks joined when read, so building it is linear in its length. Reading text
+    after every chunk joins the whole text each time; use the chunks of the events themselves for that instead.
+    """
+
+    def __init__(self, events: Iterable[T]):
+        super().__init__()
+        self._events: Iterator[T] = iter(events)
+
+    def __iter__(self) -> Iterator[T]:
+        for event in self._events:
+            self._aggregation.add(event)
+            yield event
+
+    def result(self) -> AggregatedResponse:
+        """
+        Consumes the rest of the stream, returning the final response.
+        """
+        for _ in self:
+            pass
+        return self._aggregation.result()
+
+
+class AsyncStreamAggregator(_AggregatorBase, Generic[T]):
+    """
+    The asyncio equivalent of StreamAggregator.
+
+        stream = AsyncStreamAggregator(client.agent_events.create_stream(agent_key, session_key, request=request))
+        response = await stream.result()
+    """
+
+    def __init__(self, events: AsyncIterable[T]):
+        super().__init__()
+        self._events: AsyncIterator[T] = events.__aiter__()
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        async for event in self._events:
+            self._aggregation.add(event)
+            yield event
+
+    async def result(self) -> AggregatedResponse:
+        """
+        Consumes the rest of the stream, returning the final response.
+        """
+        async for _ in self:
+            pass
+        return self._aggregation.result()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+import pytest
+
+from vectara import AgentInput_Text, AsyncVectara
+from vectara.agent_events import CreateAgentEventsStreamRequestBody_InputMessage
+from vectara.managers.agent_events import AgentEventMultiplexer, AgentStreamIdleTimeout
+
+CREATED = "2025-01-01T00:00:00Z"
+REQUEST = CreateAgentEventsStreamRequestBody_InputMessage(messages=[AgentInput_Text(content="hi")],
+                                                         stream_response=True)
+
+
+def _events(session_key: str) -> List[Dict[str, Any]]:
+    tool = {"tool_call_id": "call_1", "tool_configuration_name": "search", "tool_name": "search",
+            "id": "evt", "session_key": session_key, "created_at": CREATED}
+    return [
+        {"type": "tool_input", "tool_input": {"query": "q"}, **tool},
+        {"type": "tool_output", "tool_output": {}, "error": False, **tool},
+        {"type": "streaming_agent_output", "content": f"answer for {session_key}", "created_at": CREATED},
+        {"type": "streaming_agent_output", "content": "!", "created_at": CREATED},
+        {"type": "end"},
+    ]
+
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+    session_key = request.url.path.split("/")[-2]
+
+    async def stream() -> AsyncIterator[bytes]:
+        for event in _events(session_key):
+            if session_key.startswith("stalled") and event["type"] == "streaming_agent_output":
+                await asyncio.sleep(60)
+            await asyncio.sleep(0.001)
+            yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=stream())
+
+
+def _multiplexer(**kwargs: Any) -> AgentEventMultiplexer:
+    client = AsyncVectara(api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(_handler)))
+    return AgentEventMultiplexer(client.agent_events, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_streams_many_sessions_concurrently() -> None:
+    multiplexer = _multiplexer(max_queue=2)
+    everything = multiplexer.subscribe(max_queue=1000)
+    streams = [multiplexer.open("agent", f"session_{i}", request=REQUEST) for i in range(50)]
+
+    async def consume(stream: Any) -> List[str]:
+        return [event.type async for event in stream]
+
+    results = await asyncio.wait_for(asyncio.gather(*(consume(stream) for stream in streams)), 10)
+    assert all(types == [event["type"] for event in _events("s")] for types in results)
+    assert multiplexer.sessions == {}
+
+    await multiplexer.close()
+    received = [item async for item in everything]
+    assert len(received) == 50 * 5
+    assert {item.session_key for item in received} == {f"session_{i}" for i in range(50)}
+
+    metrics = multiplexer.metrics.snapshot()
+    assert (metrics["sessions"], metrics["active_sessions"], metrics["events"]) == (50, 0, 250)
+    assert metrics["time_to_first_output"]["count"] == 50
+    assert metrics["tool_call_latency"]["count"] == 50
+    assert metrics["events_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_fans_out_to_subscribers() -> None:
+    multiplexer = _multiplexer(max_concurrency=1)
+    stream = multiplexer.open("agent", "session_1", request=REQUEST)
+    extra = stream.subscribe()
+    first = await asyncio.wait_for(asyncio.gather(
+        asyncio.ensure_future(_contents(stream)), asyncio.ensure_future(_contents(extra))), 10)
+    assert first[0] == first[1] == ["answer for session_1", "!"]
+
+    multiplexer.open("agent", "session_2", request=REQUEST)
+    with pytest.raises(ValueError):
+        multiplexer.open("agent", "session_2", request=REQUEST)
+    await multiplexer.close()
+
+
+async def _contents(events: Any) -> List[str]:
+    return [event.content async for event in events if event.type == "streaming_agent_output"]
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_time_out() -> None:
+    multiplexer = _multiplexer(idle_timeout=0.1)
+    stalled = multiplexer.open("agent", "stalled_1", request=REQUEST)
+    healthy = multiplexer.open("agent", "session_1", request=REQUEST).subscribe()
+
+    events = []
+    with pytest.raises(AgentStreamIdleTimeout):
+        async for event in stalled:
+            events.append(event.type)
+    assert events == ["tool_input", "tool_output"]
+    assert await asyncio.wait_for(_contents(healthy), 10) == ["answer for session_1", "!"]
+
+    metrics = multiplexer.metrics.snapshot()
+    assert (metrics["idle_timeouts"], metrics["failed_sessions"]) == (1, 1)
+    await multiplexer.close()
+
+
+@pytest.mark.asyncio
+async def test_closing_a_subscription_releases_the_stream() -> None:
+    multiplexer = _multiplexer(max_queue=1)
+    stream = multiplexer.open("agent", "session_1", request=REQUEST)
+    slow = stream.subscribe()
+    slow.close()
+    assert await asyncio.wait_for(_contents(stream), 10) == ["answer for session_1", "!"]
+    await multiplexer.close()
+
+
+@pytest.mark.asyncio
+async def test_sessions_only_followed_through_the_multiplexer_do_not_stall() -> None:
+    multiplexer = _multiplexer(max_queue=1)
+    everything = multiplexer.subscribe(max_queue=1)
+    for i in range(3):
+        multiplexer.open("agent", f"session_{i}", request=REQUEST)
+
+    async def until_ended() -> List[Any]:
+        received = []
+        async for item in everything:
+            received.append(item)
+            if sum(item.event.type == "end" for item in received) == 3:
+                return received
+        return received
+
+    received = await asyncio.wait_for(until_ended(), 10)
+    assert len(received) == 3 * 5
+    await asyncio.sleep(0)
+    assert multiplexer.sessions == {}
+    await asyncio.wait_for(multiplexer.close(), 5)
+
+
+@pytest.mark.asyncio
+async def test_close_does_not_wait_for_full_subscribers() -> None:
+    multiplexer = _multiplexer(max_queue=1)
+    everything = multiplexer.subscribe()
+    stream = multiplexer.open("agent", "session_1", request=REQUEST)
+    events = stream.subscribe()
+    await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(multiplexer.close(), 5)
+    # The events already queued are still delivered, then the subscriptions end.
+    assert [event.type async for event in events] == ["tool_input"]
+    assert [item.event.type async for item in everything] == ["tool_input"]
@@ -0,0 +1,83 @@
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara
+
+_SEARCH: Any = {"corpora": [{"corpus_key": "docs"}]}
+
+
+class _ChatServer:
+    """Answers chats and their turns, streaming the answer as events when the request asks for it."""
+
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        body = json.loads(request.content)
+        turn = len(self.paths)
+        if not body.get("stream_response"):
+            return httpx.Response(200, json={"chat_id": "cht_1", "turn_id": f"trn_{turn}", "answer": body["query"]})
+
+        events: List[Dict[str, Any]] = [
+            {"type": "chat_info", "chat_id": "cht_1", "turn_id": f"trn_{turn}"},
+            {"type": "generation_chunk", "generation_chunk": body["query"]},
+            {"type": "end"},
+        ]
+
+        async def stream() -> AsyncIterator[bytes]:
+            for event in events:
+                yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=stream())
+
+
+def _client(server: _ChatServer) -> AsyncVectara:
+    return AsyncVectara(api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(server.handler)))
+
+
+@pytest.mark.asyncio
+async def test_async_chat_session_continues_the_chat() -> None:
+    server = _ChatServer()
+    session = _client(server).create_chat_session(search=_SEARCH)
+
+    first = await session.chat("hello")
+    second = await session.chat("again")
+
+    assert session.chat_id == "cht_1"
+    assert (first.answer, second.answer) == ("hello", "again")
+    assert server.paths == ["/v2/chats", "/v2/chats/cht_1/turns"]
+
+
+@pytest.mark.asyncio
+async def test_async_chat_session_streams_turns() -> None:
+    server = _ChatServer()
+    session = _client(server).create_chat_session(search=_SEARCH)
+
+    first = [event async for event in session.chat_stream("hello")]
+    assert session.chat_id == "cht_1"
+    second = [event async for event in session.chat_stream("again", resumable=True)]
+
+    assert [event.type for event in first] == ["chat_info", "generation_chunk", "end"]
+    assert second[1].generation_chunk == "again"
+    assert server.paths == ["/v2/chats", "/v2/chats/cht_1/turns"]
+
+    # Creating the chat again on reconnection would start another chat.
+    with pytest.raises(TypeError):
+        await _client(server).create_chat_session(search=_SEARCH).chat_stream("hello", resumable=True).__anext__()
+
+
+@pytest.mark.asyncio
+async def test_async_query_stream() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        async def stream() -> AsyncIterator[bytes]:
+            yield b'data: {"type": "generation_chunk", "generation_chunk": "answer"}\n\n'
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=stream())
+
+    client = AsyncVectara(api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    events = [event async for event in client.query_stream(query="q", search=_SEARCH)]
+    assert [event.generation_chunk for event in events] == ["answer"]
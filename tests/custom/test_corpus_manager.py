@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from vectara.errors.not_found_error import NotFoundError
+from vectara.managers.corpus import AsyncCorpusManager
+from vectara.types import Corpus
+
+
+class _AsyncPage:
+    def __init__(self, items: List[Corpus]) -> None:
+        self.items = items
+
+    async def __aiter__(self):  # type: ignore
+        for item in self.items:
+            yield item
+
+
+class _FakeAsyncCorporaClient:
+    """An in-memory corpora client, recording the most calls in flight at once."""
+
+    def __init__(self) -> None:
+        self.corpora: Dict[str, Corpus] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call(self) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+    async def list(self, filter: str = "", **kwargs: Any) -> _AsyncPage:
+        await self._call()
+        return _AsyncPage([corpus for corpus in self.corpora.values() if filter in (corpus.name or "")])
+
+    async def get(self, key: str, **kwargs: Any) -> Corpus:
+        await self._call()
+        if key not in self.corpora:
+            raise NotFoundError(body=None)
+        return self.corpora[key]
+
+    async def create(self, key: str = None, name: str = None, **kwargs: Any) -> Corpus:  # type: ignore
+        await self._call()
+        corpus = Corpus(key=key or f"{name}-{len(self.corpora)}", name=name)
+        self.corpora[corpus.key] = corpus  # type: ignore
+        return corpus
+
+    async def delete(self, key: str, **kwargs: Any) -> None:
+        await self._call()
+        del self.corpora[key]
+
+
+@pytest.mark.asyncio
+async def test_async_create_corpus_checks_for_existing_corpora() -> None:
+    client = _FakeAsyncCorporaClient()
+    manager = AsyncCorpusManager(client)  # type: ignore
+
+    created = await manager.create_corpus({"key": "docs", "name": "Docs"})
+    assert created.key == "docs"
+    with pytest.raises(Exception, match="existing"):
+        await manager.create_corpus({"key": "docs", "name": "Docs"})
+
+    await manager.create_corpus({"key": "docs", "name": "Docs v2"}, delete_existing=True)
+    assert [corpus.name for corpus in client.corpora.values()] == ["Docs v2"]
+    assert await manager.find_corpus_by_key("missing") is None
+    assert (await manager.find_corpus_by_name("Docs v2")).key == "docs"  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_async_corpus_manager_limits_concurrency() -> None:
+    client = _FakeAsyncCorporaClient()
+    manager = AsyncCorpusManager(client, max_concurrency=4)  # type: ignore
+
+    created = [corpus async for corpus in manager.create_corpora(
+        ({"key": f"c{i}", "name": f"Corpus {i}"} for i in range(20)))]
+    assert sorted(corpus.key for corpus in created) == sorted(f"c{i}" for i in range(20))  # type: ignore
+
+    await asyncio.gather(*(manager.delete(f"c{i}") for i in range(20)))
+    assert client.corpora == {}
+    assert client.max_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_async_delete_corpus_by_name_matches_exactly() -> None:
+    client = _FakeAsyncCorporaClient()
+    manager = AsyncCorpusManager(client)  # type: ignore
+    for key, name in [("a", "Docs"), ("b", "Docs"), ("c", "Docs archive")]:
+        await manager.create_corpus({"key": key, "name": name}, unique=False)
+
+    assert await manager.delete_corpus_by_name("Docs")
+    assert list(client.corpora) == ["c"]
+    assert not await manager.delete_corpus_by_name("Docs")
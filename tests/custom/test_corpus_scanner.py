@@ -0,0 +1,169 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+import pytest
+
+from vectara.core.pagination import AsyncPager, SyncPager
+from vectara.managers.scan import (AsyncCorpusScanner, CorpusScanner, partition_by_range, partition_by_values,
+                                   partitions_from_stats)
+from vectara.types import Document, FilterAttributeStat, GetFilterAttributeStatsResponse
+
+
+def _shard(metadata_filter: Optional[str]) -> Optional[int]:
+    match = re.search(r"doc\.shard = (\d+)", metadata_filter or "")
+    return int(match.group(1)) if match else None
+
+
+class _FakeDocumentsClient:
+    """Serves documents doc-0..doc-n, sharded on i % shards, in pages with a per page delay."""
+
+    def __init__(self, count: int, shards: int, delay: float = 0.0, fail_shard: Optional[int] = None) -> None:
+        self.docs = [Document(id=f"doc-{i}", metadata={"shard": i % shards}) for i in range(count)]
+        self.delay = delay
+        self.fail_shard = fail_shard
+        self.pages = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _matching(self, metadata_filter: Optional[str]) -> List[Document]:
+        shard = _shard(metadata_filter)
+        return [doc for doc in self.docs if shard is None or doc.metadata["shard"] == shard]  # type: ignore
+
+    def _page(self, docs: List[Document], offset: int, limit: int, shard: Optional[int]) -> List[Document]:
+        with self._lock:
+            self.pages += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if shard is not None and shard == self.fail_shard and offset > 0:
+            raise RuntimeError(f"shard {shard} failed")
+        return docs[offset:offset + limit]
+
+    def list(self, corpus_key: str, metadata_filter: Any = None, limit: int = 100, **kwargs: Any) -> SyncPager:
+        docs = self._matching(metadata_filter)
+        shard = _shard(metadata_filter)
+
+        def page(offset: int) -> SyncPager:
+            more = offset + limit < len(docs)
+            return SyncPager(get_next=(lambda: page(offset + limit)) if more else None, has_next=more,
+                             items=self._page(docs, offset, limit, shard), response=None)
+
+        return page(0)
+
+
+class _FakeAsyncDocumentsClient:
+    def __init__(self, sync: _FakeDocumentsClient) -> None:
+        self.sync = sync
+
+    async def list(self, corpus_key: str, metadata_filter: Any = None, limit: int = 100, **kwargs: Any) -> AsyncPager:
+        docs = self.sync._matching(metadata_filter)
+
+        async def page(offset: int) -> AsyncPager:
+            await asyncio.sleep(self.sync.delay)
+            more = offset + limit < len(docs)
+            return AsyncPager(get_next=(lambda: page(offset + limit)) if more else None, has_next=more,
+                              items=docs[offset:offset + limit], response=None)
+
+        return await page(0)
+
+
+class _FakeCorporaClient:
+    def __init__(self, stat: FilterAttributeStat) -> None:
+        self.stat = stat
+
+    def get_filter_attribute_stats(self, corpus_key: str, **kwargs: Any) -> GetFilterAttributeStatsResponse:
+        return GetFilterAttributeStatsResponse(filter_attribute_stats=[self.stat])
+
+
+def test_partition_helpers() -> None:
+    assert partition_by_values("doc.lang", ["en", "it's"]) == [
+        "doc.lang = 'en'",
+        "doc.lang = 'it''s'",
+        "(doc.lang IS NULL OR NOT (doc.lang IN ('en', 'it''s')))",
+    ]
+    assert partition_by_range("doc.year", [2020, 2010]) == [
+        "doc.year < 2010",
+        "doc.year >= 2010 AND doc.year < 2020",
+        "doc.year >= 2020",
+        "doc.year IS NULL",
+    ]
+
+    year = FilterAttributeStat.model_validate(
+        {"name": "doc.year", "type": "integer", "values": [], "stats": {"min": 2000, "max": 2024, "avg": 2012, "sum": 0}}
+    )
+    assert partitions_from_stats(year, partitions=4)[:3] == [
+        "doc.year < 2008", "doc.year >= 2008 AND doc.year < 2016", "doc.year >= 2016"
+    ]
+
+    tags = FilterAttributeStat.model_validate({"name": "doc.tags", "type": "list[text]", "values": []})
+    with pytest.raises(TypeError):
+        partitions_from_stats(tags)
+
+
+def test_scan_lists_every_document_once_concurrently() -> None:
+    client = _FakeDocumentsClient(count=400, shards=8, delay=0.02)
+    scanner = CorpusScanner(client)  # type: ignore
+
+    started = time.monotonic()
+    docs = list(scanner.scan("corpus", partitions=[f"doc.shard = {i}" for i in range(8)], concurrency=8,
+                             page_size=10))
+    elapsed = time.monotonic() - started
+
+    assert sorted(doc.id for doc in docs) == sorted(f"doc-{i}" for i in range(400))  # type: ignore
+    assert client.pages == 40
+    assert client.max_in_flight > 1
+    # A sequential scan takes 40 pages * 0.02s.
+    assert elapsed < 0.5
+
+    assert len(list(scanner.scan("corpus"))) == 400
+
+
+def test_scan_derives_partitions_from_stats() -> None:
+    client = _FakeDocumentsClient(count=30, shards=3)
+    stat = FilterAttributeStat.model_validate(
+        {"name": "doc.shard", "type": "text", "values": [{"value": 0, "count": 10}, {"value": 1, "count": 10}]}
+    )
+    scanner = CorpusScanner(client, _FakeCorporaClient(stat))  # type: ignore
+
+    assert scanner.partitions("corpus", "doc.shard") == [
+        "doc.shard = 0", "doc.shard = 1", "(doc.shard IS NULL OR NOT (doc.shard IN (0, 1)))"
+    ]
+    # The fake treats the remainder as unfiltered, so expect shard 0 and 1 twice.
+    assert len(list(scanner.scan("corpus", attribute="doc.shard"))) == 50
+
+
+def test_scan_raises_partition_errors_and_stops_early() -> None:
+    client = _FakeDocumentsClient(count=400, shards=4, fail_shard=2)
+    scanner = CorpusScanner(client)  # type: ignore
+    partitions = [f"doc.shard = {i}" for i in range(4)]
+
+    with pytest.raises(RuntimeError, match="shard 2 failed"):
+        list(scanner.scan("corpus", partitions=partitions, page_size=10))
+
+    client = _FakeDocumentsClient(count=4000, shards=4, delay=0.005)
+    scan = CorpusScanner(client).scan("corpus", partitions=partitions, concurrency=4, page_size=10)  # type: ignore
+    next(scan)
+    scan.close()
+    pages = client.pages
+    time.sleep(0.05)
+    assert client.pages == pages < 400
+
+
+@pytest.mark.asyncio
+async def test_async_scan() -> None:
+    sync = _FakeDocumentsClient(count=400, shards=8, delay=0.02)
+    scanner = AsyncCorpusScanner(_FakeAsyncDocumentsClient(sync))  # type: ignore
+
+    started = time.monotonic()
+    docs = [doc async for doc in scanner.scan("corpus", partitions=[f"doc.shard = {i}" for i in range(8)],
+                                              page_size=10)]
+    elapsed = time.monotonic() - started
+
+    assert sorted(doc.id for doc in docs) == sorted(f"doc-{i}" for i in range(400))  # type: ignore
+    assert elapsed < 0.5
@@ -0,0 +1,153 @@
+import datetime as dt
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+from vectara.core.api_error import ApiError
+from vectara.managers.dead_letters import DeadLetterCheckpoint, DeadLetterReprocessor, error_class
+from vectara.types import PipelineDeadLetterEntry, PipelineRun
+
+CREATED = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+
+
+class _Pager:
+    def __init__(self, items: List[PipelineDeadLetterEntry]) -> None:
+        self.items = items
+
+    def __iter__(self) -> Iterator[PipelineDeadLetterEntry]:
+        return iter(self.items)
+
+    def iter_items(self, prefetch: int = 0) -> Iterator[PipelineDeadLetterEntry]:
+        return iter(self.items)
+
+
+def _run(run_id: str, status: str = "completed") -> PipelineRun:
+    return PipelineRun(id=run_id, pipeline_key="pipe", agent_key="agent", status=status, trigger_type="manual",
+                       records_fetched=0, records_processed=0, records_failed=0, created_at=CREATED)
+
+
+class _FakeDeadLetters:
+    """
+    Dead letters which resolve when reprocessed, unless their record is in failing, in which case they fail
+    again in the run that reprocessed them.
+    """
+
+    def __init__(self, errors: Dict[str, str], failing: Optional[List[str]] = None) -> None:
+        self.entries = {record: self._entry(record, message) for record, message in errors.items()}
+        self.failing = set(failing or [])
+        self.processed: List[List[str]] = []
+        self.fail_process = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _entry(record: str, message: Optional[str], last_run_id: Optional[str] = None) -> PipelineDeadLetterEntry:
+        return PipelineDeadLetterEntry(id=f"dl_{record}", source_record_id=record, status="pending",
+                                       error_message=message, last_run_id=last_run_id, attempt_count=1,
+                                       origin="manual" if record.startswith("manual") else "pipeline",
+                                       created_at=CREATED)
+
+    def list(self, pipeline_key: str, *, status: Any = None, origin: Any = None, last_run_id: Any = None,
+             limit: Any = None) -> _Pager:
+        with self.lock:
+            return _Pager([entry for entry in self.entries.values()
+                           if (origin is None or entry.origin == origin)
+                           and (last_run_id is None or entry.last_run_id == last_run_id)])
+
+    def process(self, pipeline_key: str, *, source_record_ids: List[str]) -> PipelineRun:
+        if self.fail_process:
+            raise ApiError(status_code=503, body=None)
+        with self.lock:
+            self.processed.append(list(source_record_ids))
+            run_id = f"run_{len(self.processed)}"
+            for record in source_record_ids:
+                if record in self.failing:
+                    self.entries[record] = self._entry(record, self.entries[record].error_message, run_id)
+                else:
+                    del self.entries[record]
+        return _run(run_id)
+
+
+class _FakeJobWaiter:
+    def __init__(self) -> None:
+        self.waited: List[str] = []
+
+    def wait_for_pipeline_run(self, pipeline_key: str, run_id: str, timeout: Optional[float] = None) -> Future:
+        self.waited.append(run_id)
+        future: Future = Future()
+        future.set_result(_run(run_id))
+        return future
+
+
+def test_error_class_ignores_values() -> None:
+    assert error_class("Timed out after 30s fetching 'legal/doc-17.pdf'") == \
+        error_class("Timed out after 120s fetching 'hr/handbook.docx'")
+    assert error_class("Unsupported file type") == "Unsupported file type"
+    assert error_class(None) == "unknown"
+
+
+def test_reprocesses_matching_entries_in_batches() -> None:
+    errors = {f"doc_{i}": f"Timed out after {i}s" for i in range(5)}
+    errors.update({"doc_bad": "Unsupported file type", "manual_1": "Timed out after 3s"})
+    dead_letters = _FakeDeadLetters(errors, failing=["doc_1"])
+    reprocessor = DeadLetterReprocessor(dead_letters, job_waiter=_FakeJobWaiter(),  # type: ignore
+                                        batch_size=2, max_concurrency=2)
+
+    reprocess = reprocessor.reprocess("pipe", error_filter="^Timed out", origin="pipeline")
+    results = list(reprocess)
+
+    assert sorted(record for batch in dead_letters.processed for record in batch) == [f"doc_{i}" for i in range(5)]
+    assert sorted(len(batch) for batch in dead_letters.processed) == [1, 2, 2]
+    assert all(result.verified for result in results)
+
+    stats = reprocess.stats.snapshot()
+    assert (stats["runs"], stats["entries"], stats["resolved"], stats["failed"]) == (3, 5, 4, 1)
+    timed_out = stats["by_error_class"]["Timed out after #"]
+    assert timed_out["success_rate"] == 0.8
+
+
+def test_failed_process_calls_are_counted_and_retried_on_resume(tmp_path: Path) -> None:
+    dead_letters = _FakeDeadLetters({"doc_1": "boom", "doc_2": "boom"})
+    checkpoint = DeadLetterCheckpoint(tmp_path / "checkpoint.db")
+    reprocessor = DeadLetterReprocessor(dead_letters, job_waiter=_FakeJobWaiter(),  # type: ignore
+                                        checkpoint=checkpoint)
+
+    dead_letters.fail_process = True
+    stats = reprocessor.reprocess("pipe").run()
+    assert (stats.failed_runs, stats.by_error_class()["boom"].failed) == (1, 2)
+    assert checkpoint.seen("pipe") == set()
+
+    dead_letters.fail_process = False
+    stats = reprocessor.reprocess("pipe").run()
+    assert stats.by_error_class()["boom"].success_rate == 1.0
+
+
+def test_resumes_from_the_checkpoint(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoint.db"
+    dead_letters = _FakeDeadLetters({f"doc_{i}": "boom" for i in range(4)}, failing=["doc_0", "doc_1"])
+
+    # A reprocess interrupted after its first run was created but before it was checked.
+    reprocessor = DeadLetterReprocessor(dead_letters, checkpoint=DeadLetterCheckpoint(path),  # type: ignore
+                                        batch_size=2, max_concurrency=1)
+    first = next(iter(reprocessor.reprocess("pipe")))
+    assert not first.verified
+
+    waiter = _FakeJobWaiter()
+    resumed = DeadLetterReprocessor(dead_letters, job_waiter=waiter,  # type: ignore
+                                    checkpoint=DeadLetterCheckpoint(path), batch_size=2)
+    results = list(resumed.reprocess("pipe"))
+
+    # The first run is checked rather than redone, and the entries which failed in it are not sent again.
+    assert waiter.waited == ["run_1", "run_2"]
+    assert [record for batch in dead_letters.processed for record in batch] == [f"doc_{i}" for i in range(4)]
+    assert results[0].still_dead == {"dl_doc_0", "dl_doc_1"}
+    assert list(resumed.reprocess("pipe")) == []
+
+
+def test_rejects_bad_arguments() -> None:
+    with pytest.raises(ValueError):
+        DeadLetterReprocessor(_FakeDeadLetters({}), batch_size=0)  # type: ignore
+    with pytest.raises(TypeError):
+        list(DeadLetterReprocessor(_FakeDeadLetters({"doc": "x"})).entries("pipe", error_filter=42))  # type: ignore
@@ -0,0 +1,211 @@
+import re
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from vectara.managers.document import AsyncDocumentManager, DocOpEnum, DocState, DocumentManager
+from vectara.managers.manifest import Manifest
+from vectara.types import CreateDocumentRequest_Structured, Document
+
+
+def _make_doc(doc_id: str, text: str = "Some important text") -> CreateDocumentRequest_Structured:
+    return CreateDocumentRequest_Structured.model_validate({"id": doc_id, "sections": [{"text": text}]})
+
+
+class _FakeDocumentsClient:
+    """Records calls and keeps an in-memory corpus of documents keyed by id."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.docs: Dict[str, Document] = {}
+        self.calls: List[str] = []
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self, name: str) -> None:
+        with self._lock:
+            self.calls.append(name)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def list(self, corpus_key: str, metadata_filter: Any = None, **kwargs: Any) -> List[Document]:
+        self._enter("list")
+        time.sleep(self.delay)
+        self._exit()
+        if metadata_filter is None:
+            return list(self.docs.values())
+        doc_ids = re.findall(r"doc\.id = '([^']*)'", metadata_filter)
+        return [self.docs[doc_id] for doc_id in doc_ids if doc_id in self.docs]
+
+    def create(self, corpus_key: str, request: Any, **kwargs: Any) -> Document:
+        self._enter("create")
+        time.sleep(self.delay)
+        self._exit()
+        document = Document(id=request.id, metadata=request.metadata)
+        self.docs[request.id] = document
+        return document
+
+    def delete(self, corpus_key: str, doc_id: str, **kwargs: Any) -> None:
+        self._enter("delete")
+        self._exit()
+        del self.docs[doc_id]
+
+
+class _AsyncPage:
+    def __init__(self, items: List[Document]) -> None:
+        self.items = items
+
+    async def __aiter__(self):  # type: ignore
+        for item in self.items:
+            yield item
+
+
+class _FakeAsyncDocumentsClient:
+    def __init__(self, sync: _FakeDocumentsClient) -> None:
+        self.sync = sync
+
+    async def list(self, corpus_key: str, metadata_filter: Any = None, **kwargs: Any) -> _AsyncPage:
+        return _AsyncPage(self.sync.list(corpus_key, metadata_filter=metadata_filter))
+
+    async def create(self, corpus_key: str, request: Any, **kwargs: Any) -> Document:
+        return self.sync.create(corpus_key, request=request)
+
+    async def delete(self, corpus_key: str, doc_id: str, **kwargs: Any) -> None:
+        self.sync.delete(corpus_key, doc_id)
+
+
+def test_index_doc_upsert() -> None:
+    client = _FakeDocumentsClient()
+    manager = DocumentManager(client)  # type: ignore
+
+    assert manager.index_doc("corpus", _make_doc("abc")) == DocOpEnum.CREATED
+    assert manager.index_doc("corpus", _make_doc("abc")) == DocOpEnum.IGNORED
+    assert manager.index_doc("corpus", _make_doc("abc", "changed")) == DocOpEnum.UPDATED
+    assert client.calls == ["list", "create", "list", "list", "delete", "create"]
+
+
+def test_lookup_docs_batches_ids() -> None:
+    client = _FakeDocumentsClient()
+    manager = DocumentManager(client)  # type: ignore
+    manager.index_doc("corpus", _make_doc("a"))
+    client.docs["legacy"] = Document(id="legacy", metadata={"author": "someone"})
+    client.calls.clear()
+
+    states = manager.lookup_docs("corpus", ["a", "legacy"] + [f"missing-{i}" for i in range(8)], batch_size=5)
+
+    assert client.calls == ["list", "list"]
+    assert states["a"].exists and states["a"].sha256 is not None
+    assert states["legacy"] == DocState(exists=True, sha256=None)
+    assert states["missing-0"] == DocState(exists=False)
+    assert manager.scan_docs("corpus").keys() == {"a", "legacy"}
+
+
+def test_index_doc_with_known_state_skips_lookup() -> None:
+    client = _FakeDocumentsClient()
+    manager = DocumentManager(client)  # type: ignore
+    manager.index_doc("corpus", _make_doc("a"))
+    states = manager.scan_docs("corpus")
+    client.calls.clear()
+
+    assert manager.index_doc("corpus", _make_doc("a"), state=states["a"]) == DocOpEnum.IGNORED
+    assert manager.index_doc("corpus", _make_doc("a", "changed"), state=states["a"]) == DocOpEnum.UPDATED
+    assert client.calls == ["delete", "create"]
+
+
+def test_manifest_skips_unchanged_documents_without_network_calls(tmp_path: Any) -> None:
+    client = _FakeDocumentsClient()
+    manifest = Manifest(tmp_path / "manifest.db")
+    manager = DocumentManager(client, manifest=manifest)  # type: ignore
+
+    assert manager.index_doc("corpus", _make_doc("a")) == DocOpEnum.CREATED
+    assert manifest.get("corpus", "a") is not None
+    client.calls.clear()
+
+    assert manager.index_doc("corpus", _make_doc("a")) == DocOpEnum.IGNORED
+    assert dict(manager.index_docs("corpus", [_make_doc("a")])) == {"a": DocOpEnum.IGNORED}
+    assert client.calls == []
+
+    # A fresh manifest entry is trusted for existence, so a change goes straight to the upsert.
+    assert manager.index_doc("corpus", _make_doc("a", "changed")) == DocOpEnum.UPDATED
+    assert client.calls == ["delete", "create"]
+
+
+def test_stale_manifest_is_reconciled_with_server(tmp_path: Any) -> None:
+    client = _FakeDocumentsClient()
+    DocumentManager(client).index_doc("corpus", _make_doc("a"))
+    manifest = Manifest(tmp_path / "manifest.db", max_age=60)
+    manager = DocumentManager(client, manifest=manifest)  # type: ignore
+
+    manifest.put("corpus", "a", "0" * 64, indexed_at=time.time() - 120)
+    assert manifest.get_fresh("corpus", "a") is None
+    assert manager.index_doc("corpus", _make_doc("a")) == DocOpEnum.IGNORED
+    assert client.calls[-1] == "list"
+
+    entry = manifest.get_fresh("corpus", "a")
+    assert entry is not None and entry.sha256 == client.docs["a"].metadata["sha256"]  # type: ignore
+
+
+def test_index_docs_is_concurrent_and_streams_results() -> None:
+    client = _FakeDocumentsClient(delay=0.02)
+    manager = DocumentManager(client)  # type: ignore
+
+    results = dict(manager.index_docs("corpus", (_make_doc(f"doc-{i}") for i in range(20)), concurrency=4))
+
+    assert results == {f"doc-{i}": DocOpEnum.CREATED for i in range(20)}
+    assert 1 < client.max_in_flight <= 4
+    assert client.calls.count("list") == 1
+
+    results = dict(manager.index_docs("corpus", (_make_doc(f"doc-{i}") for i in range(20)), batch_size=8))
+    assert results == {f"doc-{i}": DocOpEnum.IGNORED for i in range(20)}
+    assert client.calls.count("list") == 4
+
+
+def test_index_docs_consumes_input_lazily() -> None:
+    client = _FakeDocumentsClient()
+    manager = DocumentManager(client)  # type: ignore
+    produced: List[int] = []
+
+    def docs():  # type: ignore
+        for i in range(1000):
+            produced.append(i)
+            yield _make_doc(f"doc-{i}")
+
+    stream = manager.index_docs("corpus", docs(), concurrency=2, batch_size=10)
+    next(stream)
+    stream.close()
+
+    assert len(produced) <= 20
+
+
+def test_index_docs_raises_failures() -> None:
+    client = _FakeDocumentsClient()
+    manager = DocumentManager(client)  # type: ignore
+
+    def fail(*args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("boom")
+
+    client.create = fail  # type: ignore
+    with pytest.raises(RuntimeError):
+        list(manager.index_docs("corpus", [_make_doc("a"), _make_doc("b")], concurrency=2))
+
+
+@pytest.mark.asyncio
+async def test_async_index_docs() -> None:
+    sync = _FakeDocumentsClient()
+    manager = AsyncDocumentManager(_FakeAsyncDocumentsClient(sync))  # type: ignore
+
+    async def docs():  # type: ignore
+        for i in range(10):
+            yield _make_doc(f"doc-{i}")
+
+    results = {doc_id: op async for doc_id, op in manager.index_docs("corpus", docs(), concurrency=3)}
+    assert results == {f"doc-{i}": DocOpEnum.CREATED for i in range(10)}
+
+    assert await manager.index_doc("corpus", _make_doc("doc-1")) == DocOpEnum.IGNORED
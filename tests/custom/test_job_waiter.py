@@ -0,0 +1,240 @@
+import asyncio
+import datetime as dt
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from vectara.core.api_error import ApiError
+from vectara.errors.not_found_error import NotFoundError
+from vectara.managers.jobs import AsyncJobWaiter, JobWaiter, _Backoff
+from vectara.types import Job, PipelineRun
+
+CREATED = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+
+
+class _FakeJobs:
+    """Jobs whose state the test moves along, recording the calls made to read them."""
+
+    def __init__(self, states: Dict[str, str]) -> None:
+        self.states = dict(states)
+        self.calls: List[str] = []
+        self.list_kwargs: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def _job(self, job_id: str) -> Job:
+        return Job(id=job_id, state=self.states[job_id], corpus_keys=["docs"], created_at=CREATED)
+
+    def get(self, job_id: str) -> Job:
+        with self.lock:
+            self.calls.append(f"get {job_id}")
+            if job_id not in self.states:
+                raise NotFoundError(body={"messages": ["missing"]})
+            return self._job(job_id)
+
+    def list(self, **kwargs: Any) -> List[Job]:
+        with self.lock:
+            self.calls.append("list")
+            self.list_kwargs.append(kwargs)
+            return [self._job(job_id) for job_id in self.states]
+
+
+class _FakeRuns:
+    def __init__(self, statuses: Dict[str, str]) -> None:
+        self.statuses = dict(statuses)
+        self.calls: List[str] = []
+
+    def _run(self, run_id: str) -> PipelineRun:
+        return PipelineRun(id=run_id, pipeline_key="pipe", agent_key="agent", status=self.statuses[run_id],
+                           trigger_type="manual", records_fetched=0, records_processed=0, records_failed=0,
+                           created_at=CREATED)
+
+    def get(self, pipeline_key: str, run_id: str) -> PipelineRun:
+        self.calls.append(f"get {run_id}")
+        return self._run(run_id)
+
+    def list(self, pipeline_key: str, status: Optional[str] = None, limit: Optional[int] = None) -> List[PipelineRun]:
+        self.calls.append("list")
+        return [self._run(run_id) for run_id, run_status in self.statuses.items() if run_status == status]
+
+
+class _AsyncFakeJobs:
+    def __init__(self, jobs: _FakeJobs) -> None:
+        self.jobs = jobs
+
+    async def get(self, job_id: str) -> Job:
+        return self.jobs.get(job_id)
+
+    async def list(self, **kwargs: Any) -> Any:
+        jobs = self.jobs.list(**kwargs)
+
+        async def pager() -> Any:
+            for job in jobs:
+                yield job
+
+        return pager()
+
+
+def _waiter(jobs: Any, runs: Any = None, **kwargs: Any) -> JobWaiter:
+    return JobWaiter(jobs, runs, min_interval=kwargs.pop("min_interval", 0.01),
+                     max_interval=kwargs.pop("max_interval", 0.05), **kwargs)
+
+
+def test_backoff_grows_until_something_changes() -> None:
+    backoff = _Backoff(1.0, 4.0, 2.0)
+    assert [backoff.next(False) for _ in range(4)] == [2.0, 4.0, 4.0, 4.0]
+    assert backoff.next(True) == 1.0
+    with pytest.raises(ValueError):
+        _Backoff(0, 1.0, 2.0)
+
+
+def test_waits_for_jobs_polling_them_in_one_list() -> None:
+    jobs = _FakeJobs({"job_1": "queued", "job_2": "started"})
+    waiter = _waiter(jobs)
+    futures = waiter.wait_for_jobs(["job_1", "job_2", "job_1"])
+    assert list(futures) == ["job_1", "job_2"]
+
+    time.sleep(0.1)
+    jobs.states.update(job_1="completed", job_2="failed")
+    assert futures["job_1"].result(5).state == "completed"
+    assert futures["job_2"].result(5).state == "failed"
+
+    # Each job is fetched once to learn when it was created, then both are read by listing the jobs.
+    assert jobs.calls[:2] == ["get job_1", "get job_2"]
+    assert set(jobs.calls[2:]) == {"list"}
+    assert jobs.list_kwargs[0]["corpus_key"] == ["docs"]
+    assert jobs.list_kwargs[0]["after"] < CREATED
+    assert waiter.pending == 0
+
+
+def test_unknown_job_fails_its_future() -> None:
+    waiter = _waiter(_FakeJobs({"job_1": "completed"}))
+    futures = waiter.wait_for_jobs(["job_1", "job_404"])
+    assert futures["job_1"].result(5).state == "completed"
+    with pytest.raises(NotFoundError):
+        futures["job_404"].result(5)
+
+
+def test_transient_errors_keep_polling() -> None:
+    jobs = _FakeJobs({"job_1": "started"})
+    failures = iter([ApiError(status_code=503, body=None)])
+    get = jobs.get
+
+    def flaky_get(job_id: str) -> Job:
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        jobs.states[job_id] = "completed"
+        return get(job_id)
+
+    jobs.get = flaky_get  # type: ignore
+    assert _waiter(jobs).wait_for_jobs(["job_1"])["job_1"].result(5).state == "completed"
+
+
+def test_timeout_and_cancel() -> None:
+    jobs = _FakeJobs({"job_1": "started", "job_2": "started"})
+    waiter = _waiter(jobs, max_interval=10.0)
+    timed = waiter.wait_for_jobs(["job_1"], timeout=0.2)["job_1"]
+    cancelled = waiter.wait_for_jobs(["job_2"])["job_2"]
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        timed.result(5)
+    # The poller wakes for the deadline rather than sleeping out the polling interval.
+    assert time.monotonic() - start < 2
+
+    cancelled.cancel()
+    deadline = time.monotonic() + 5
+    while waiter.pending:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_jobs_added_while_polling_are_polled_straight_away() -> None:
+    polling = threading.Event()
+    release = threading.Event()
+
+    class _SlowJobs(_FakeJobs):
+        def get(self, job_id: str) -> Job:
+            if job_id == "job_1":
+                polling.set()
+                release.wait(5)
+            return super().get(job_id)
+
+    waiter = _waiter(_SlowJobs({"job_1": "started", "job_2": "completed"}), min_interval=10.0, max_interval=10.0)
+    waiter.wait_for_jobs(["job_1"])
+    assert polling.wait(5)
+    # The poller is polling outside the lock, so it isn't waiting on the condition to be notified.
+    added = waiter.wait_for_jobs(["job_2"])["job_2"]
+    release.set()
+    assert added.result(2).state == "completed"
+    waiter.close()
+
+
+def test_cancelling_while_the_future_is_resolved(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _CancelledFirst(Future):  # type: ignore[type-arg]
+        def set_result(self, result: Any) -> None:
+            # The waiter cancels between the poller's done() check and its set_result.
+            self.cancel()
+            super().set_result(result)
+
+    monkeypatch.setattr("vectara.managers.jobs.Future", _CancelledFirst)
+    jobs = _FakeJobs({"job_1": "completed", "job_2": "started"})
+    waiter = _waiter(jobs)
+    cancelled = waiter.wait_for_jobs(["job_1"])["job_1"]
+    with pytest.raises(CancelledError):
+        cancelled.result(5)
+
+    # The poller survived, and keeps resolving the other jobs.
+    monkeypatch.setattr("vectara.managers.jobs.Future", Future)
+    later = waiter.wait_for_jobs(["job_2"])["job_2"]
+    jobs.states["job_2"] = "completed"
+    assert later.result(5).state == "completed"
+
+
+def test_close_cancels_the_futures() -> None:
+    waiter = _waiter(_FakeJobs({"job_1": "started"}))
+    future = waiter.wait_for_jobs(["job_1"])["job_1"]
+    waiter.close()
+    with pytest.raises(CancelledError):
+        future.result(5)
+
+
+def test_waits_for_pipeline_runs() -> None:
+    runs = _FakeRuns({"run_1": "running", "run_2": "running"})
+    waiter = _waiter(_FakeJobs({}), runs)
+    first = waiter.wait_for_pipeline_run("pipe", "run_1")
+    second = waiter.wait_for_pipeline_run("pipe", "run_2")
+
+    time.sleep(0.1)
+    runs.statuses["run_1"] = "completed"
+    assert first.result(5).status == "completed"
+    runs.statuses["run_2"] = "cancelled"
+    assert second.result(5).status == "cancelled"
+
+    # While both run, they are read by listing the running runs, and only the finished one is fetched.
+    assert "list" in runs.calls
+    assert runs.calls.count("get run_1") == 1
+
+
+def test_pipeline_runs_need_a_client() -> None:
+    with pytest.raises(TypeError):
+        _waiter(_FakeJobs({})).wait_for_pipeline_run("pipe", "run_1")
+
+
+@pytest.mark.asyncio
+async def test_async_waits_for_jobs() -> None:
+    jobs = _FakeJobs({"job_1": "queued", "job_2": "started", "job_3": "started"})
+    waiter = AsyncJobWaiter(_AsyncFakeJobs(jobs), min_interval=0.01, max_interval=0.05)  # type: ignore
+    futures = waiter.wait_for_jobs(["job_1", "job_2"])
+    timed = waiter.wait_for_jobs(["job_3"], timeout=0.1)["job_3"]
+
+    await asyncio.sleep(0.1)
+    jobs.states.update(job_1="completed", job_2="aborted")
+    results = await asyncio.wait_for(asyncio.gather(*futures.values()), 5)
+    assert [job.state for job in results] == ["completed", "aborted"]
+    assert "list" in jobs.calls
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(timed, 5)
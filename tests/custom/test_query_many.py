@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+import time
+from typing import List
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara, QueryRequest, Vectara
+from vectara.types import KeyedSearchCorpus, SearchCorporaParameters
+
+
+class _Server:
+    """Answers each query after a delay taken from the query text, failing the queries containing "fail"."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.bodies: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _enter(self, request: httpx.Request) -> dict:
+        body = json.loads(request.content)
+        with self._lock:
+            self.bodies.append(body)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return body
+
+    def _exit(self, body: dict) -> httpx.Response:
+        with self._lock:
+            self.in_flight -= 1
+        if "fail" in body["query"]:
+            return httpx.Response(400, json={"messages": ["bad query"]})
+        return httpx.Response(200, json={"search_results": [{"text": body["query"], "score": 1.0}]})
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = self._enter(request)
+        time.sleep(float(body["query"].split()[-1]))
+        return self._exit(body)
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        body = self._enter(request)
+        await asyncio.sleep(float(body["query"].split()[-1]))
+        return self._exit(body)
+
+
+def _requests(delays: List[float]) -> List[QueryRequest]:
+    search = SearchCorporaParameters(corpora=[KeyedSearchCorpus(corpus_key="corpus")])
+    return [QueryRequest(query=f"query {i} {delay}", search=search) for i, delay in enumerate(delays)]
+
+
+def test_query_many_in_order_and_as_completed() -> None:
+    server = _Server()
+    client = Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+    requests = _requests([0.1, 0.0, 0.05, 0.0] * 4)
+
+    started = time.monotonic()
+    results = list(client.query_many(requests, max_concurrency=4))
+    assert time.monotonic() - started < 0.5
+    assert [result.index for result in results] == list(range(16))
+    assert [result.response.search_results[0].text for result in results] == [r.query for r in requests]  # type: ignore
+    assert server.max_in_flight == 4
+
+    results = list(client.query_many(requests[:4], max_concurrency=4, ordered=False))
+    assert results[-1].index == 0
+
+
+def test_query_many_holds_back_a_bounded_number_behind_a_stalled_query() -> None:
+    server = _Server()
+    client = Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+    pulled = []
+
+    def requests():  # type: ignore
+        for request in _requests([0.5] + [0.0] * 99):
+            pulled.append(request)
+            yield request
+
+    results = client.query_many(requests(), max_concurrency=4)
+    assert next(results).index == 0
+    # While the first query stalled, at most 4 queries were in flight and 4 finished ones held back.
+    assert len(pulled) <= 8
+    assert [result.index for result in results] == list(range(1, 100))
+
+
+def test_query_many_isolates_errors_and_accepts_dicts() -> None:
+    server = _Server()
+    client = Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+    search = {"corpora": [{"corpus_key": "corpus"}]}
+
+    results = list(client.query_many([
+        {"query": "ok 0", "search": search, "save_history": False},
+        {"query": "fail 0", "search": search},
+        {"query": "ok 0", "search": search},
+    ], request_options={"max_retries": 0}))
+
+    assert [result.succeeded for result in results] == [True, False, True]
+    assert results[1].error is not None and results[1].response is None
+    assert server.bodies[0]["save_history"] is False and "generation" not in server.bodies[0]
+
+
+@pytest.mark.asyncio
+async def test_async_query_many() -> None:
+    server = _Server()
+    client = AsyncVectara(api_key="key",
+                          httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(server.async_handler)))
+
+    async def requests():  # type: ignore
+        for request in _requests([0.05, 0.0, 0.0, 0.0, 0.05, 0.0] * 5):
+            yield request
+
+    started = time.monotonic()
+    results = [result async for result in client.query_many(requests(), max_concurrency=10)]
+    assert time.monotonic() - started < 0.3
+    assert [result.index for result in results] == list(range(30))
+    assert all(result.succeeded for result in results)
+    assert server.max_in_flight == 10
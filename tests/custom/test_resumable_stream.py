@@ -0,0 +1,197 @@
+import gc
+import json
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara, Vectara
+from vectara.utils.resumable_stream import AsyncResumableStream, StreamResumeError, _Resumption
+
+_HEADERS = {"content-type": "text/event-stream"}
+
+
+def _event(data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    lines = f"id: {event_id}\n" if event_id else ""
+    return f"{lines}data: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+def _chunk(text: str, event_id: Optional[str] = None) -> bytes:
+    return _event({"type": "generation_chunk", "generation_chunk": text}, event_id)
+
+
+class _FlakyServer:
+    """Serves a stream of events, dropping the connection after drop_after events on the first attempts."""
+
+    def __init__(self, events: List[bytes], drop_after: List[int], honour_last_event_id: bool = False):
+        self.events = events
+        self.drop_after = drop_after
+        self.honour_last_event_id = honour_last_event_id
+        self.requests: List[httpx.Request] = []
+
+    def _events(self, request: httpx.Request) -> List[bytes]:
+        last_event_id = request.headers.get("last-event-id")
+        if not self.honour_last_event_id or last_event_id is None:
+            return self.events
+        position = next(i for i, event in enumerate(self.events) if event.startswith(f"id: {last_event_id}\n".encode()))
+        return self.events[position + 1 :]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        events = self._events(request)
+        drop_after = self.drop_after[len(self.requests) - 1] if len(self.requests) <= len(self.drop_after) else None
+
+        def body() -> Iterator[bytes]:
+            for i, event in enumerate(events):
+                if i == drop_after:
+                    raise httpx.RemoteProtocolError("peer closed connection without sending complete message body")
+                yield event
+
+        return httpx.Response(200, headers=_HEADERS, content=body())
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        response = self.handler(request)
+        sync_body = response.stream
+
+        async def body() -> AsyncIterator[bytes]:
+            for chunk in sync_body:  # type: ignore
+                yield chunk
+
+        return httpx.Response(200, headers=_HEADERS, content=body())
+
+
+def _client(server: _FlakyServer) -> Vectara:
+    return Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+
+
+def _texts(events: Any) -> List[str]:
+    return [event.generation_chunk for event in events]
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("vectara.utils.resumable_stream.time.sleep", lambda seconds: None)
+
+
+def test_replays_and_skips_delivered_events() -> None:
+    server = _FlakyServer([_chunk(text) for text in ["a", "b", "c", "d"]], drop_after=[2, 3])
+    client = _client(server)
+
+    stream = client.query_stream(query="q", search={"corpora": []}, resumable=True)  # type: ignore
+    assert _texts(stream) == ["a", "b", "c", "d"]
+    assert len(server.requests) == 3
+    assert "last-event-id" not in server.requests[1].headers
+
+
+def test_resumes_from_last_event_id() -> None:
+    server = _FlakyServer(
+        [_chunk(text, event_id=str(i)) for i, text in enumerate(["a", "b", "c"])],
+        drop_after=[2],
+        honour_last_event_id=True,
+    )
+    client = _client(server)
+
+    assert _texts(client.query_stream(query="q", search={"corpora": []}, resumable=True)) == ["a", "b", "c"]  # type: ignore
+    assert server.requests[1].headers["last-event-id"] == "1"
+
+
+def test_replayed_events_which_diverge_raise() -> None:
+    server = _FlakyServer([_chunk("a"), _chunk("b")], drop_after=[1])
+    original = server.handler
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if server.requests:
+            server.events = [_chunk("different"), _chunk("b")]
+        return original(request)
+
+    server.handler = handler  # type: ignore
+    client = _client(server)
+
+    with pytest.raises(StreamResumeError):
+        list(client.query_stream(query="q", search={"corpora": []}, resumable=True))  # type: ignore
+
+
+def test_replay_ending_before_catching_up_raises() -> None:
+    server = _FlakyServer([_chunk(text) for text in ["a", "b", "c", "d", "e"]], drop_after=[3])
+    original = server.handler
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if server.requests:
+            server.events = server.events[:2]
+        return original(request)
+
+    server.handler = handler  # type: ignore
+    client = _client(server)
+
+    texts = []
+    with pytest.raises(StreamResumeError):
+        for event in client.query_stream(query="q", search={"corpora": []}, resumable=True):  # type: ignore
+            texts.append(event.generation_chunk)
+    # The replay ended after two of the three events already delivered.
+    assert texts == ["a", "b", "c"]
+
+
+@dataclass
+class _Delivered:
+    text: str
+
+
+def test_does_not_keep_delivered_events() -> None:
+    state: _Resumption[_Delivered] = _Resumption(None, max_reconnects=3, backoff=0)
+    refs = []
+    for i in range(100):
+        event = _Delivered(str(i))
+        refs.append(weakref.ref(event))
+        assert state.accept(None, event)
+    del event
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+    # A replay is still checked against the events delivered before any new one is accepted.
+    state.connected()
+    assert not any(state.accept(None, _Delivered(str(i))) for i in range(100))
+    assert state.accept(None, _Delivered("100"))
+    state.connected()
+    assert not state.accept(None, _Delivered("0"))
+    with pytest.raises(StreamResumeError):
+        for i in range(1, 101):
+            state.accept(None, _Delivered("x" if i == 50 else str(i)))
+
+
+def test_gives_up_after_max_reconnects() -> None:
+    server = _FlakyServer([_chunk("a"), _chunk("b")], drop_after=[1, 1, 1])
+    client = _client(server)
+
+    with pytest.raises(StreamResumeError):
+        list(client.query_stream(query="q", search={"corpora": []}, resumable=True, max_reconnects=2))  # type: ignore
+    assert len(server.requests) == 3
+
+
+def test_not_resumable_by_default() -> None:
+    server = _FlakyServer([_chunk("a"), _chunk("b")], drop_after=[1])
+    client = _client(server)
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        list(client.query_stream(query="q", search={"corpora": []}))  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_async_resumable_stream(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def no_sleep(seconds: float) -> None:
+        pass
+
+    monkeypatch.setattr("vectara.utils.resumable_stream.asyncio.sleep", no_sleep)
+    server = _FlakyServer([_chunk(text) for text in ["a", "b", "c"]], drop_after=[1])
+    client = AsyncVectara(
+        api_key="key", httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(server.async_handler))
+    )
+
+    stream: AsyncResumableStream[Any] = AsyncResumableStream(
+        lambda options: client.queries.with_raw_response.query_stream(
+            query="q", search={"corpora": []}, request_options=options  # type: ignore
+        )
+    )
+    assert _texts([event async for event in stream]) == ["a", "b", "c"]
+    assert stream.reconnects == 1
@@ -0,0 +1,109 @@
+import gc
+import weakref
+from typing import Any, AsyncIterator, Iterator, List
+
+import pytest
+
+from vectara.core.pydantic_utilities import parse_obj_as
+from vectara.types import AgentStreamedResponse, ChatStreamedResponse, QueryStreamedResponse
+from vectara.utils.stream_aggregator import AsyncStreamAggregator, StreamAggregator, TextBuffer
+
+CREATED = "2025-01-01T00:00:00Z"
+
+
+def _parse(kind: Any, events: List[dict]) -> List[Any]:
+    return [parse_obj_as(kind, event) for event in events]
+
+
+def _chat_events() -> List[Any]:
+    return _parse(ChatStreamedResponse, [
+        {"type": "search_results", "search_results": [{"text": "Pets are welcome.", "score": 0.9}]},
+        {"type": "chat_info", "chat_id": "cht_1", "turn_id": "trn_1"},
+        {"type": "generation_chunk", "generation_chunk": "Pets "},
+        {"type": "generation_chunk", "generation_chunk": "are "},
+        {"type": "generation_chunk", "generation_chunk": "welcome."},
+        {"type": "generation_end"},
+        {"type": "factual_consistency_score", "factual_consistency_score": 0.83},
+        {"type": "end"},
+    ])
+
+
+def test_text_buffer_joins_on_demand() -> None:
+    buffer = TextBuffer()
+    for chunk in ["a", "", None, "bc"]:
+        buffer.append(chunk)
+    assert (buffer.text, len(buffer)) == ("abc", 3)
+    buffer.append("d")
+    assert str(buffer) == "abcd"
+
+
+def test_exposes_partial_fields_while_iterating() -> None:
+    stream = StreamAggregator(_chat_events())
+    seen = []
+    for event in stream:
+        if event.type == "generation_chunk":
+            seen.append((stream.text, stream.chat_id, len(stream.search_results or [])))
+        if event.type == "generation_end":
+            assert stream.factual_consistency_score is None
+    assert seen == [("Pets ", "cht_1", 1), ("Pets are ", "cht_1", 1), ("Pets are welcome.", "cht_1", 1)]
+
+    response = stream.result()
+    assert (response.text, response.factual_consistency_score, response.complete) == ("Pets are welcome.", 0.83, True)
+    assert response.events == 8
+
+    chat = response.as_chat_response()
+    assert (chat.answer, chat.chat_id, chat.turn_id) == ("Pets are welcome.", "cht_1", "trn_1")
+    assert chat.search_results[0].text == "Pets are welcome."  # type: ignore
+
+
+def test_result_consumes_the_rest_of_the_stream() -> None:
+    events = _parse(QueryStreamedResponse, [
+        {"type": "generation_chunk", "generation_chunk": "Hello"},
+        {"type": "generation_chunk", "generation_chunk": " world"},
+        {"type": "error", "messages": ["quota exceeded"]},
+    ])
+    stream = StreamAggregator(events)
+    assert next(iter(stream)).generation_chunk == "Hello"
+
+    response = stream.result()
+    assert response.as_query_response().summary == "Hello world"
+    assert (response.succeeded, response.complete, response.errors) == (False, False, ["quota exceeded"])
+
+
+def test_does_not_keep_the_events() -> None:
+    refs: List[Any] = []
+
+    def events() -> Iterator[Any]:
+        for event in _chat_events():
+            refs.append(weakref.ref(event))
+            yield event
+
+    response = StreamAggregator(events()).result()
+    gc.collect()
+    assert response.text == "Pets are welcome."
+    # Only the search results are kept, and they are not the events themselves.
+    assert all(ref() is None for ref in refs)
+
+
+@pytest.mark.asyncio
+async def test_async_aggregates_agent_output() -> None:
+    events = _parse(AgentStreamedResponse, [
+        {"type": "streaming_thinking", "content": "Let me ", "created_at": CREATED},
+        {"type": "streaming_thinking", "content": "check.", "created_at": CREATED},
+        {"type": "streaming_agent_output", "content": "It is ", "created_at": CREATED},
+        {"type": "streaming_agent_output", "content": "sunny.", "created_at": CREATED},
+        {"type": "end"},
+    ])
+
+    async def stream() -> AsyncIterator[Any]:
+        for event in events:
+            yield event
+
+    aggregator = AsyncStreamAggregator(stream())
+    async for event in aggregator:
+        if event.type == "streaming_agent_output":
+            break
+    assert (aggregator.thinking, aggregator.text) == ("Let me check.", "It is ")
+
+    response = await aggregator.result()
+    assert (response.text, response.thinking, response.complete) == ("It is sunny.", "Let me check.", True)
@@ -0,0 +1,255 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from vectara.managers.document import AsyncDocumentManager, DocOpEnum, DocumentManager
+from vectara.managers.manifest import Manifest
+from vectara.managers.upload import AsyncByteBudget, AsyncUploadManager, ByteBudget, UploadManager
+from vectara.types import Document
+
+
+class _FakeCorpus:
+    """Fake upload and documents clients sharing one in-memory corpus."""
+
+    def __init__(self) -> None:
+        self.docs: Dict[str, Document] = {}
+        self.calls: List[str] = []
+
+    # UploadClient
+    def file(self, corpus_key: str, file: Any, metadata: Any = None, **kwargs: Any) -> Document:
+        self.calls.append("upload")
+        doc_id, content, content_type = file
+        data = content if isinstance(content, bytes) else content.read()
+        document = Document(id=doc_id, metadata={**(metadata or {}), "size": len(data)})
+        self.docs[doc_id] = document
+        return document
+
+    # DocumentsClient
+    def list(self, corpus_key: str, metadata_filter: Any = None, **kwargs: Any) -> List[Document]:
+        self.calls.append("list")
+        return [doc for doc_id, doc in self.docs.items() if f"'{doc_id}'" in (metadata_filter or "")]
+
+    def delete(self, corpus_key: str, doc_id: str, **kwargs: Any) -> None:
+        self.calls.append("delete")
+        del self.docs[doc_id]
+
+
+class _AsyncPage:
+    def __init__(self, items: List[Document]) -> None:
+        self.items = items
+
+    async def __aiter__(self):  # type: ignore
+        for item in self.items:
+            yield item
+
+
+class _FakeAsyncCorpus:
+    """The async equivalent of _FakeCorpus, recording the most uploads in flight at once."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.sync = _FakeCorpus()
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def file(self, corpus_key: str, file: Any, metadata: Any = None, **kwargs: Any) -> Document:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.sync.file(corpus_key, file, metadata=metadata)
+        finally:
+            self.in_flight -= 1
+
+    async def list(self, corpus_key: str, metadata_filter: Any = None, **kwargs: Any) -> _AsyncPage:
+        return _AsyncPage(self.sync.list(corpus_key, metadata_filter=metadata_filter))
+
+    async def delete(self, corpus_key: str, doc_id: str, **kwargs: Any) -> None:
+        self.sync.delete(corpus_key, doc_id)
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_sync_directory_is_incremental(tmp_path: Path) -> None:
+    root = tmp_path / "docs"
+    _write(root / "a.txt", "first")
+    _write(root / "nested" / "b.md", "second")
+
+    corpus = _FakeCorpus()
+    document_manager = DocumentManager(corpus, manifest=Manifest(tmp_path / "manifest.db"))  # type: ignore
+    manager = UploadManager(corpus, document_manager)  # type: ignore
+
+    results = dict(manager.sync_directory("corpus", root))
+    assert results == {"a.txt": DocOpEnum.CREATED, "nested/b.md": DocOpEnum.CREATED}
+    assert corpus.docs["nested/b.md"].metadata["sha256"]  # type: ignore
+
+    corpus.calls.clear()
+    _write(root / "a.txt", "first, edited")
+    results = dict(manager.sync_directory("corpus", root))
+    assert results == {"a.txt": DocOpEnum.UPDATED, "nested/b.md": DocOpEnum.IGNORED}
+    assert corpus.calls == ["delete", "upload"]
+
+
+def test_sync_directory_reconciles_without_manifest(tmp_path: Path) -> None:
+    _write(tmp_path / "a.txt", "first")
+    corpus = _FakeCorpus()
+    manager = UploadManager(corpus, DocumentManager(corpus))  # type: ignore
+
+    assert dict(manager.sync_directory("corpus", tmp_path)) == {"a.txt": DocOpEnum.CREATED}
+    corpus.calls.clear()
+    assert dict(manager.sync_directory("corpus", tmp_path)) == {"a.txt": DocOpEnum.IGNORED}
+    assert corpus.calls == ["list"]
+
+
+def test_upload_streams_file_handle(tmp_path: Path) -> None:
+    _write(tmp_path / "a.txt", "x" * 1000)
+    received: List[Any] = []
+
+    class _Client:
+        def file(self, corpus_key: str, file: Any, metadata: Any = None) -> Document:
+            received.append(file)
+            return Document(id=file[0])
+
+    manager = UploadManager(_Client())  # type: ignore
+    manager.upload("corpus", tmp_path / "a.txt")
+    manager.upload("corpus", io.BytesIO(b"abc"), doc_id="in-memory.md")
+
+    assert received[0][0] == "a.txt" and hasattr(received[0][1], "read")
+    assert received[0][2] == "text/plain"
+    assert received[1][0] == "in-memory.md" and isinstance(received[1][1], io.BytesIO)
+
+    with pytest.raises(TypeError):
+        manager.upload("corpus", io.BytesIO(b"abc"))
+
+
+def test_max_inflight_bytes_caps_concurrent_uploads(tmp_path: Path) -> None:
+    for i in range(8):
+        _write(tmp_path / f"{i}.txt", "x" * 400)
+    lock = threading.Lock()
+    in_flight: List[int] = [0, 0]
+
+    class _Client:
+        def file(self, corpus_key: str, file: Any, metadata: Any = None) -> Document:
+            with lock:
+                in_flight[0] += 400
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 400
+            return Document(id=file[0])
+
+    manager = UploadManager(_Client(), max_inflight_bytes=1000)  # type: ignore
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: manager.upload("corpus", tmp_path / f"{i}.txt"), range(8)))
+
+    assert in_flight[1] <= 800
+    assert manager.budget is not None and manager.budget.in_flight == 0
+
+
+def test_byte_budget_admits_oversized_reservations_alone() -> None:
+    budget = ByteBudget(100)
+    with budget.reserve(1000):
+        assert budget.in_flight == 100
+    assert budget.in_flight == 0
+
+
+def test_upload_directory_reports_results_and_failures(tmp_path: Path) -> None:
+    for i in range(10):
+        _write(tmp_path / "docs" / f"dir{i % 3}" / f"{i}.txt", "x" * 100)
+    _write(tmp_path / "docs" / "skip.bin", "ignored by pattern")
+
+    class _Client:
+        def file(self, corpus_key: str, file: Any, metadata: Any = None) -> Document:
+            if file[0] == "dir1/4.txt":
+                raise RuntimeError("boom")
+            return Document(id=file[0], metadata=metadata)
+
+    manager = UploadManager(_Client())  # type: ignore
+    upload = manager.upload_directory("corpus", tmp_path / "docs", pattern="**/*.txt", workers=3,
+                                      metadata={"source": "test"})
+    results = {result.doc_id: result for result in upload}
+
+    assert len(results) == 10 and "dir0/0.txt" in results
+    assert not results["dir1/4.txt"].succeeded and isinstance(results["dir1/4.txt"].error, RuntimeError)
+    assert results["dir0/3.txt"].document.metadata == {"source": "test"}  # type: ignore
+    assert (upload.stats.files, upload.stats.failed, upload.stats.succeeded) == (10, 1, 9)
+    assert upload.stats.bytes == 900
+
+
+def test_sync_directory_with_workers(tmp_path: Path) -> None:
+    for i in range(6):
+        _write(tmp_path / f"{i}.txt", str(i))
+    corpus = _FakeCorpus()
+    manager = UploadManager(corpus, DocumentManager(corpus))  # type: ignore
+
+    results = dict(manager.sync_directory("corpus", tmp_path, workers=3))
+    assert results == {f"{i}.txt": DocOpEnum.CREATED for i in range(6)}
+
+
+@pytest.mark.asyncio
+async def test_async_sync_directory_is_incremental(tmp_path: Path) -> None:
+    root = tmp_path / "docs"
+    _write(root / "a.txt", "first")
+    _write(root / "nested" / "b.md", "second")
+
+    corpus = _FakeAsyncCorpus()
+    document_manager = AsyncDocumentManager(corpus, manifest=Manifest(tmp_path / "manifest.db"))  # type: ignore
+    manager = AsyncUploadManager(corpus, document_manager)  # type: ignore
+
+    results = {doc_id: op async for doc_id, op in manager.sync_directory("corpus", root)}
+    assert results == {"a.txt": DocOpEnum.CREATED, "nested/b.md": DocOpEnum.CREATED}
+
+    corpus.sync.calls.clear()
+    _write(root / "a.txt", "first, edited")
+    results = {doc_id: op async for doc_id, op in manager.sync_directory("corpus", root)}
+    assert results == {"a.txt": DocOpEnum.UPDATED, "nested/b.md": DocOpEnum.IGNORED}
+    assert corpus.sync.calls == ["delete", "upload"]
+
+
+@pytest.mark.asyncio
+async def test_async_upload_directory_is_limited_by_max_concurrency(tmp_path: Path) -> None:
+    for i in range(40):
+        _write(tmp_path / f"{i}.txt", "x" * 10)
+    corpus = _FakeAsyncCorpus(delay=0.01)
+    manager = AsyncUploadManager(corpus, max_concurrency=8)  # type: ignore
+
+    # Two directory uploads at once share the manager's limit.
+    uploads = [manager.upload_directory("corpus", tmp_path, concurrency=40) for _ in range(2)]
+
+    async def drain(upload: Any) -> List[Any]:
+        return [result async for result in upload]
+
+    results = await asyncio.gather(*(drain(upload) for upload in uploads))
+    assert [len(r) for r in results] == [40, 40]
+    assert all(result.succeeded for r in results for result in r)
+    assert uploads[0].stats.files == 40 and uploads[0].stats.bytes == 400
+    assert corpus.max_in_flight == 8
+
+
+@pytest.mark.asyncio
+async def test_async_max_inflight_bytes_caps_concurrent_uploads(tmp_path: Path) -> None:
+    for i in range(8):
+        _write(tmp_path / f"{i}.txt", "x" * 400)
+    corpus = _FakeAsyncCorpus(delay=0.01)
+    manager = AsyncUploadManager(corpus, max_inflight_bytes=1000)  # type: ignore
+
+    await asyncio.gather(*(manager.upload("corpus", tmp_path / f"{i}.txt") for i in range(8)))
+    assert corpus.max_in_flight == 2
+    assert manager.budget is not None and manager.budget.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_async_byte_budget_admits_oversized_reservations_alone() -> None:
+    budget = AsyncByteBudget(100)
+    async with budget.reserve(1000):
+        assert budget.in_flight == 100
+    assert budget.in_flight == 0
@@ -0,0 +1,109 @@
+"""
+Runs rounds of 256 concurrent queries against a local server with a simulated 20 ms latency, comparing throughput
+and connection reuse for several connection pool settings.
+
+    PYTHONPATH=src python tests/utils/benchmark_connection_pool.py
+
+HTTP/2 is only measured when the h2 package is installed and VECTARA_BENCHMARK_URL points at an HTTP/2 server
+answering POST /v2/query, since the local server only speaks HTTP/1.1.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from vectara import AsyncVectara
+from vectara.core.connection_pool import ConnectionStats, make_async_httpx_client
+from vectara.environment import VectaraEnvironment
+from vectara.types import KeyedSearchCorpus, SearchCorporaParameters
+
+CONCURRENCY = 256
+ROUNDS = 4
+LATENCY = 0.02
+
+_RESPONSE = json.dumps({"search_results": [{"text": "result", "score": 0.5}]}).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send each response in a single write, avoiding Nagle / delayed ACK stalls on reused connections.
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(_RESPONSE)
+
+    def log_message(self, *args: typing.Any) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+async def _run(url: str, settings: typing.Dict[str, typing.Any]) -> typing.Tuple[float, ConnectionStats]:
+    stats = ConnectionStats()
+    client = AsyncVectara(
+        api_key="key",
+        environment=VectaraEnvironment(default=url, auth=url),
+        httpx_client=make_async_httpx_client(stats=stats, **settings),
+    )
+    search = SearchCorporaParameters(corpora=[KeyedSearchCorpus(corpus_key="corpus")])
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*(client.queries.query(query=f"query {i}", search=search) for i in range(CONCURRENCY)))
+    return time.perf_counter() - started, stats
+
+
+def _serve(server: _Server) -> None:
+    server.serve_forever()
+
+
+def main() -> None:
+    # The server runs in its own process so that it doesn't compete with the client for the GIL.
+    server = _Server(("127.0.0.1", 0), _Handler)
+    process = multiprocessing.get_context("fork").Process(target=_serve, args=(server,), daemon=True)
+    process.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    settings: typing.List[typing.Tuple[str, str, typing.Dict[str, typing.Any]]] = [
+        ("httpx defaults (100 connections, 20 keep-alive)", url, {}),
+        ("256 connections, 20 keep-alive", url, {"max_connections": 256}),
+        ("256 connections, 256 keep-alive", url, {"max_connections": 256, "max_keepalive_connections": 256}),
+        ("256 connections, no keep-alive", url, {"max_connections": 256, "max_keepalive_connections": 0}),
+        ("64 connections, 64 keep-alive", url, {"max_connections": 64, "max_keepalive_connections": 64}),
+        ("32 connections, 32 keep-alive", url, {"max_connections": 32, "max_keepalive_connections": 32}),
+    ]
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except ImportError:
+        print("Skipping HTTP/2: pip install h2")
+    else:
+        if os.environ.get("VECTARA_BENCHMARK_URL"):
+            settings.append(("HTTP/2, 10 connections", os.environ["VECTARA_BENCHMARK_URL"],
+                             {"http2": True, "max_connections": 10}))
+
+    requests = CONCURRENCY * ROUNDS
+    for name, target, options in settings:
+        elapsed, stats = asyncio.run(_run(target, options))
+        print(f"{name}")
+        print(f"  {requests / elapsed:8.0f} queries/s, {stats.connections} connections opened, "
+              f"{stats.reuse_ratio:.0%} of requests reused a connection")
+
+    process.terminate()
+
+
+if __name__ == "__main__":
+    main()
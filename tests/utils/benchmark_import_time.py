@@ -0,0 +1,78 @@
+"""
+Measures the cold import time of the vectara package with python -X importtime, reporting the total time, the time
+spent in the vectara modules themselves and the slowest modules.
+
+    PYTHONPATH=src python tests/utils/benchmark_import_time.py ["from vectara.factory import Factory"]
+
+Each statement is imported ROUNDS times in a fresh interpreter and the fastest round is reported, as the first
+rounds also pay for warming the filesystem cache. The script exits with an error if the vectara modules take longer
+than BUDGET_MS to import.
+"""
+
+import os
+import subprocess
+import sys
+import typing
+
+ROUNDS = 5
+TOP = 15
+
+# The time the vectara modules themselves may take to import, leaving out their dependencies. Importing the Factory
+# takes about 70 ms of it now that the resource clients and types are imported lazily.
+BUDGET_MS = 150
+
+STATEMENTS = [
+    "import vectara",
+    "from vectara import Vectara",
+    "from vectara.factory import Factory",
+]
+
+
+class _Module(typing.NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def _import_times(statement: str) -> typing.List[_Module]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append(_Module(name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def _total(modules: typing.List[_Module]) -> int:
+    # Only the top level imports are not already counted in the cumulative time of another module.
+    return sum(module.self_us for module in modules)
+
+
+def main() -> None:
+    statements = sys.argv[1:] or STATEMENTS
+    over_budget = False
+    for statement in statements:
+        rounds = [_import_times(statement) for _ in range(ROUNDS)]
+        modules = min(rounds, key=_total)
+        own = sum(module.self_us for module in modules if module.name.split(".")[0] == "vectara")
+        vectara_modules = sum(1 for module in modules if module.name.split(".")[0] == "vectara")
+        print(statement)
+        print(f"  {_total(modules) / 1000:8.1f} ms in total, {len(modules)} modules")
+        print(f"  {own / 1000:8.1f} ms in {vectara_modules} vectara modules (budget {BUDGET_MS} ms)")
+        over_budget = over_budget or own / 1000 > BUDGET_MS
+        for module in sorted(modules, key=lambda module: module.self_us, reverse=True)[:TOP]:
+            print(f"  {module.self_us / 1000:8.1f} ms  {module.name}")
+    if over_budget:
+        sys.exit(f"Importing the vectara modules took longer than {BUDGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
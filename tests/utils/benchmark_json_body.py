@@ -0,0 +1,57 @@
+"""
+Compares serializing a large document request through the generic jsonable_encoder path (as HttpClient did for every
+request body) with the pre-serialized path used for pydantic models.
+
+    PYTHONPATH=src python tests/utils/benchmark_json_body.py
+"""
+
+import json
+import time
+import typing
+
+from vectara.core.json_body import encode_json_body
+from vectara.core.jsonable_encoder import jsonable_encoder
+from vectara.types import CreateDocumentRequest_Core
+
+
+def _document(parts: int) -> CreateDocumentRequest_Core:
+    return CreateDocumentRequest_Core.model_validate(
+        {
+            "id": "benchmark",
+            "metadata": {"source": "benchmark"},
+            "document_parts": [
+                {"text": "The quick brown fox jumps over the lazy dog. " * 8, "metadata": {"part": i, "tags": ["a", "b"]}}
+                for i in range(parts)
+            ],
+        }
+    )
+
+
+def _time(fn: typing.Callable[[], typing.Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(parts: int = 5000, repeat: int = 5) -> None:
+    document = _document(parts)
+
+    def generic() -> bytes:
+        return json.dumps(jsonable_encoder(document)).encode("utf-8")
+
+    def pre_serialized() -> typing.Optional[bytes]:
+        return encode_json_body(json_body=document, request_options=None, omit=...)
+
+    assert json.loads(generic()) == json.loads(pre_serialized() or b"")
+    before = _time(generic, repeat)
+    after = _time(pre_serialized, repeat)
+    print(f"{parts} document parts")
+    print(f"  jsonable_encoder + json:  {before * 1000:8.1f} ms")
+    print(f"  pre-serialized content:   {after * 1000:8.1f} ms ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Streams multi-megabyte events through EventSource.iter_sse and aiter_sse, and compares iter_sse with the previous
+approach of appending each decoded chunk to a string buffer and re-splitting it for every line.
+
+    PYTHONPATH=src python tests/utils/benchmark_sse.py
+"""
+
+import asyncio
+import time
+import typing
+
+import httpx
+
+from vectara.core.http_sse._api import EventSource
+from vectara.core.http_sse._decoders import SSEDecoder
+from vectara.core.http_sse._models import ServerSentEvent
+
+_HEADERS = {"content-type": "text/event-stream"}
+CHUNK_SIZE = 16 * 1024
+
+
+def _body(events: int, lines_per_event: int, line_size: int) -> bytes:
+    line = "data: " + "a" * line_size + "\n"
+    return (("event: chunk\n" + line * lines_per_event + "\n") * events).encode("utf-8")
+
+
+def _chunks(body: bytes) -> typing.Iterator[bytes]:
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i : i + CHUNK_SIZE]
+
+
+def _string_buffer_iter_sse(response: httpx.Response) -> typing.Iterator[ServerSentEvent]:
+    decoder = SSEDecoder()
+    buffer = ""
+    for chunk in response.iter_bytes():
+        buffer += chunk.decode("utf-8", errors="replace")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            sse = decoder.decode(line.rstrip("\r"))
+            if sse is not None:
+                yield sse
+
+
+def _time_sync(body: bytes, iter_sse: typing.Callable[[httpx.Response], typing.Iterator[ServerSentEvent]]) -> float:
+    response = httpx.Response(200, headers=_HEADERS, content=_chunks(body))
+    started = time.perf_counter()
+    for _ in iter_sse(response):
+        pass
+    return time.perf_counter() - started
+
+
+async def _time_async(body: bytes) -> float:
+    async def stream() -> typing.AsyncIterator[bytes]:
+        for chunk in _chunks(body):
+            yield chunk
+
+    source = EventSource(httpx.Response(200, headers=_HEADERS, content=stream()))
+    started = time.perf_counter()
+    async for _ in source.aiter_sse():
+        pass
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    for name, body in [
+        ("4 events of 1 MB, 4 KB data lines", _body(events=4, lines_per_event=256, line_size=4096)),
+        ("2 events of 4 MB, 64 KB data lines", _body(events=2, lines_per_event=64, line_size=65536)),
+        ("1 event with a single 8 MB data line", _body(events=1, lines_per_event=1, line_size=8 * 1024 * 1024)),
+        ("20000 small events", _body(events=20000, lines_per_event=1, line_size=100)),
+    ]:
+        before = _time_sync(body, _string_buffer_iter_sse)
+        after = _time_sync(body, lambda response: EventSource(response).iter_sse())
+        after_async = asyncio.run(_time_async(body))
+        print(f"{name} ({len(body) / 1e6:.1f} MB)")
+        print(f"  string buffer:  {before * 1000:8.1f} ms")
+        print(f"  iter_sse:       {after * 1000:8.1f} ms ({before / after:.1f}x)")
+        print(f"  aiter_sse:      {after_async * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
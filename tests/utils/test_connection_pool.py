@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+import httpx
+import pytest
+
+from vectara import Vectara
+from vectara.core.connection_pool import ConnectionStats, make_async_httpx_client, make_httpx_client
+from vectara.factory import Factory
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = json.dumps({"key": "corpus", "name": "corpus"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_make_httpx_client_settings() -> None:
+    client = make_httpx_client(timeout=30, max_connections=256, max_keepalive_connections=64, keepalive_expiry=30,
+                               connect_timeout=2)
+    pool = client._transport._pool  # type: ignore
+    assert pool._max_connections == 256 and pool._max_keepalive_connections == 64 and pool._keepalive_expiry == 30
+    assert client.timeout.connect == 2 and client.timeout.read == 30
+
+
+def test_requests_keep_the_connect_timeout() -> None:
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200, json={"key": "corpus", "name": "corpus"})
+
+    httpx_client = make_httpx_client(timeout=30, connect_timeout=2, transport=httpx.MockTransport(handler))
+    client = Vectara(api_key="key", httpx_client=httpx_client)
+    client.corpora.get("c")
+    client.corpora.get("c", request_options={"timeout_in_seconds": 1})
+    assert timeouts[0] == {"connect": 2, "read": 30, "write": 30, "pool": 30}
+    assert timeouts[1] == {"connect": 1, "read": 1, "write": 1, "pool": 1}
+
+
+def test_connection_stats_counts_reuse(server_url: str) -> None:
+    stats = ConnectionStats()
+    with make_httpx_client(stats=stats) as client:
+        for _ in range(5):
+            client.get(f"{server_url}/v2/corpora/c")
+    assert stats.snapshot() == {"requests": 5, "connections": 1, "reused": 4}
+    assert stats.reuse_ratio == 0.8
+
+    stats.reset()
+    with make_httpx_client(stats=stats, max_keepalive_connections=0) as client:
+        for _ in range(3):
+            client.get(f"{server_url}/v2/corpora/c")
+    assert stats.connections == 3 and stats.reused == 0
+
+
+def test_connection_stats_keep_existing_traces(server_url: str) -> None:
+    first, second = ConnectionStats(), ConnectionStats()
+    events = []
+    with second.instrument(first.instrument(make_httpx_client())) as client:
+        client.get(f"{server_url}/v2/corpora/c", extensions={"trace": lambda name, info: events.append(name)})
+        client.get(f"{server_url}/v2/corpora/c")
+    assert first.snapshot() == second.snapshot() == {"requests": 2, "connections": 1, "reused": 1}
+    assert "connection.connect_tcp.complete" in events
+
+
+@pytest.mark.asyncio
+async def test_async_connection_stats(server_url: str) -> None:
+    stats = ConnectionStats()
+    async with make_async_httpx_client(stats=stats, max_connections=2) as client:
+        await asyncio.gather(*(client.get(f"{server_url}/v2/corpora/c") for _ in range(10)))
+    assert stats.requests == 10 and stats.connections <= 2
+
+    events = []
+
+    async def trace(name: str, info: Any) -> None:
+        events.append(name)
+
+    twice = ConnectionStats()
+    async with twice.instrument(stats.instrument(make_async_httpx_client())) as client:
+        await client.get(f"{server_url}/v2/corpora/c", extensions={"trace": trace})
+    assert twice.connections == 1 and "connection.connect_tcp.complete" in events
+
+
+def test_factory_builds_tuned_client(server_url: str) -> None:
+    stats = ConnectionStats()
+    client = Factory(config={
+        "customer_id": "c",
+        "api_endpoint": server_url,
+        "auth_endpoint": server_url,
+        "auth": {"api_key": "key"},
+        "connection_pool": {"max_connections": 8, "max_keepalive_connections": 8, "connect_timeout": 1},
+    }, connection_stats=stats).build()
+
+    httpx_client = client._client_wrapper.httpx_client.httpx_client
+    assert httpx_client._transport._pool._max_connections == 8  # type: ignore
+    assert isinstance(httpx_client, httpx.Client) and httpx_client.timeout.connect == 1
+
+    for _ in range(3):
+        assert client.corpora.get("c").key == "corpus"
+    assert stats.requests == 3 and stats.connections == 1
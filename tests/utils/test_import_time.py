@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import typing
+
+import pytest
+
+import vectara
+
+# Modules which pull in most of the SDK (or yaml) and must only be imported once they are used.
+HEAVY_MODULES = [
+    "yaml",
+    "getpass",
+    "sqlite3",
+    "vectara.managers",
+    "vectara.corpora.client",
+    "vectara.documents.client",
+    "vectara.types",
+    "vectara.utils.lab_helper",
+    "vectara.utils.resumable_stream",
+]
+
+
+def _imported_modules(statement: str) -> typing.Set[str]:
+    src = os.path.dirname(os.path.dirname(os.path.abspath(vectara.__file__)))
+    script = (
+        "import sys\n"
+        f"{statement}\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([src, os.environ.get("PYTHONPATH", "")])},
+    )
+    return set(result.stdout.splitlines())
+
+
+@pytest.mark.parametrize("statement", ["from vectara import Vectara, AsyncVectara", "from vectara.factory import Factory"])
+def test_import_is_lazy(statement: str) -> None:
+    modules = _imported_modules(statement)
+    loaded = sorted(
+        module for module in modules
+        if any(module == heavy or module.startswith(f"{heavy}.") for heavy in HEAVY_MODULES)
+    )
+    assert loaded == []
+
+
+def test_lazy_attributes_resolve() -> None:
+    from vectara.utils import LabHelper, ResumableStream
+    from vectara.utils.lab_helper import LabHelper as EagerLabHelper
+    from vectara.utils.resumable_stream import ResumableStream as EagerResumableStream
+
+    assert LabHelper is EagerLabHelper
+    assert ResumableStream is EagerResumableStream
@@ -0,0 +1,78 @@
+import datetime as dt
+import json
+from typing import Any, Dict
+
+import httpx
+
+from vectara.core.http_client import HttpClient
+from vectara.core.json_body import encode_json_body
+from vectara.core.jsonable_encoder import jsonable_encoder
+from vectara.types import CreateDocumentRequest_Core, GenerationParameters, SearchCorporaParameters, Turn
+
+OMIT: Any = ...
+
+
+def _core_document() -> CreateDocumentRequest_Core:
+    return CreateDocumentRequest_Core.model_validate(
+        {
+            "id": "doc",
+            "metadata": {"lang": "en"},
+            "document_parts": [{"text": f"part {i}", "metadata": {"i": i}} for i in range(10)],
+        }
+    )
+
+
+def test_model_body_matches_jsonable_encoder() -> None:
+    for model in [
+        _core_document(),
+        SearchCorporaParameters.model_validate({"corpora": [{"corpus_key": "a", "lexical_interpolation": 0.1}]}),
+        Turn.model_validate({"id": "turn", "created_at": dt.datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc)}),
+    ]:
+        content = encode_json_body(json_body=model, request_options=None, omit=OMIT)
+        assert content is not None
+        assert json.loads(content) == jsonable_encoder(model)
+
+
+def test_mapping_body_drops_omitted_values_and_merges_additional_parameters() -> None:
+    body: Dict[str, Any] = {
+        "query": "hi",
+        "search": SearchCorporaParameters.model_validate({"corpora": [{"corpus_key": "a"}]}),
+        "generation": OMIT,
+        "save_history": None,
+    }
+    content = encode_json_body(
+        json_body=body, request_options={"additional_body_parameters": {"extra": 1}}, omit=OMIT
+    )
+
+    assert content is not None
+    assert json.loads(content) == {
+        "query": "hi",
+        "search": jsonable_encoder(body["search"]),
+        "save_history": None,
+        "extra": 1,
+    }
+
+
+def test_plain_bodies_use_the_generic_encoder() -> None:
+    assert encode_json_body(json_body={"query": "hi"}, request_options=None, omit=OMIT) is None
+    assert encode_json_body(json_body=None, request_options=None, omit=OMIT) is None
+
+
+def test_http_client_sends_model_body_as_content() -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    client = HttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        base_timeout=lambda: None,
+        base_headers=lambda: {},
+        base_url=lambda: "https://example.com",
+    )
+    document = _core_document()
+    client.request("v2/corpora/a/documents", method="POST", json={"generation": GenerationParameters(), "doc": document})
+
+    assert requests[0].headers["content-type"] == "application/json"
+    assert json.loads(requests[0].content) == {"generation": {}, "doc": jsonable_encoder(document)}
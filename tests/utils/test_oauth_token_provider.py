@@ -0,0 +1,168 @@
+import asyncio
+import datetime as dt
+import threading
+import time
+import typing
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara, Vectara
+from vectara.core.client_wrapper import AsyncClientWrapper, SyncClientWrapper
+from vectara.core.oauth_token_provider import AsyncOAuthTokenProvider, OAuthTokenProvider, _refresh_at
+from vectara.environment import VectaraEnvironment
+
+ENVIRONMENT = VectaraEnvironment(default="https://api.example.com", auth="https://auth.example.com")
+
+
+class _AuthServer:
+    """Issues numbered tokens, optionally holding each response until released or failing it."""
+
+    def __init__(self, expires_in: int = 3600) -> None:
+        self.expires_in = expires_in
+        self.issued = 0
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def _respond(self) -> httpx.Response:
+        if self.fail:
+            return httpx.Response(400, json={"error": "invalid_client"})
+        self.issued += 1
+        return httpx.Response(200, json={"access_token": f"token-{self.issued}", "token_type": "Bearer",
+                                         "expires_in": self.expires_in})
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/oauth2/token"
+        self.release.wait(5)
+        return self._respond()
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        while not self.release.is_set():
+            await asyncio.sleep(0.01)
+        return self._respond()
+
+
+def _provider(server: _AuthServer, **kwargs: typing.Any) -> OAuthTokenProvider:
+    wrapper = SyncClientWrapper(environment=ENVIRONMENT, httpx_client=httpx.Client(
+        transport=httpx.MockTransport(server.handler)))
+    return OAuthTokenProvider(client_id="id", client_secret="secret", client_wrapper=wrapper, **kwargs)
+
+
+def _async_provider(server: _AuthServer, **kwargs: typing.Any) -> AsyncOAuthTokenProvider:
+    wrapper = AsyncClientWrapper(environment=ENVIRONMENT, httpx_client=httpx.AsyncClient(
+        transport=httpx.MockTransport(server.async_handler)))
+    return AsyncOAuthTokenProvider(client_id="id", client_secret="secret", client_wrapper=wrapper, **kwargs)
+
+
+def _wait_for(condition: typing.Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_refresh_at_is_jittered_within_the_refresh_window() -> None:
+    expires_at = dt.datetime.now() + dt.timedelta(seconds=1000)
+    for _ in range(100):
+        ahead = (expires_at - _refresh_at(expires_at, 0.2)).total_seconds()
+        assert 99 <= ahead <= 201
+
+
+def test_refreshes_on_expiry_without_background_refresh() -> None:
+    server = _AuthServer()
+    provider = _provider(server)
+    assert provider.get_token() == "token-1"
+    provider._refresh_at = dt.datetime.now() - dt.timedelta(seconds=1)
+    assert provider.get_token() == "token-1"
+    assert server.issued == 1
+
+    provider._expires_at = dt.datetime.now() - dt.timedelta(seconds=1)
+    assert provider.get_token() == "token-2"
+
+
+def test_background_refresh_keeps_serving_the_current_token() -> None:
+    server = _AuthServer()
+    provider = _provider(server, background_refresh=True)
+    assert provider.get_token() == "token-1"
+
+    server.release.clear()
+    provider._refresh_at = dt.datetime.now() - dt.timedelta(seconds=1)
+    start = time.monotonic()
+    assert [provider.get_token() for _ in range(10)] == ["token-1"] * 10
+    assert time.monotonic() - start < 1
+
+    server.release.set()
+    _wait_for(lambda: provider.get_token() == "token-2")
+    assert server.issued == 2
+    assert provider._refresh_at > dt.datetime.now()
+
+
+def test_failed_background_refresh_backs_off() -> None:
+    server = _AuthServer()
+    provider = _provider(server, background_refresh=True)
+    provider.get_token()
+
+    server.fail = True
+    provider._refresh_at = dt.datetime.now() - dt.timedelta(seconds=1)
+    assert provider.get_token() == "token-1"
+    _wait_for(lambda: provider._refresh_at > dt.datetime.now())
+    assert provider.get_token() == "token-1"
+
+
+def test_clients_share_a_token() -> None:
+    server = _AuthServer()
+    transport = httpx.MockTransport(server.handler)
+    clients = [
+        Vectara(environment=ENVIRONMENT, client_id="id", client_secret="secret", share_oauth_token=True,
+                httpx_client=httpx.Client(transport=transport))
+        for _ in range(3)
+    ]
+    other = Vectara(environment=ENVIRONMENT, client_id="other", client_secret="secret", share_oauth_token=True,
+                    httpx_client=httpx.Client(transport=transport))
+
+    headers = [client._client_wrapper.get_headers()["Authorization"] for client in clients]
+    assert headers == ["Bearer token-1"] * 3
+    assert other._client_wrapper.get_headers()["Authorization"] == "Bearer token-2"
+    assert server.issued == 2
+
+
+def test_clients_do_not_share_a_token_by_default() -> None:
+    server = _AuthServer()
+    transport = httpx.MockTransport(server.handler)
+    for _ in range(2):
+        client = Vectara(environment=ENVIRONMENT, client_id="id", client_secret="secret",
+                         httpx_client=httpx.Client(transport=transport))
+        client._client_wrapper.get_headers()
+    assert server.issued == 2
+
+
+@pytest.mark.asyncio
+async def test_async_background_refresh_keeps_serving_the_current_token() -> None:
+    server = _AuthServer()
+    provider = _async_provider(server, background_refresh=True)
+    assert await provider.get_token() == "token-1"
+
+    server.release.clear()
+    provider._refresh_at = dt.datetime.now() - dt.timedelta(seconds=1)
+    assert await asyncio.wait_for(asyncio.gather(*(provider.get_token() for _ in range(10))), 1) == ["token-1"] * 10
+
+    server.release.set()
+    assert provider._refresh_task is not None
+    await provider._refresh_task
+    assert await provider.get_token() == "token-2"
+    assert server.issued == 2
+
+
+@pytest.mark.asyncio
+async def test_async_clients_share_a_token() -> None:
+    server = _AuthServer()
+    transport = httpx.MockTransport(server.async_handler)
+    clients = [
+        AsyncVectara(environment=ENVIRONMENT, client_id="id", client_secret="secret", share_oauth_token=True,
+                     background_token_refresh=True, httpx_client=httpx.AsyncClient(transport=transport))
+        for _ in range(3)
+    ]
+    headers = await asyncio.gather(*(client._client_wrapper.async_get_headers() for client in clients))
+    assert [header["Authorization"] for header in headers] == ["Bearer token-1"] * 3
+    assert server.issued == 1
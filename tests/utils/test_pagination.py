@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from vectara.core.pagination import AsyncPager, SyncPager
+
+
+def _sync_pages(count: int, delay: float = 0.0, fail_at: Optional[int] = None,
+                fetched: Optional[List[int]] = None) -> SyncPager[int, None]:
+    def page(n: int) -> SyncPager[int, None]:
+        if n == fail_at:
+            raise RuntimeError(f"page {n} failed")
+        time.sleep(delay)
+        if fetched is not None:
+            fetched.append(n)
+        return SyncPager(
+            get_next=(lambda: page(n + 1)) if n + 1 < count else None,
+            has_next=n + 1 < count,
+            items=[n * 10 + i for i in range(10)],
+            response=None,
+        )
+
+    return page(0)
+
+
+def _async_pages(count: int, delay: float = 0.0, fail_at: Optional[int] = None,
+                 fetched: Optional[List[int]] = None) -> AsyncPager[int, None]:
+    def page(n: int) -> AsyncPager[int, None]:
+        async def get_next() -> AsyncPager[int, None]:
+            if n + 1 == fail_at:
+                raise RuntimeError(f"page {n + 1} failed")
+            await asyncio.sleep(delay)
+            if fetched is not None:
+                fetched.append(n + 1)
+            return page(n + 1)
+
+        return AsyncPager(
+            get_next=get_next if n + 1 < count else None,
+            has_next=n + 1 < count,
+            items=[n * 10 + i for i in range(10)],
+            response=None,
+        )
+
+    return page(0)
+
+
+def test_prefetch_yields_the_same_items() -> None:
+    assert list(_sync_pages(5).iter_items(prefetch=2)) == list(_sync_pages(5)) == list(range(50))
+
+
+def test_prefetch_overlaps_fetching_with_consumption() -> None:
+    pager = _sync_pages(6, delay=0.05)
+
+    started = time.monotonic()
+    for page in pager.iter_pages(prefetch=2):
+        time.sleep(0.05)
+    elapsed = time.monotonic() - started
+
+    # Serially this takes 5 fetches + 6 pages of work = 0.55s.
+    assert elapsed < 0.45
+
+
+def test_prefetch_is_bounded_and_stops_when_abandoned() -> None:
+    fetched: List[int] = []
+    pages = _sync_pages(100, fetched=fetched).iter_pages(prefetch=3)
+    next(pages)
+    time.sleep(0.1)
+    # The first page is in hand, then at most 3 buffered pages plus one waiting to be buffered.
+    assert len(fetched) <= 5
+
+    pages.close()
+    time.sleep(0.3)
+    count = len(fetched)
+    time.sleep(0.1)
+    assert len(fetched) == count < 100
+    assert not any(thread.name == "SyncPager-prefetch" for thread in threading.enumerate())
+
+
+def test_prefetch_raises_errors_in_order() -> None:
+    items: List[int] = []
+    with pytest.raises(RuntimeError, match="page 3 failed"):
+        for item in _sync_pages(5, fail_at=3).iter_items(prefetch=2):
+            items.append(item)
+    assert items == list(range(30))
+
+
+@pytest.mark.asyncio
+async def test_async_prefetch() -> None:
+    pager = _async_pages(6, delay=0.05)
+
+    started = time.monotonic()
+    items = []
+    async for page in pager.iter_pages(prefetch=2):
+        await asyncio.sleep(0.05)
+        items.extend(page.items or [])
+    elapsed = time.monotonic() - started
+
+    assert items == list(range(60))
+    assert elapsed < 0.45
+    assert [item async for item in _async_pages(3)] == list(range(30))
+
+
+@pytest.mark.asyncio
+async def test_async_prefetch_errors_and_cancellation() -> None:
+    items: List[int] = []
+    with pytest.raises(RuntimeError, match="page 2 failed"):
+        async for item in _async_pages(5, fail_at=2).iter_items(prefetch=2):
+            items.append(item)
+    assert items == list(range(20))
+
+    fetched: List[int] = []
+    pages = _async_pages(100, delay=0.01, fetched=fetched).iter_pages(prefetch=2)
+    await pages.__anext__()
+    await pages.aclose()  # type: ignore[attr-defined]
+    count = len(fetched)
+    await asyncio.sleep(0.05)
+    assert len(fetched) == count < 10
@@ -0,0 +1,80 @@
+import json
+import typing
+from unittest.mock import patch
+
+import pydantic
+import pytest
+import typing_extensions
+
+from vectara.core import pydantic_utilities
+from vectara.core.http_sse._models import ServerSentEvent
+from vectara.core.pydantic_utilities import UniversalBaseModel, parse_obj_as, parse_sse_obj
+from vectara.queries import QueryQueriesStreamResponse
+from vectara.queries.types.query_queries_stream_response import (
+    QueryQueriesStreamResponse_End,
+    QueryQueriesStreamResponse_GenerationChunk,
+)
+
+
+class _ErrorData(UniversalBaseModel):
+    code: str
+
+
+class _JobEvent_Error(UniversalBaseModel):
+    event: typing.Literal["ERROR"] = "ERROR"
+    data: _ErrorData
+
+
+class _JobEvent_Status(UniversalBaseModel):
+    event: typing.Literal["STATUS"] = "STATUS"
+    data: str
+
+
+_JobEvent = typing_extensions.Annotated[
+    typing.Union[_JobEvent_Error, _JobEvent_Status], pydantic.Field(discriminator="event")
+]
+
+
+def test_data_level_discrimination() -> None:
+    # The union query_stream parses its events into.
+    chunk = parse_sse_obj(
+        ServerSentEvent(data=json.dumps({"type": "generation_chunk", "generation_chunk": "Hello"})),
+        QueryQueriesStreamResponse,  # type: ignore[arg-type]
+    )
+    assert isinstance(chunk, QueryQueriesStreamResponse_GenerationChunk)
+    assert chunk.generation_chunk == "Hello"
+
+    end = parse_sse_obj(ServerSentEvent(data=json.dumps({"type": "end"})), QueryQueriesStreamResponse)  # type: ignore
+    assert isinstance(end, QueryQueriesStreamResponse_End)
+
+    with pytest.raises(pydantic.ValidationError):
+        parse_sse_obj(ServerSentEvent(data=json.dumps({"type": "unknown"})), QueryQueriesStreamResponse)  # type: ignore
+
+
+def test_event_level_discrimination() -> None:
+    error = parse_sse_obj(ServerSentEvent(event="ERROR", data='{"code": "FAILED"}'), _JobEvent)  # type: ignore
+    assert isinstance(error, _JobEvent_Error) and error.data.code == "FAILED"
+
+    status = parse_sse_obj(ServerSentEvent(event="STATUS", data='{"status": "processing"}'), _JobEvent)  # type: ignore
+    assert isinstance(status, _JobEvent_Status) and status.data == '{"status": "processing"}'
+
+
+def test_discriminated_union_is_compiled_once() -> None:
+    events = [ServerSentEvent(data=json.dumps({"type": "generation_chunk", "generation_chunk": str(i)})) for i in range(5)]
+    parse_sse_obj(events[0], QueryQueriesStreamResponse)  # type: ignore[arg-type]
+
+    with patch.object(pydantic_utilities, "_get_discriminator_and_variants") as get_variants, patch.object(
+        pydantic_utilities.pydantic, "TypeAdapter"
+    ) as type_adapter:
+        parsed = [parse_sse_obj(event, QueryQueriesStreamResponse) for event in events]  # type: ignore[arg-type]
+
+    get_variants.assert_not_called()
+    type_adapter.assert_not_called()
+    assert [chunk.generation_chunk for chunk in parsed] == ["0", "1", "2", "3", "4"]  # type: ignore[union-attr]
+
+
+def test_parse_obj_as_reuses_type_adapter() -> None:
+    assert parse_obj_as(typing.List[int], ["1", 2]) == [1, 2]
+    with patch.object(pydantic_utilities.pydantic, "TypeAdapter") as type_adapter:
+        assert parse_obj_as(typing.List[int], [3]) == [3]
+    type_adapter.assert_not_called()
@@ -0,0 +1,165 @@
+import json
+import time
+from typing import Any, List
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara, Vectara
+from vectara.core.query_cache import CacheBackend, CachedResponse, DiskCacheBackend, MemoryCacheBackend, QueryCache
+from vectara.types import GenerationParameters, KeyedSearchCorpus, SearchCorporaParameters
+
+_QUERY_RESPONSE = {"summary": None, "search_results": [{"text": "cached", "score": 0.9}]}
+
+
+class _Server:
+    def __init__(self) -> None:
+        self.requests: List[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path.endswith("/query"):
+            return httpx.Response(200, json=_QUERY_RESPONSE)
+        if request.url.path.endswith("/documents/doc-1"):
+            return httpx.Response(204)
+        return httpx.Response(404, json={})
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        return self.handler(request)
+
+
+def _search(corpus_key: str = "my-corpus") -> SearchCorporaParameters:
+    return SearchCorporaParameters(corpora=[KeyedSearchCorpus(corpus_key=corpus_key)])
+
+
+def _entry(corpora: Any = ("c",), ttl: float = 60) -> CachedResponse:
+    return CachedResponse(status_code=200, headers=[], content=b"{}", corpora=tuple(corpora),
+                          expires_at=time.time() + ttl)
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_backends_evict_expire_and_invalidate(backend: str, tmp_path: Any) -> None:
+    cache = MemoryCacheBackend(max_entries=2) if backend == "memory" else DiskCacheBackend(tmp_path / "cache.db", 2)
+
+    cache.put("a", _entry(["c1"]))
+    time.sleep(0.01)
+    cache.put("b", _entry(["c2"]))
+    time.sleep(0.01)
+    assert cache.get("a") is not None  # a is now the most recently used.
+    assert cache.put("c", _entry(["c1", "c2"])) == 1
+    assert cache.get("b") is None and len(cache) == 2
+
+    assert cache.invalidate("c1") == 2
+    assert len(cache) == 0
+
+    cache.put("expired", _entry(ttl=-1))
+    assert cache.get("expired") is None
+
+
+def test_incomplete_backend_fails_when_constructed() -> None:
+    class _GetOnly(CacheBackend):
+        def get(self, key: str) -> None:
+            return None
+
+    with pytest.raises(TypeError):
+        _GetOnly()  # type: ignore[abstract]
+
+
+def test_disk_backend_persists(tmp_path: Any) -> None:
+    DiskCacheBackend(tmp_path / "cache.db").put("a", _entry())
+    entry = DiskCacheBackend(tmp_path / "cache.db").get("a")
+    assert entry is not None and entry.content == b"{}" and entry.corpora == ("c",)
+
+
+def test_match_canonicalizes_body_and_skips_generation() -> None:
+    cache = QueryCache()
+    first = cache.match("POST", "v2/query", [], b'{"query":"q","search":{"corpora":[{"corpus_key":"b"},{"corpus_key":"a"}]}}', {})
+    second = cache.match("POST", "v2/query", [], {"search": {"corpora": [{"corpus_key": "b"}, {"corpus_key": "a"}]}, "query": "q"}, {})
+    assert first is not None and first == second
+    assert first.corpora == ("a", "b")
+
+    assert cache.match("POST", "v2/query", [], {"query": "q", "generation": {"prompt_name": "x"}}, {}) is None
+    assert cache.match("POST", "v2/query", [], {"query": "q", "generation": {"enabled": False}}, {}) is not None
+    assert QueryCache(cache_generation=True).match("POST", "v2/query", [], {"generation": {}}, {}) is not None
+
+    assert cache.match("POST", "v2/corpora/my%20corpus/query", [], {}, {}).corpora == ("my corpus",)  # type: ignore
+    assert cache.match("GET", "v2/corpora/c/query", [("query", "q")], None, {}) is not None
+    assert cache.match("POST", "v2/corpora/c/documents", [], {}, {}) is None
+    assert cache.match("POST", "v2/query", [], {}, {"x-api-key": "a"}) != cache.match("POST", "v2/query", [], {}, {"x-api-key": "b"})
+
+
+def test_client_serves_repeated_queries_from_cache() -> None:
+    server = _Server()
+    cache = QueryCache(ttl=60)
+    client = Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)),
+                     query_cache=cache)
+
+    for _ in range(3):
+        response = client.queries.query(query="q", search=_search())
+        assert response.search_results[0].text == "cached"  # type: ignore
+    client.corpora.query("my-corpus", query="q")
+    client.corpora.query("my-corpus", query="q")
+
+    assert len(server.requests) == 2
+    assert cache.stats.snapshot() == {"hits": 3, "misses": 2, "stores": 2, "evictions": 0, "invalidations": 0}
+
+    # Generation is not deterministic, so it is not cached.
+    client.queries.query(query="q", search=_search(), generation=GenerationParameters(prompt_name="p"))
+    client.queries.query(query="q", search=_search(), generation=GenerationParameters(prompt_name="p"))
+    assert len(server.requests) == 4
+
+    # Writing to the corpus invalidates its queries, but not those of other corpora.
+    client.queries.query(query="q", search=_search("other-corpus"))
+    client.documents.delete("my-corpus", "doc-1")
+    assert cache.stats.invalidations == 2
+    client.queries.query(query="q", search=_search())
+    client.queries.query(query="q", search=_search("other-corpus"))
+    assert [request.url.path for request in server.requests[-3:]] == [
+        "/v2/query", "/v2/corpora/my-corpus/documents/doc-1", "/v2/query"
+    ]
+
+
+def test_oauth_clients_do_not_share_cached_queries() -> None:
+    server = _Server()
+    cache = QueryCache()
+
+    def client(client_id: str, token: str) -> Vectara:
+        return Vectara(api_key=None, client_id=client_id, client_secret="secret", _token_getter_override=lambda: token,
+                       httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)), query_cache=cache)
+
+    client("app-1", "token-1").queries.query(query="q", search=_search())
+    client("app-2", "token-2").queries.query(query="q", search=_search())
+    assert len(server.requests) == 2
+    # The same OAuth client after its token was refreshed.
+    client("app-1", "token-3").queries.query(query="q", search=_search())
+    assert len(server.requests) == 2 and cache.stats.hits == 1
+
+
+def test_client_cache_expires() -> None:
+    server = _Server()
+    client = Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)),
+                     query_cache=QueryCache(ttl=60))
+
+    client.queries.query(query="q", search=_search())
+    with patch("vectara.core.query_cache.time.time", return_value=time.time() + 120):
+        client.queries.query(query="q", search=_search())
+    assert len(server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_uses_cache() -> None:
+    server = _Server()
+    cache = QueryCache()
+    client = AsyncVectara(api_key="key",
+                          httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(server.async_handler)),
+                          query_cache=cache)
+
+    for _ in range(3):
+        await client.queries.query(query="q", search=_search())
+    await client.documents.delete("my-corpus", "doc-1")
+    await client.queries.query(query="q", search=_search())
+
+    assert len(server.requests) == 3
+    assert cache.stats.hits == 2 and cache.stats.invalidations == 1
+    assert json.loads(server.requests[0].content)["query"] == "q"
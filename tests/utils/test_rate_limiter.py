@@ -0,0 +1,122 @@
+import time
+from typing import List
+
+import httpx
+import pytest
+
+from vectara.core.http_client import AsyncHttpClient, HttpClient
+from vectara.core.rate_limiter import RateLimiter
+
+
+def _response(status_code: int = 200, **headers: str) -> httpx.Response:
+    return httpx.Response(status_code, headers={k.replace("_", "-"): v for k, v in headers.items()})
+
+
+def test_fixed_rate_paces_requests() -> None:
+    limiter = RateLimiter(rate=10, burst=2)
+
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1, abs=0.01)
+    assert limiter.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_no_rate_does_not_limit() -> None:
+    limiter = RateLimiter()
+    assert all(limiter.reserve() == 0 for _ in range(100))
+
+
+def test_learns_rate_from_headers() -> None:
+    limiter = RateLimiter()
+    limiter.update(_response(x_ratelimit_limit="100", x_ratelimit_remaining="50", x_ratelimit_reset="10"))
+
+    assert limiter.rate == pytest.approx(5.0)
+    limiter.update(_response(x_ratelimit_remaining="50", x_ratelimit_reset=str(time.time() + 25)))
+    assert limiter.rate == pytest.approx(2.0, rel=0.05)
+
+
+def test_keeps_rate_when_window_length_is_unknown() -> None:
+    limiter = RateLimiter(rate=5)
+    limiter.update(_response(x_ratelimit_limit="1000", x_ratelimit_remaining="1000", x_ratelimit_reset="0"))
+    assert limiter.rate == 5
+
+
+def test_learning_can_be_disabled() -> None:
+    limiter = RateLimiter(rate=3, learn=False)
+    limiter.update(_response(x_ratelimit_remaining="50", x_ratelimit_reset="10"))
+    assert limiter.rate == 3
+
+
+def test_429_pauses_all_callers() -> None:
+    limiter = RateLimiter(rate=100)
+    limiter.update(_response(429, retry_after="2"))
+
+    assert limiter.reserve() == pytest.approx(2.0, abs=0.05)
+    assert limiter.reserve() == pytest.approx(2.0, abs=0.05)
+
+
+def test_exhausted_quota_pauses_until_reset() -> None:
+    limiter = RateLimiter()
+    limiter.update(_response(x_ratelimit_remaining="0", x_ratelimit_reset="1.5"))
+    assert limiter.reserve() == pytest.approx(1.5, abs=0.05)
+
+
+def test_http_client_acquires_and_updates() -> None:
+    seen: List[float] = []
+    limiter = RateLimiter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(time.monotonic())
+        return _response(x_ratelimit_remaining="20", x_ratelimit_reset="1")
+
+    client = HttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        base_timeout=lambda: None,
+        base_headers=lambda: {},
+        base_url=lambda: "https://example.com",
+        rate_limiter=limiter,
+    )
+    for _ in range(25):
+        client.request("v2/corpora", method="GET")
+
+    assert limiter.rate == pytest.approx(20.0)
+    # The first burst of 20 goes straight through, then requests are spaced out at the learned rate.
+    assert seen[-1] - seen[0] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_async_http_client_acquires_and_updates() -> None:
+    limiter = RateLimiter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return _response(429, retry_after="0.5")
+
+    client = AsyncHttpClient(
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        base_timeout=lambda: None,
+        base_headers=lambda: {},
+        base_url=lambda: "https://example.com",
+        rate_limiter=limiter,
+    )
+    response = await client.request("v2/corpora", method="GET", retries=2)
+
+    assert response.status_code == 429
+    assert limiter.reserve() > 0
+
+
+def test_429_waits_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: List[float] = []
+    monkeypatch.setattr("vectara.core.http_client.time.sleep", sleeps.append)
+    monkeypatch.setattr("vectara.core.rate_limiter.time.sleep", sleeps.append)
+    responses = [_response(429, retry_after="2"), _response()]
+
+    client = HttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(lambda request: responses.pop(0))),
+        base_timeout=lambda: None,
+        base_headers=lambda: {},
+        base_url=lambda: "https://example.com",
+        rate_limiter=RateLimiter(),
+    )
+    assert client.request("v2/corpora", method="GET").status_code == 200
+    # The limiter's pause is the only wait before the retry.
+    assert sleeps == [pytest.approx(2.0, abs=0.05)]
@@ -0,0 +1,134 @@
+from typing import List
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara, Vectara
+from vectara.core.http_client import AsyncHttpClient, HttpClient
+from vectara.core.retry_budget import CONNECTION_ERROR, RetryBudget
+
+
+def _sync_client(handler, retry_budget=None) -> HttpClient:  # type: ignore
+    return HttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        base_timeout=lambda: None,
+        base_headers=lambda: {},
+        base_url=lambda: "https://example.com",
+        retry_budget=retry_budget,
+    )
+
+
+def test_retry_budget_is_opt_in() -> None:
+    assert Vectara(api_key="key")._client_wrapper.httpx_client.retry_budget is None
+    assert AsyncVectara(api_key="key")._client_wrapper.httpx_client.retry_budget is None
+
+    budget = RetryBudget()
+    assert Vectara(api_key="key", retry_budget=budget)._client_wrapper.httpx_client.retry_budget is budget
+
+
+def test_retry_budget_allows_ratio_of_requests() -> None:
+    budget = RetryBudget(ratio=0.5, window=10, min_retries_per_second=0)
+    for _ in range(4):
+        budget.record_request()
+
+    assert budget.try_retry()
+    assert budget.try_retry()
+    assert not budget.try_retry()
+
+
+def test_retry_budget_minimum_and_window() -> None:
+    budget = RetryBudget(ratio=0, window=1, min_retries_per_second=2)
+    assert budget.try_retry() and budget.try_retry()
+    assert not budget.try_retry()
+
+    with patch("vectara.core.retry_budget.time.monotonic", return_value=1e9):
+        assert budget.try_retry()
+
+
+@patch("vectara.core.http_client.time.sleep", lambda seconds: None)
+def test_retries_reuse_encoded_request_without_recursion() -> None:
+    statuses = [503, 429, 200]
+    bodies: List[bytes] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(request.content)
+        return httpx.Response(statuses[len(bodies) - 1])
+
+    def encoder_calls(client: HttpClient) -> int:
+        with patch("vectara.core.http_client.jsonable_encoder", wraps=lambda obj: obj) as encoder:
+            response = client.request("query", method="POST", json={"query": "hi"}, request_options={"max_retries": 3})
+        assert response.status_code == 200
+        return encoder.call_count
+
+    client = _sync_client(handler)
+    retried_calls = encoder_calls(client)
+
+    assert len(set(bodies)) == 1 and len(bodies) == 3
+    # The body, params and headers are encoded once, not once per attempt.
+    assert retried_calls == encoder_calls(_sync_client(lambda request: httpx.Response(200)))
+    assert client.retry_stats.snapshot() == {
+        "requests": 1,
+        "retries": 2,
+        "budget_exhausted": 0,
+        "retries_by_cause": {503: 1, 429: 1},
+    }
+
+
+@patch("vectara.core.http_client.time.sleep", lambda seconds: None)
+def test_connection_errors_are_counted() -> None:
+    attempts: List[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200)
+
+    client = _sync_client(handler)
+    assert client.request("query", method="GET").status_code == 200
+    assert client.retry_stats.retries_by_cause == {CONNECTION_ERROR: 1}
+
+
+@patch("vectara.core.http_client.time.sleep", lambda seconds: None)
+def test_exhausted_budget_stops_retries() -> None:
+    attempts: List[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(1)
+        return httpx.Response(500)
+
+    client = _sync_client(handler, retry_budget=RetryBudget(ratio=0.1, min_retries_per_second=0))
+    for _ in range(20):
+        assert client.request("query", method="GET").status_code == 500
+
+    # 20 requests earn 2 retries in the window, after which every request fails fast.
+    assert len(attempts) == 22
+    assert client.retry_stats.retries == 2
+    assert client.retry_stats.budget_exhausted == 20
+
+
+@pytest.mark.asyncio
+async def test_async_retry_loop() -> None:
+    statuses = [502, 200]
+    attempts: List[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(1)
+        return httpx.Response(statuses[len(attempts) - 1])
+
+    async def no_sleep(seconds: float) -> None:
+        pass
+
+    client = AsyncHttpClient(
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        base_timeout=lambda: None,
+        base_headers=lambda: {},
+        base_url=lambda: "https://example.com",
+        retry_budget=RetryBudget(),
+    )
+    with patch("vectara.core.http_client.asyncio.sleep", no_sleep):
+        response = await client.request("query", method="GET")
+
+    assert response.status_code == 200
+    assert client.retry_stats.retries_by_cause == {502: 1}
@@ -0,0 +1,41 @@
+from typing import Any, List
+from unittest.mock import patch
+
+from .assets.models import ObjectWithOptionalFieldParams, ShapeParams
+
+from vectara.core.serialization import (
+    convert_and_respect_annotation_metadata,
+    get_alias_to_field_mapping,
+    get_field_to_alias_mapping,
+)
+
+UNION_TEST: ShapeParams = {"radius_measurement": 1.0, "shape_type": "circle", "id": "1"}
+UNION_TEST_CONVERTED = {"shapeType": "circle", "radiusMeasurement": 1.0, "id": "1"}
+
+
+def test_convert_and_respect_annotation_metadata_read_direction() -> None:
+    converted = convert_and_respect_annotation_metadata(
+        object_=UNION_TEST_CONVERTED, annotation=ShapeParams, direction="read"
+    )
+    assert converted == UNION_TEST
+
+
+def test_type_hints_are_resolved_once_per_type() -> None:
+    data: List[ObjectWithOptionalFieldParams] = [
+        {"string": "string", "long_": i, "literal": "lit_one", "any": "any"} for i in range(10)
+    ]
+    convert_and_respect_annotation_metadata(
+        object_=data, annotation=List[ObjectWithOptionalFieldParams], direction="write"
+    )
+
+    with patch("vectara.core.serialization.typing_extensions.get_type_hints") as get_type_hints:
+        converted: Any = convert_and_respect_annotation_metadata(
+            object_=data, annotation=List[ObjectWithOptionalFieldParams], direction="write"
+        )
+    get_type_hints.assert_not_called()
+    assert converted[3] == {"string": "string", "long": 3, "literal": "lit_one", "any": "any"}
+
+
+def test_alias_mappings() -> None:
+    assert get_field_to_alias_mapping(ObjectWithOptionalFieldParams)["long_"] == "long"
+    assert get_alias_to_field_mapping(ObjectWithOptionalFieldParams)["long"] == "long_"
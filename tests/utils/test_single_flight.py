@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import httpx
+import pytest
+
+from vectara import AsyncVectara, Vectara
+from vectara.core.single_flight import AsyncSingleFlight, SingleFlight, coalesce_key
+
+
+class _Server:
+    def __init__(self, delay: float = 0.1, status: int = 200) -> None:
+        self.delay = delay
+        self.status = status
+        self.requests: List[httpx.Request] = []
+        self._lock = threading.Lock()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests.append(request)
+        time.sleep(self.delay)
+        return httpx.Response(self.status, json={"key": request.url.path.rsplit("/", 1)[-1], "name": "corpus"})
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(self.status, json={"key": request.url.path.rsplit("/", 1)[-1], "name": "corpus"})
+
+
+def test_coalesce_key() -> None:
+    key = coalesce_key("GET", "https://x/v2/a", [("b", 1)], {"x": 1, "y": 2}, {"A": "1"})
+    assert key == coalesce_key("get", "https://x/v2/a", [("b", 1)], {"y": 2, "x": 1}, {"a": "1"})
+    assert key != coalesce_key("GET", "https://x/v2/a", [("b", 2)], {"x": 1, "y": 2}, {"A": "1"})
+    assert coalesce_key("POST", "https://x", [], iter([b"a"]), {}) is None
+
+
+def test_single_flight_shares_results_and_errors() -> None:
+    flight = SingleFlight()
+    calls: List[int] = []
+    started = threading.Event()
+
+    def slow() -> int:
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return len(calls)
+
+    with ThreadPoolExecutor(8) as pool:
+        first = pool.submit(flight.do, "k", slow)
+        started.wait()
+        results = [pool.submit(flight.do, "k", slow) for _ in range(7)]
+        assert first.result() == 1 and [result.result() for result in results] == [1] * 7
+    assert calls == [1] and flight.coalesced == 7
+
+    # Once finished, the next call is made again.
+    assert flight.do("k", slow) == 2
+
+    def fail() -> int:
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(4) as pool:
+        failures = [pool.submit(flight.do, "e", fail) for _ in range(4)]
+        for failure in failures:
+            with pytest.raises(RuntimeError):
+                failure.result()
+
+
+def test_client_coalesces_only_when_asked() -> None:
+    server = _Server()
+    client = Vectara(api_key="key", httpx_client=httpx.Client(transport=httpx.MockTransport(server.handler)))
+
+    with ThreadPoolExecutor(10) as pool:
+        corpora = list(pool.map(lambda _: client.corpora.get("c", request_options={"coalesce": True}), range(10)))
+    assert len(server.requests) == 1
+    assert all(corpus.key == "c" for corpus in corpora)
+
+    with ThreadPoolExecutor(3) as pool:
+        list(pool.map(lambda key: client.corpora.get(key, request_options={"coalesce": True}), ["a", "b", "a"]))
+        list(pool.map(lambda _: client.corpora.get("c"), range(3)))
+    assert len(server.requests) == 6
+
+
+@pytest.mark.asyncio
+async def test_async_client_coalesces() -> None:
+    server = _Server()
+    client = AsyncVectara(api_key="key",
+                          httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(server.async_handler)))
+
+    corpora = await asyncio.gather(*(client.corpora.get("c", request_options={"coalesce": True}) for _ in range(10)))
+    assert len(server.requests) == 1 and all(corpus.key == "c" for corpus in corpora)
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_survives_leader_cancellation() -> None:
+    flight = AsyncSingleFlight()
+    calls: List[int] = []
+
+    async def slow() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    leader = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == 42
+    assert calls == [1] and flight.coalesced == 1
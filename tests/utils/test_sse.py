@@ -0,0 +1,87 @@
+from typing import AsyncIterator, Iterator, List
+
+import httpx
+import pytest
+
+from vectara.core.http_sse._api import EventSource
+from vectara.core.http_sse._decoders import SSELineDecoder
+
+_HEADERS = {"content-type": "text/event-stream"}
+
+
+def _chunks(body: bytes, size: int) -> List[bytes]:
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def test_line_decoder_joins_lines_and_multibyte_characters_across_chunks() -> None:
+    body = "data: héllo wörld ✓\r\n\ndata: two\n".encode("utf-8")
+    decoder = SSELineDecoder()
+
+    lines: List[str] = []
+    for chunk in _chunks(body, 1):
+        lines.extend(decoder.decode(chunk))
+    lines.extend(decoder.flush())
+
+    assert lines == ["data: héllo wörld ✓", "", "data: two"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 1024])
+def test_line_decoder_splits_on_bare_cr(size: int) -> None:
+    body = b"data: one\r\rdata: two\r\ndata: three\r\r\n\n"
+    decoder = SSELineDecoder()
+
+    lines: List[str] = []
+    for chunk in _chunks(body, size):
+        lines.extend(decoder.decode(chunk))
+    lines.extend(decoder.flush())
+
+    assert lines == ["data: one", "", "data: two", "data: three", "", ""]
+
+
+def test_line_decoder_flushes_final_line_without_newline() -> None:
+    decoder = SSELineDecoder()
+    assert decoder.decode(b"data: a\ndata: b") == ["data: a"]
+    assert decoder.flush() == ["data: b"]
+    assert decoder.flush() == []
+
+
+def test_iter_sse_with_large_events() -> None:
+    payload = "x" * 200_000 + "é"
+    body = f"id: 1\nevent: chunk\ndata: {payload}\n\ndata: done\n\n".encode("utf-8")
+
+    def stream() -> Iterator[bytes]:
+        yield from _chunks(body, 4097)
+
+    events = list(EventSource(httpx.Response(200, headers=_HEADERS, content=stream())).iter_sse())
+
+    assert [event.data for event in events] == [payload, "done"]
+    assert events[0].event == "chunk" and events[0].id == "1"
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse() -> None:
+    body = "data: {\"a\": \"ü\"}\n\n: comment\ndata: line one\ndata: line two\n\n".encode("utf-8")
+
+    async def stream() -> AsyncIterator[bytes]:
+        for chunk in _chunks(body, 3):
+            yield chunk
+
+    source = EventSource(httpx.Response(200, headers=_HEADERS, content=stream()))
+    events = [event async for event in source.aiter_sse()]
+
+    assert [event.data for event in events] == ['{"a": "ü"}', "line one\nline two"]
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_with_cr_line_endings() -> None:
+    body = b"id: 1\rdata: first\r\rdata: line one\rdata: line two\r\r"
+
+    async def stream() -> AsyncIterator[bytes]:
+        for chunk in _chunks(body, 5):
+            yield chunk
+
+    source = EventSource(httpx.Response(200, headers=_HEADERS, content=stream()))
+    events = [event async for event in source.aiter_sse()]
+
+    assert [event.data for event in events] == ["first", "line one\nline two"]
+    assert events[0].id == "1"